@@ -53,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tasks.instrumentation.ServerTimingMiddleware',  # Server-Timing, log de rendimiento y métricas
+    'tasks.routers.ReplicaRoutingMiddleware',  # Lecturas en réplicas, salvo tras una escritura
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Para servir archivos estáticos en producción
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -68,7 +70,8 @@ ROOT_URLCONF = 'app.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates que además mide el tiempo de render (tasks/instrumentation.py)
+        'BACKEND': 'tasks.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -100,6 +103,47 @@ else:
         }
     }
 
+# Pool de conexiones por proceso (tasks/pool.py), activo por defecto con
+# DATABASE_URL. DB_POOL_MAX_CONNECTIONS es el máximo de todo el servicio: se
+# reparte entre los workers de gunicorn (WEB_CONCURRENCY, la misma variable
+# que lee gunicorn). Deja margen bajo max_connections de PostgreSQL para el
+# cron y las consolas.
+DB_POOL = os.environ.get('DB_POOL', str(bool(os.environ.get('DATABASE_URL')))) == 'True'
+DB_POOL_MAX_CONNECTIONS = int(os.environ.get('DB_POOL_MAX_CONNECTIONS', 20))
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+# Réplicas de lectura (URLs separadas por comas), con alias replica_1,
+# replica_2... tasks/routers.py les envía las lecturas; un cliente que
+# escribió lee de `default` durante REPLICA_STICKY_SECONDS, que debe cubrir
+# el retraso de replicación. En las pruebas las réplicas apuntan a la base de
+# prueba de `default` (MIRROR).
+DATABASE_REPLICAS = []
+for index, url in enumerate(filter(None, os.environ.get('DATABASE_REPLICA_URLS', '').split(',')), 1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dj_database_url.parse(url.strip(), conn_max_age=600)
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['tasks.routers.ReplicaRouter']
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+
+if DB_POOL:
+    for database in DATABASES.values():
+        database.update({
+            'ENGINE': {
+                'django.db.backends.postgresql': 'tasks.backends.postgresql',
+                'django.db.backends.sqlite3': 'tasks.backends.sqlite3',
+            }[database['ENGINE']],
+            # Django cierra la conexión al terminar cada petición y el pool la recupera
+            'CONN_MAX_AGE': 0,
+            # Cada base (primaria y réplicas) tiene su propio pool con este máximo
+            'POOL': {
+                'MAX_CONNECTIONS': max(1, DB_POOL_MAX_CONNECTIONS // WEB_CONCURRENCY),
+                'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                'CHECK_AFTER': float(os.environ.get('DB_POOL_CHECK_AFTER', 1)),
+                'MAX_LIFETIME': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            },
+        })
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -153,7 +197,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'tasks.renderers.FastJSONRenderer',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
@@ -161,10 +205,63 @@ REST_FRAMEWORK = {
 }
 
 # WhiteNoise configuration para producción
-WHITENOISE_USE_FINDERS = True
-WHITENOISE_AUTOREFRESH = True
+# Los finders y la recarga buscan cada archivo en disco por petición; en
+# producción WhiteNoise sirve solo STATIC_ROOT, indexado al arrancar
+WHITENOISE_USE_FINDERS = DEBUG
+WHITENOISE_AUTOREFRESH = DEBUG
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Broker de eventos en vivo del tablero (SSE); ver tasks/events.py
+TASK_EVENTS_BROKER = os.environ.get('TASK_EVENTS_BROKER', 'tasks.events.InProcessBroker')
+
+# Caché del HTML de las tarjetas (ver tasks/cards.py): tamaño del LRU de cada
+# proceso y alias opcional de CACHES compartido entre workers
+TASK_CARD_CACHE_SIZE = int(os.environ.get('TASK_CARD_CACHE_SIZE', 5000))
+TASK_CARD_CACHE_ALIAS = os.environ.get('TASK_CARD_CACHE_ALIAS') or None
+
+# Instrumentación por petición (tasks/instrumentation.py): con
+# PERFORMANCE_LOG_LEVEL=INFO cada petición escribe una línea JSON en el logger
+# tasks.performance (por defecto WARNING, sin una línea por petición).
+# /metrics/ expone los histogramas a Prometheus con
+# "Authorization: Bearer <METRICS_TOKEN>" (o sin token desde INTERNAL_IPS)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+INTERNAL_IPS = ['127.0.0.1']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'tasks.performance': {
+            'handlers': ['console'],
+            'level': os.environ.get('PERFORMANCE_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'tasks.queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Detector de consultas duplicadas y N+1 (tasks/querydetector.py): advierte en
+# el logger tasks.queries. Guarda el origen de cada consulta, solo para desarrollo
+QUERY_DETECTOR = os.environ.get('QUERY_DETECTOR', str(DEBUG)) == 'True'
+
+# Vistas asíncronas del tablero (tasks/async_views.py), opcionales: en Django 5.0
+# el ORM asíncrono corre en el mismo hilo que las vistas síncronas y no mejora
+# el throughput (ver el docstring del módulo)
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# Retención de tareas eliminadas (tasks/archive.py, comando archive_tasks):
+# días en la columna de eliminadas antes de archivarlas y carpeta de los
+# archivos JSONL comprimidos
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get('TASK_ARCHIVE_AFTER_DAYS', 30))
+TASK_ARCHIVE_DIR = Path(os.environ.get('TASK_ARCHIVE_DIR', BASE_DIR / 'archive'))
+
 # CSRF Configuration para HTMX
 CSRF_TRUSTED_ORIGINS = [
     'https://todo-django-htmx.onrender.com',
@@ -8,5 +8,6 @@ pip install -r requirements.txt
 npm ci --omit=optional --no-audit --no-fund || npm install --no-audit --no-fund
 npm run build:css
 
+python manage.py build_responsive_images
 python manage.py collectstatic --no-input
 python manage.py migrate
@@ -1,10 +1,29 @@
-from rest_framework import viewsets, status, mixins
+import codecs
+
+from rest_framework import viewsets, status, mixins, serializers
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.template.loader import render_to_string
-from django.http import HttpResponse
+from rest_framework.exceptions import NotFound, UnsupportedMediaType, ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from .models import Task
-from .serializers import TaskSerializer
+from .serializers import (
+    BULK_MAX_ITEMS, TaskSerializer, BulkToggleSerializer, BulkDeleteSerializer,
+    task_rows_to_representation
+)
+from .pagination import TaskCursorPagination
+from .conditional import conditional_on_tasks
+from .instrumentation import timed
+from .search import search_tasks
+from .transfer import EXPORT_FORMATS, PARSERS, aiter_export, import_tasks, iter_export
+from .events import publish_task_event, publish_task_removed, publish_refresh
+from .board import (
+    render_task_change, wants_fragments, render_task_removed, get_column_before_toggle
+)
 
 
 class TaskViewSet(mixins.ListModelMixin,
@@ -16,49 +35,167 @@ class TaskViewSet(mixins.ListModelMixin,
     Gestión de tareas (sin endpoint de detalle individual).
     
     Endpoints disponibles:
-    - GET /api/tasks/ - Listar todas las tareas
+    - GET /api/tasks/ - Listar tareas (paginado por cursor)
+        Filtros: ?completed=true|false, ?deleted=true|false,
+        ?updated_since=<fecha ISO 8601>, ?fields=id,title,completed
+        Búsqueda: ?q=texto - tareas que contienen todas las palabras (como
+        prefijo) en título o descripción, ordenadas por relevancia; devuelve
+        solo la primera página (hasta ?page_size=) y "next" es null
     - POST /api/tasks/ - Crear nueva tarea
     - PUT /api/tasks/{id}/ - Actualizar tarea completa
     - DELETE /api/tasks/{id}/ - Eliminar tarea
     - POST /api/tasks/{id}/toggle/ - Alternar estado completado
+    
+    Endpoints masivos (una sola transacción, resultado por ítem):
+    - POST /api/tasks/bulk-create/ - Crear una lista de tareas
+    - POST /api/tasks/bulk-update/ - Actualizar parcialmente una lista de tareas (con id)
+    - POST /api/tasks/bulk-toggle/ - {"ids": [...], "completed": opcional}
+    - POST /api/tasks/bulk-delete/ - {"ids": [...], "soft": false}
+    
+    Exportación e importación en streaming (ver tasks/transfer.py):
+    - GET /api/tasks/export/ndjson/ y /api/tasks/export/csv/ - Todas las tareas,
+        con los mismos filtros y ?fields= del listado
+    - POST /api/tasks/import/ - Cuerpo NDJSON (application/x-ndjson) o CSV
+        (text/csv), con charset opcional; responde con las tareas creadas,
+        los errores por línea y el throughput
     """
     queryset = Task.objects.all().order_by('created_at')
     serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
     
-    def get_response_for_htmx(self):
-        """Retorna HTML renderizado para peticiones HTMX"""
-        pending_tasks = Task.objects.filter(completed=False, deleted=False).order_by("-created_at")
-        completed_tasks = Task.objects.filter(completed=True, deleted=False).order_by("-created_at")
-        deleted_tasks = Task.objects.filter(deleted=True).order_by("-created_at")
+    # Tipos de contenido aceptados por la importación y su formato en PARSERS
+    IMPORT_MEDIA_TYPES = {
+        'application/x-ndjson': 'ndjson',
+        'application/jsonl': 'ndjson',
+        'text/csv': 'csv',
+    }
+    
+    # Valores aceptados en los filtros booleanos del listado
+    BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+    
+    def get_queryset(self):
+        """Aplica los filtros del listado"""
+        queryset = super().get_queryset()
+        if self.action not in ('list', 'export'):
+            return queryset
+        
+        params = self.request.query_params
+        for name in ('completed', 'deleted'):
+            if name in params:
+                value = params[name].lower()
+                if value not in self.BOOLEAN_VALUES:
+                    raise ValidationError({name: "Debe ser true o false."})
+                queryset = queryset.filter(**{name: self.BOOLEAN_VALUES[value]})
         
-        context = {
-            'pending_tasks': pending_tasks,
-            'completed_tasks': completed_tasks,
-            'deleted_tasks': deleted_tasks,
-        }
-        html = render_to_string('partials/tasks_container.html', context)
-        return HttpResponse(html, content_type='text/html')
+        if 'updated_since' in params:
+            try:
+                updated_since = parse_datetime(params['updated_since'])
+            except ValueError:
+                updated_since = None
+            if updated_since is None:
+                raise ValidationError({'updated_since': "Debe ser una fecha ISO 8601."})
+            if timezone.is_naive(updated_since):
+                updated_since = timezone.make_aware(updated_since)
+            queryset = queryset.filter(updated_at__gte=updated_since)
+        return queryset
+    
+    def get_requested_fields(self):
+        """Campos pedidos con ?fields= en el listado, o None para todos"""
+        if self.action not in ('list', 'export') or 'fields' not in self.request.query_params:
+            return None
+        fields = [name.strip() for name in self.request.query_params['fields'].split(',') if name.strip()]
+        unknown = set(fields) - set(TaskSerializer.Meta.fields)
+        if not fields or unknown:
+            raise ValidationError({'fields': f"Campos inválidos: {', '.join(sorted(unknown)) or '(vacío)'}"})
+        return [name for name in TaskSerializer.Meta.fields if name in fields]
+    
+    @method_decorator(conditional_on_tasks)
+    def list(self, request, *args, **kwargs):
+        """
+        GET - Listar tareas.
+        Lee tuplas con .values_list() y las convierte con task_rows_to_representation
+        en vez de pasar cada instancia por TaskSerializer; la salida es la misma.
+        """
+        fields = self.get_requested_fields() or TaskSerializer.Meta.fields
+        # created_at se necesita siempre para construir el cursor
+        columns = fields if 'created_at' in fields else [*fields, 'created_at']
+        queryset = self.filter_queryset(self.get_queryset())
+        if 'q' in request.query_params:
+            return self.search(queryset, request.query_params['q'], fields)
+        queryset = queryset.values_list(*columns, named=True)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with timed('serialize'):
+                data = task_rows_to_representation(page, fields)
+            return self.get_paginated_response(data)
+        rows = list(queryset)
+        with timed('serialize'):
+            data = task_rows_to_representation(rows, fields)
+        return Response(data)
+    
+    def search(self, queryset, query, fields):
+        """
+        Resultados de ?q= ordenados por relevancia. El paginador por cursor
+        necesita un orden por columnas, así que se devuelve una sola página
+        con el mismo formato de respuesta.
+        """
+        limit = self.paginator.get_page_size(self.request)
+        rows = list(search_tasks(queryset, query).values_list(*fields)[:limit])
+        with timed('serialize'):
+            data = task_rows_to_representation(rows, fields)
+        return Response({'next': None, 'previous': None, 'results': data})
+    
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
+    
+    def get_response_for_htmx(self, task=None, previous_column=None, context=None):
+        """
+        Retorna HTML renderizado para peticiones HTMX.
+        Si la petición no apunta a #tasks-container, devuelve solo la tarjeta
+        afectada y los contadores de columna (hx-swap-oob). `context` es el
+        del evento publicado.
+        """
+        return render_task_change(self.request, task, previous_column, context)
+    
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.changed_task = serializer.instance
+        self.changed_context = publish_task_event('created', self.changed_task)
+    
+    def perform_update(self, serializer):
+        self.previous_column = serializer.instance.column_type
+        super().perform_update(serializer)
+        self.changed_task = serializer.instance
+        self.changed_context = publish_task_event('updated', self.changed_task, self.previous_column)
     
     def create(self, request, *args, **kwargs):
         """POST - Crear tarea"""
         response = super().create(request, *args, **kwargs)
         if request.headers.get('HX-Request'):
-            return self.get_response_for_htmx()
+            return self.get_response_for_htmx(self.changed_task, context=self.changed_context)
         return response
     
     def update(self, request, *args, **kwargs):
         """PUT - Actualizar tarea"""
         response = super().update(request, *args, **kwargs)
         if request.headers.get('HX-Request'):
-            return self.get_response_for_htmx()
+            return self.get_response_for_htmx(self.changed_task, self.previous_column, self.changed_context)
         return response
     
     def destroy(self, request, *args, **kwargs):
         """DELETE - Eliminar tarea"""
-        response = super().destroy(request, *args, **kwargs)
+        task = self.get_object()
+        task_id, previous_column = task.id, task.column_type
+        self.perform_destroy(task)
+        context = publish_task_removed(task_id, previous_column)
         if request.headers.get('HX-Request'):
+            if wants_fragments(request):
+                return render_task_removed(request, task_id, previous_column, context)
             return self.get_response_for_htmx()
-        return response
+        return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=['post'])
     def toggle(self, request, pk=None):
@@ -66,10 +203,198 @@ class TaskViewSet(mixins.ListModelMixin,
         Endpoint personalizado para alternar el estado de completado de una tarea.
         POST /api/tasks/{id}/toggle/
         """
+        # Un solo UPDATE condicional: sin lectura previa ni escritura de la fila completa.
+        # Un pk inválido es un 404, como en get_object()
+        try:
+            queryset = self.get_queryset().filter(pk=pk)
+        except (TypeError, ValueError):
+            raise NotFound()
+        if not queryset.toggle_completed():
+            raise NotFound()
         task = self.get_object()
-        task.completed = not task.completed
-        task.save()
+        context = publish_task_event('toggled', task, get_column_before_toggle(task))
         if request.headers.get('HX-Request'):
-            return self.get_response_for_htmx()
+            return self.get_response_for_htmx(task, get_column_before_toggle(task), context)
         serializer = self.get_serializer(task)
         return Response(serializer.data)
+    
+    def get_bulk_response(self, results, status_code=status.HTTP_200_OK):
+        """Respuesta de los endpoints masivos: resultados por ítem o el tablero para HTMX"""
+        # Un solo evento para todo el lote: los clientes recargan el contenedor
+        publish_refresh()
+        if self.request.headers.get('HX-Request'):
+            return self.get_response_for_htmx()
+        return Response({'results': results}, status=status_code)
+    
+    def get_bulk_list(self, request):
+        """Valida que el cuerpo sea una lista de hasta BULK_MAX_ITEMS objetos"""
+        if not isinstance(request.data, list) or not request.data:
+            raise ValidationError("Se esperaba una lista de tareas.")
+        if len(request.data) > BULK_MAX_ITEMS:
+            raise ValidationError(f"Máximo {BULK_MAX_ITEMS} tareas por petición.")
+        return request.data
+    
+    @action(detail=False, methods=['post'], url_path='bulk-create')
+    def bulk_create(self, request):
+        """
+        Crea varias tareas con un solo INSERT por lote.
+        POST /api/tasks/bulk-create/ - [{"title": ..., "description": ...}, ...]
+        """
+        serializer = TaskSerializer(data=self.get_bulk_list(request), many=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            tasks = Task.objects.bulk_create([Task(**item) for item in serializer.validated_data])
+        results = [
+            {'id': task.id, 'status': 'created', 'task': TaskSerializer(task).data}
+            for task in tasks
+        ]
+        return self.get_bulk_response(results, status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        """
+        Actualiza parcialmente varias tareas con bulk_update, un UPDATE por cada
+        conjunto de campos enviados, leyendo las filas con bloqueo en la misma
+        transacción.
+        POST /api/tasks/bulk-update/ - [{"id": 1, "title": ...}, {"id": 2, "completed": true}, ...]
+        """
+        items = self.get_bulk_list(request)
+        id_field = serializers.IntegerField()
+        
+        now = timezone.now()
+        results, changed_by_fields = [], {}
+        with transaction.atomic():
+            # Validar ids antes de leer: "5" se acepta como 5, el resto es inválido
+            item_ids = []
+            for item in items:
+                if not isinstance(item, dict):
+                    # Mismo error que da TaskSerializer para un ítem que no es un objeto
+                    serializer = TaskSerializer(data=item, partial=True)
+                    serializer.is_valid()
+                    item_ids.append(ValidationError(serializer.errors))
+                    continue
+                try:
+                    item_ids.append(id_field.run_validation(item.get('id')))
+                except ValidationError as e:
+                    item_ids.append(ValidationError({'id': e.detail}))
+            # Lectura con bloqueo dentro de la transacción: nadie modifica las
+            # filas entre la validación y la escritura
+            tasks = Task.objects.select_for_update().in_bulk(
+                [task_id for task_id in item_ids if isinstance(task_id, int)]
+            )
+            updated = []
+            for item, task_id in zip(items, item_ids):
+                if isinstance(task_id, ValidationError):
+                    raw_id = item.get('id') if isinstance(item, dict) else None
+                    results.append({'id': raw_id, 'status': 'invalid', 'errors': task_id.detail})
+                    continue
+                task = tasks.get(task_id)
+                if task is None:
+                    results.append({'id': task_id, 'status': 'not_found'})
+                    continue
+                serializer = TaskSerializer(task, data=item, partial=True)
+                if not serializer.is_valid():
+                    results.append({'id': task_id, 'status': 'invalid', 'errors': serializer.errors})
+                    continue
+                for attr, value in serializer.validated_data.items():
+                    setattr(task, attr, value)
+                # bulk_update no aplica auto_now
+                task.updated_at = now
+                # Cada ítem escribe solo sus propios campos: un bulk_update por
+                # conjunto de campos, sin reescribir columnas que no envió
+                fields = frozenset(serializer.validated_data) | {'updated_at'}
+                changed_by_fields.setdefault(fields, []).append(task)
+                results.append({'id': task_id, 'status': 'updated'})
+                updated.append((results[-1], task))
+            
+            for fields, changed in changed_by_fields.items():
+                Task.objects.bulk_update(changed, sorted(fields), batch_size=500)
+        # Serializar después de escribir: bulk_update fija completed_at y deleted_at
+        for result, task in updated:
+            result['task'] = TaskSerializer(task).data
+        return self.get_bulk_response(results)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-toggle')
+    def bulk_toggle(self, request):
+        """
+        Alterna (o fija, si se envía "completed") el estado de varias tareas con un solo UPDATE.
+        POST /api/tasks/bulk-toggle/ - {"ids": [1, 2, 3], "completed": true}
+        """
+        serializer = BulkToggleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        with transaction.atomic():
+            queryset = Task.objects.filter(id__in=ids)
+            found = set(queryset.select_for_update().values_list('id', flat=True))
+            if 'completed' in serializer.validated_data:
+                queryset.update(completed=serializer.validated_data['completed'], updated_at=timezone.now())
+            else:
+                queryset.toggle_completed()
+        results = [
+            {'id': task_id, 'status': 'toggled' if task_id in found else 'not_found'}
+            for task_id in ids
+        ]
+        return self.get_bulk_response(results)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Elimina varias tareas (o las mueve a eliminadas con "soft": true) en una sola consulta.
+        POST /api/tasks/bulk-delete/ - {"ids": [1, 2, 3], "soft": false}
+        """
+        serializer = BulkDeleteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        with transaction.atomic():
+            queryset = Task.objects.filter(id__in=ids)
+            found = set(queryset.select_for_update().values_list('id', flat=True))
+            if serializer.validated_data['soft']:
+                queryset.soft_delete()
+            else:
+                queryset.delete()
+        results = [
+            {'id': task_id, 'status': 'deleted' if task_id in found else 'not_found'}
+            for task_id in ids
+        ]
+        return self.get_bulk_response(results)
+    
+    @action(detail=False, methods=['get'], url_path=r'export/(?P<export_format>ndjson|csv)')
+    def export(self, request, export_format):
+        """
+        Exporta las tareas en streaming, leyendo la base de datos por bloques.
+        GET /api/tasks/export/ndjson/ - un objeto JSON por línea
+        GET /api/tasks/export/csv/ - CSV con encabezado
+        """
+        fields = self.get_requested_fields() or TaskSerializer.Meta.fields
+        queryset = self.filter_queryset(self.get_queryset()).order_by('id')
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_export(queryset, fields, export_format)
+        else:
+            content = iter_export(queryset, fields, export_format)
+        response = StreamingHttpResponse(content, content_type=f"{EXPORT_FORMATS[export_format]}; charset=utf-8")
+        response['Content-Disposition'] = f'attachment; filename="tasks.{export_format}"'
+        return response
+    
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def bulk_import(self, request):
+        """
+        Importa tareas leyendo el cuerpo línea a línea, sin cargarlo en memoria.
+        POST /api/tasks/import/ - NDJSON (application/x-ndjson) o CSV (text/csv)
+        """
+        # Se compara el tipo sin parámetros: "text/csv; charset=utf-8" es CSV
+        media_type = request.content_type.split(';')[0].strip().lower()
+        if media_type not in self.IMPORT_MEDIA_TYPES:
+            raise UnsupportedMediaType(request.content_type)
+        encoding = request.content_params.get('charset', 'utf-8')
+        try:
+            codecs.lookup(encoding)
+        except LookupError:
+            raise UnsupportedMediaType(request.content_type)
+        stream = request.stream
+        lines = iter(stream.readline, b'') if stream is not None else []
+        parse = PARSERS[self.IMPORT_MEDIA_TYPES[media_type]]
+        report = import_tasks(parse(line.decode(encoding, 'replace') for line in lines))
+        if report.created:
+            publish_refresh()
+        status_code = status.HTTP_201_CREATED if report.created else status.HTTP_400_BAD_REQUEST
+        return Response(report.as_dict(), status=status_code)
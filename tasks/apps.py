@@ -4,3 +4,14 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from .instrumentation import install_query_recorder
+        from .rollups import register_sqlite_functions, repair_rollups
+        from .search import repair_search_index
+        connection_created.connect(install_query_recorder, dispatch_uid='tasks.install_query_recorder')
+        connection_created.connect(register_sqlite_functions, dispatch_uid='tasks.register_sqlite_functions')
+        post_migrate.connect(repair_search_index, sender=self, dispatch_uid='tasks.repair_search_index')
+        post_migrate.connect(repair_rollups, sender=self, dispatch_uid='tasks.repair_rollups')
@@ -0,0 +1,156 @@
+"""
+Archivo y retención de tareas eliminadas (soft-delete).
+
+Las tareas eliminadas hace más de TASK_ARCHIVE_AFTER_DAYS días (según
+deleted_at: editarlas o moverlas después no reinicia el plazo) se mueven por lotes fuera de la tabla
+Task: a la tabla ArchivedTask o a un archivo JSONL comprimido con gzip. Cada
+lote se lee, se escribe en el archivo y se borra de Task en una transacción,
+así que la memoria queda acotada por el tamaño del lote. Restaurar las
+devuelve a la columna de eliminadas con su id, fecha de creación y posición
+originales.
+"""
+import gzip
+import json
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedTask, Task
+from .ranking import time_rank
+from .serializers import DATETIME_FIELDS, task_rows_to_representation
+
+# Columnas que se archivan
+ARCHIVE_FIELDS = [
+    'id', 'title', 'description', 'completed', 'created_at', 'updated_at', 'completed_at', 'deleted_at', 'rank',
+]
+
+
+class TableArchive:
+    """Destino: tabla ArchivedTask en la misma base de datos"""
+    def write(self, rows):
+        ArchivedTask.objects.bulk_create(
+            [ArchivedTask(**dict(zip(ARCHIVE_FIELDS, row))) for row in rows],
+            ignore_conflicts=True,
+        )
+
+    def close(self):
+        pass
+
+
+class JSONLArchive:
+    """Destino: archivo JSONL comprimido, una tarea por línea (se agrega al final si existe)"""
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, 'at', encoding='utf-8')
+
+    def write(self, rows):
+        for item in task_rows_to_representation(rows, ARCHIVE_FIELDS):
+            self.file.write(json.dumps(item, ensure_ascii=False) + "\n")
+        # El lote debe estar en disco antes de borrarlo de Task
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def get_archivable_queryset(cutoff):
+    """Tareas eliminadas antes de `cutoff`"""
+    return Task.objects.filter(deleted=True, deleted_at__lt=cutoff)
+
+
+def archive_deleted_tasks(cutoff, archive, batch_size=1000):
+    """
+    Mueve al archivo las tareas eliminadas antes de `cutoff`, un lote por
+    transacción. Genera el total archivado después de cada lote.
+    """
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                get_archivable_queryset(cutoff).select_for_update()
+                .order_by('deleted_at', 'id').values_list(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return
+            archive.write(rows)
+            get_archivable_queryset(cutoff).filter(id__in=[row[0] for row in rows]).delete()
+        archived += len(rows)
+        yield archived
+
+
+def restore_task_rows(items):
+    """
+    Vuelve a crear las tareas (diccionarios con ARCHIVE_FIELDS) en la columna
+    de eliminadas. deleted_at pasa a ser la fecha de restauración, para que la
+    próxima ejecución del archivo no se las vuelva a llevar enseguida (el
+    dashboard las cuenta como eliminadas ese día); la fecha de completado se
+    conserva (los archivos anteriores a esa columna usan updated_at, como la
+    migración 0008), igual que la posición en la columna (los anteriores a
+    rank la calculan de created_at, como la migración 0009). Las tareas que
+    ya existen (restauradas antes) se omiten.
+    """
+    now = timezone.now()
+    # Un archivo puede repetir una tarea si una ejecución se interrumpió
+    items = list({item['id']: item for item in items}.values())
+    existing = set(Task.objects.filter(id__in=[item['id'] for item in items]).values_list('id', flat=True))
+    items = [item for item in items if item['id'] not in existing]
+    tasks = [
+        Task(
+            id=item['id'], title=item['title'], description=item['description'],
+            completed=item['completed'], deleted=True, created_at=item['created_at'],
+            completed_at=item.get('completed_at') or (item['updated_at'] if item['completed'] else None),
+            deleted_at=now, rank=item.get('rank') or time_rank(item['created_at'], item['id']),
+        )
+        for item in items
+    ]
+    Task.objects.bulk_create(tasks)
+    return len(tasks)
+
+
+def restore_from_table(ids=None, batch_size=1000):
+    """Restaura desde ArchivedTask (todas o solo `ids`); genera el total restaurado"""
+    queryset = ArchivedTask.objects.order_by('id')
+    if ids:
+        queryset = queryset.filter(id__in=ids)
+    restored, last_id = 0, None
+    while True:
+        with transaction.atomic():
+            batch = queryset if last_id is None else queryset.filter(id__gt=last_id)
+            items = list(batch.values(*ARCHIVE_FIELDS)[:batch_size])
+            if not items:
+                return
+            restore_task_rows(items)
+            ArchivedTask.objects.filter(id__in=[item['id'] for item in items]).delete()
+        restored += len(items)
+        last_id = items[-1]['id']
+        yield restored
+
+
+def read_archive_file(path, ids=None):
+    """Lee un archivo JSONL comprimido línea a línea"""
+    with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+        for line in archive_file:
+            item = json.loads(line)
+            if ids and item['id'] not in ids:
+                continue
+            for name in DATETIME_FIELDS:
+                if item.get(name):
+                    item[name] = parse_datetime(item[name])
+            yield item
+
+
+def restore_from_file(path, ids=None, batch_size=1000):
+    """Restaura desde un archivo de archive_tasks; genera el total restaurado"""
+    restored, batch = 0, []
+    for item in read_archive_file(path, ids):
+        batch.append(item)
+        if len(batch) == batch_size:
+            with transaction.atomic():
+                restored += restore_task_rows(batch)
+            batch = []
+            yield restored
+    if batch:
+        with transaction.atomic():
+            restored += restore_task_rows(batch)
+        yield restored
@@ -0,0 +1,204 @@
+"""
+Variantes asíncronas de las vistas del tablero para servir bajo ASGI.
+
+Usan el ORM asíncrono (aget, acreate, asave, aupdate, iteración async) y
+renderizan las plantillas con el contexto ya materializado (listas de tareas y
+conteos), así que el render no hace consultas. Se activan con el setting
+ASYNC_VIEWS (ver tasks/urls.py) y responden lo mismo que las vistas de
+tasks/views.py.
+
+En Django 5.0 el ORM asíncrono no tiene consultas asíncronas de verdad: cada
+llamada pasa por sync_to_async(thread_sensitive=True) y se ejecuta en el
+mismo hilo compartido que las vistas síncronas bajo ASGI, así que las
+consultas de todas las peticiones del proceso se serializan en ese hilo.
+Estas vistas no liberan hilos ni aumentan el throughput (benchmark_servers:
+las vistas síncronas bajo ASGI rinden igual o algo más, y WSGI más que ambas);
+por eso ASYNC_VIEWS es opcional y app/asgi.py no lo activa. Lo que sí aprovecha
+ASGI es el stream SSE de TaskEventsView, que es asíncrono en ambos modos.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import render
+from django.views import View
+
+from .board import (
+    COLUMN_TYPES, aget_tasks_context, aget_column_page, aget_task_fragments_context,
+    wants_fragments, get_column_before_toggle, get_task_fragments_context, parse_move_after,
+    amove_task, get_task_moved_context
+)
+from .events import get_broker, build_task_event
+from .models import Task, TaskDailyRollup
+from .views import get_dashboard_context, get_dashboard_range
+
+
+async def aget_task(task_id):
+    """Tarea por id o Http404"""
+    try:
+        return await Task.objects.aget(id=task_id)
+    except ObjectDoesNotExist:
+        raise Http404("Tarea inexistente")
+
+
+async def arender_tasks_container(request, counts=None):
+    """Renderiza el contenedor completo de tareas"""
+    return render(request, 'partials/tasks_container.html', await aget_tasks_context(counts))
+
+
+async def arender_task_change(request, kind, task, previous_column=None):
+    """
+    Publica el evento de la tarea y responde con sus fragmentos (o con el
+    contenedor completo si se pidió). El contexto se calcula una sola vez para
+    ambos. El ORM asíncrono trabaja en autocommit, así que el cambio ya está
+    confirmado y el evento se publica de inmediato en vez de usar on_commit.
+    """
+    context = await aget_task_fragments_context(task, previous_column)
+    get_broker().publish(build_task_event(kind, task, previous_column, context))
+    if wants_fragments(request):
+        return render(request, 'partials/task_fragments.html', context)
+    return await arender_tasks_container(request, context.get('counts'))
+
+
+class AsyncHomeView(View):
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request):
+        template_name = "tasks.html" if request.htmx else "home.html"
+        return render(request, template_name, await aget_tasks_context())
+
+
+class AsyncDashboardView(View):
+    http_method_names = ['get', 'head', 'options']
+
+    async def get(self, request):
+        try:
+            start, end = get_dashboard_range(request.GET)
+        except ValueError:
+            return HttpResponseBadRequest("Rango de fechas inválido")
+        counts = await Task.objects.astatus_counts()
+        rollup_rows = await TaskDailyRollup.objects.aseries(start, end)
+        # Los gráficos usan la caché y Bokeh, que son síncronos
+        context = await sync_to_async(get_dashboard_context)(counts, rollup_rows, start, end)
+        return render(request, 'partials/dashboard_content.html', context)
+
+
+class AsyncEditTaskFormView(View):
+    """Vista para mostrar el formulario de edición inline"""
+    http_method_names = ['get', 'options']
+
+    async def get(self, request, task_id):
+        task = await aget_task(task_id)
+        return render(request, 'partials/edit_task_form.html', {'task': task})
+
+
+class AsyncColumnPageView(View):
+    """Vista para cargar la siguiente página de una columna (scroll infinito)"""
+    http_method_names = ['get', 'options']
+
+    async def get(self, request, column_type):
+        if column_type not in COLUMN_TYPES:
+            raise Http404("Columna inexistente")
+        try:
+            tasks, next_cursor = await aget_column_page(column_type, request.GET.get('cursor'))
+        except ValueError:
+            return HttpResponseBadRequest("Cursor inválido")
+        return render(request, 'partials/column_page.html', {
+            'tasks': tasks,
+            'column_type': column_type,
+            'next_cursor': next_cursor,
+        })
+
+
+class AsyncToggleTaskView(View):
+    """Vista para alternar el estado de completado de una tarea"""
+    http_method_names = ['post', 'options']
+
+    async def post(self, request, task_id):
+        try:
+            if not await Task.objects.filter(id=task_id).atoggle_completed():
+                raise Http404("Tarea inexistente")
+            task = await Task.objects.aget(id=task_id)
+        except Exception as e:
+            print(f"Error al alternar tarea: {e}")
+            return await arender_tasks_container(request)
+        return await arender_task_change(request, 'toggled', task, get_column_before_toggle(task))
+
+
+class AsyncCreateTaskView(View):
+    """Vista para crear tareas y devuelve HTML"""
+    http_method_names = ['post', 'options']
+
+    async def post(self, request):
+        title = request.POST.get('title', '').strip()
+        description = request.POST.get('description', '').strip()
+        if title:
+            try:
+                task = await Task.objects.acreate(title=title, description=description)
+            except Exception as e:
+                print(f"Error al crear tarea: {e}")
+            else:
+                return await arender_task_change(request, 'created', task)
+        return await arender_tasks_container(request)
+
+
+class AsyncUpdateTaskView(View):
+    """Vista para actualizar tareas y devuelve HTML"""
+    http_method_names = ['post', 'put', 'options']
+
+    async def post(self, request, task_id):
+        return await self.update(request, task_id)
+
+    async def put(self, request, task_id):
+        return await self.update(request, task_id)
+
+    async def update(self, request, task_id):
+        title = request.POST.get('title', '').strip()
+        description = request.POST.get('description', '').strip()
+        if title:
+            try:
+                task = await aget_task(task_id)
+                task.title = title
+                task.description = description
+                await task.asave()
+            except Exception as e:
+                print(f"Error al actualizar tarea: {e}")
+            else:
+                return await arender_task_change(request, 'updated', task, task.column_type)
+        return await arender_tasks_container(request)
+
+
+class AsyncDeleteTaskView(View):
+    """Vista para soft-delete de tareas"""
+    http_method_names = ['post', 'delete', 'options']
+
+    async def delete(self, request, task_id):
+        try:
+            task = await aget_task(task_id)
+            previous_column = task.column_type
+            task.deleted = True
+            # Escribir solo las columnas modificadas
+            await task.asave(update_fields=['deleted', 'updated_at'])
+        except Exception as e:
+            print(f"Error al eliminar tarea: {e}")
+            return await arender_tasks_container(request)
+        return await arender_task_change(request, 'deleted', task, previous_column)
+
+    async def post(self, request, task_id):
+        return await self.delete(request, task_id)
+
+
+class AsyncMoveTaskView(View):
+    """Vista para reordenar una tarea en su columna (arrastrar y soltar)"""
+    http_method_names = ['post', 'options']
+
+    async def post(self, request, task_id):
+        task = await aget_task(task_id)
+        try:
+            after_id = parse_move_after(request.POST.get('after'))
+            if after_id == task.id:
+                raise ValueError("Una tarea no puede ir bajo sí misma")
+            await amove_task(task, after_id)
+        except ValueError:
+            return HttpResponseBadRequest("Posición inválida")
+        get_broker().publish(build_task_event('moved', task, context=get_task_moved_context(task, after_id)))
+        return render(request, 'partials/task_fragments.html', get_task_fragments_context(task, task.column_type))
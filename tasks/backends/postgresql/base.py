@@ -0,0 +1,30 @@
+"""
+Backend PostgreSQL con pool de conexiones (tasks/pool.py).
+
+ENGINE = 'tasks.backends.postgresql', con CONN_MAX_AGE = 0 y la
+configuración del pool en DATABASES[alias]['POOL'].
+"""
+from django.db.backends.postgresql import base, creation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from tasks.pool import PooledDatabaseWrapperMixin, close_pools
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # DROP DATABASE falla si quedan conexiones del pool abiertas a la base de prueba
+        close_pools(self.connection.alias)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        # base.get_new_connection fija (y valida) el nivel de aislamiento, pero
+        # una conexión reutilizada del pool no pasa por ahí
+        self.isolation_level = IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', IsolationLevel.READ_COMMITTED)
+        )
+        return connection
@@ -0,0 +1,13 @@
+"""
+Backend SQLite con pool de conexiones (tasks/pool.py), para probar el pool
+sin PostgreSQL: ENGINE = 'tasks.backends.sqlite3'.
+"""
+from django.db.backends.sqlite3 import base
+
+from tasks.pool import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+    def uses_pool(self):
+        # Una base en memoria nunca se cierra (ver base.DatabaseWrapper.close)
+        return super().uses_pool() and not self.is_in_memory_db()
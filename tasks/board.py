@@ -0,0 +1,278 @@
+from asgiref.sync import sync_to_async
+
+from django.db import transaction
+from django.db.models import Q, Subquery
+from django.shortcuts import render
+from django.utils import timezone
+from .models import Task
+from .ranking import RANK_ALPHABET, needs_rebalance, rank_between, rebalance_column
+
+# Orden de las columnas en el tablero
+COLUMN_TYPES = ['pending', 'completed', 'deleted']
+
+# Filtro de cada columna del tablero
+COLUMN_FILTERS = {
+    'pending': Q(completed=False, deleted=False),
+    'completed': Q(completed=True, deleted=False),
+    'deleted': Q(deleted=True),
+}
+
+# Cantidad de tarjetas por página en cada columna
+COLUMN_PAGE_SIZE = 20
+
+# Selector del cuerpo de cada columna donde se insertan las tarjetas
+COLUMN_BODY_SELECTORS = {
+    'pending': '#pendingColumn .column__body',
+    'completed': '#completedColumn .column__body',
+    'deleted': '#deletedColumn .column__body',
+}
+
+
+def encode_cursor(task):
+    """Cursor de paginación (rank, id) de la última tarjeta de una página"""
+    return f"{task.rank}_{task.id}"
+
+
+def decode_cursor(cursor):
+    """Convierte un cursor en (rank, id); lanza ValueError si es inválido"""
+    rank, _, task_id = cursor.rpartition('_')
+    if not rank or rank.strip(RANK_ALPHABET):
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return rank, int(task_id)
+
+
+def get_column_queryset(column_type, cursor=None):
+    """
+    Página de tarjetas de la columna en su orden manual usando paginación por
+    keyset sobre (rank, id) en orden descendente, en vez de OFFSET, para que
+    el costo de cada página no dependa de la profundidad del scroll. Trae una
+    tarjeta extra para saber si hay una página siguiente.
+    """
+    queryset = Task.objects.filter(COLUMN_FILTERS[column_type]).order_by('-rank', '-id')
+    if cursor:
+        rank, task_id = decode_cursor(cursor)
+        queryset = queryset.filter(Q(rank__lt=rank) | Q(rank=rank, id__lt=task_id))
+    return queryset[:COLUMN_PAGE_SIZE + 1]
+
+
+def split_column_page(tasks):
+    """Retorna (tareas, cursor_siguiente) donde el cursor es None en la última página"""
+    if len(tasks) > COLUMN_PAGE_SIZE:
+        tasks = tasks[:COLUMN_PAGE_SIZE]
+        return tasks, encode_cursor(tasks[-1])
+    return tasks, None
+
+
+def get_column_page(column_type, cursor=None):
+    """Obtiene una página de tarjetas de la columna y el cursor de la siguiente"""
+    return split_column_page(list(get_column_queryset(column_type, cursor)))
+
+
+async def aget_column_page(column_type, cursor=None):
+    """Variante asíncrona de get_column_page() para las vistas ASGI"""
+    return split_column_page([task async for task in get_column_queryset(column_type, cursor)])
+
+
+def get_tasks_context(counts=None):
+    """
+    Obtiene el contexto de tareas organizadas por estado.
+    Cada columna trae solo su primera página; el resto se carga con scroll infinito.
+    `counts` evita repetir status_counts() si ya se consultó en la petición.
+    """
+    if counts is None:
+        counts = Task.objects.status_counts()
+    context = {'counts': counts, 'next_cursors': {}}
+    for column_type in COLUMN_TYPES:
+        tasks, next_cursor = get_column_page(column_type)
+        context[f'{column_type}_tasks'] = tasks
+        context['next_cursors'][column_type] = next_cursor
+    return context
+
+
+async def aget_tasks_context(counts=None):
+    """Variante asíncrona de get_tasks_context() para las vistas ASGI"""
+    if counts is None:
+        counts = await Task.objects.astatus_counts()
+    context = {'counts': counts, 'next_cursors': {}}
+    for column_type in COLUMN_TYPES:
+        tasks, next_cursor = await aget_column_page(column_type)
+        context[f'{column_type}_tasks'] = tasks
+        context['next_cursors'][column_type] = next_cursor
+    return context
+
+
+def render_tasks_container(request, counts=None):
+    """Renderiza el contenedor completo de tareas"""
+    return render(request, 'partials/tasks_container.html', get_tasks_context(counts))
+
+
+def wants_fragments(request):
+    """
+    Indica si la petición HTMX espera solo los fragmentos afectados.
+    Las peticiones que apuntan a #tasks-container reciben el contenedor completo;
+    el resto (tarjeta como target o hx-swap="none") recibe la tarjeta y los
+    contadores como swaps out-of-band.
+    """
+    if not request.headers.get('HX-Request'):
+        return False
+    return request.headers.get('HX-Target') != 'tasks-container'
+
+
+def get_columns_context(counts, *column_types):
+    """Contadores de las columnas afectadas a partir de status_counts()"""
+    return [
+        {'type': column_type, 'count': counts[column_type]}
+        for column_type in COLUMN_TYPES
+        if column_type in column_types
+    ]
+
+
+def get_column_before_toggle(task):
+    """Columna en la que estaba una tarea recién alternada"""
+    if task.deleted:
+        return 'deleted'
+    return 'pending' if task.completed else 'completed'
+
+
+def get_task_fragments_context(task, previous_column=None, counts=None):
+    """
+    Contexto de partials/task_fragments.html para una tarea modificada.
+    - Si la tarea sigue en la misma columna, la tarjeta es el contenido principal.
+    - Si cambió de columna (o es nueva), se elimina la tarjeta anterior y se
+      inserta la nueva vía hx-swap-oob, junto con los contadores afectados
+      (`counts` se consulta en una sola agregación si no se entrega).
+    """
+    column_type = task.column_type
+    context = {'task': task, 'task_id': task.id, 'column_type': column_type}
+    if previous_column == column_type:
+        context['inline'] = True
+    else:
+        if counts is None:
+            counts = Task.objects.status_counts()
+        context.update({
+            'counts': counts,
+            'remove_previous': previous_column is not None,
+            'insert_into': COLUMN_BODY_SELECTORS[column_type],
+            'columns': get_columns_context(counts, previous_column, column_type),
+        })
+    return context
+
+
+async def aget_task_fragments_context(task, previous_column=None):
+    """Variante asíncrona de get_task_fragments_context(); consulta los contadores solo si la tarjeta cambió de columna"""
+    counts = None
+    if previous_column != task.column_type:
+        counts = await Task.objects.astatus_counts()
+    return get_task_fragments_context(task, previous_column, counts)
+
+
+def parse_move_after(value):
+    """Id de la tarjeta bajo la que se soltó la tarea movida (None: arriba de todo)"""
+    return int(value) if value else None
+
+
+def get_move_neighbours_queryset(task, after_id):
+    """
+    Claves de las vecinas de la nueva posición en la columna de la tarea, en
+    una consulta: la tarjeta `after_id` y la que la sigue, o la primera de la
+    columna si la tarea va arriba de todo.
+    """
+    queryset = (
+        Task.objects.filter(COLUMN_FILTERS[task.column_type]).exclude(id=task.id)
+        .order_by('-rank', '-id').values_list('id', 'rank')
+    )
+    if after_id is None:
+        return queryset[:1]
+    after_rank = Subquery(Task.objects.filter(id=after_id).values('rank')[:1])
+    return queryset.filter(Q(rank__lt=after_rank) | Q(rank=after_rank, id__lte=after_id))[:2]
+
+
+def get_move_rank(after_id, rows):
+    """
+    Nueva clave de la tarea a partir de get_move_neighbours_queryset() y si
+    la columna debe reequilibrarse; ValueError si `after_id` no está en la
+    columna. Si las vecinas tienen la misma clave no hay una entre ambas: la
+    tarea toma la de arriba y la columna se reequilibra, igual que cuando las
+    claves crecen demasiado.
+    """
+    if after_id is None:
+        lower, upper = (rows[0][1] if rows else None), None
+    else:
+        if not rows or rows[0][0] != after_id:
+            raise ValueError(f"La tarea {after_id} no está en la columna")
+        lower, upper = (rows[1][1] if len(rows) > 1 else None), rows[0][1]
+    try:
+        rank = rank_between(lower, upper)
+    except ValueError:
+        return upper, True
+    return rank, needs_rebalance(rank)
+
+
+def move_task(task, after_id):
+    """
+    Mueve la tarea bajo la tarjeta `after_id` de su columna escribiendo solo
+    su clave y moved_at: mover no cuenta como edición, así que updated_at (y
+    la caché de la tarjeta) no cambian. Si las claves crecieron demasiado, la
+    columna se reequilibra en la misma transacción, antes de responder.
+    """
+    with transaction.atomic():
+        task.rank, rebalance = get_move_rank(after_id, list(get_move_neighbours_queryset(task, after_id)))
+        task.moved_at = timezone.now()
+        Task.objects.filter(id=task.id).update(rank=task.rank, moved_at=task.moved_at)
+        if rebalance:
+            rebalance_column(task.column_type)
+            task.rank = Task.objects.values_list('rank', flat=True).get(id=task.id)
+
+
+async def amove_task(task, after_id):
+    """Variante asíncrona de move_task() para las vistas ASGI: la transacción corre en un hilo"""
+    await sync_to_async(move_task)(task, after_id)
+
+
+def get_task_moved_context(task, after_id):
+    """
+    Contexto de partials/task_fragments.html para el evento de una tarjeta
+    movida: se quita de su lugar y se inserta bajo `after_id` (o arriba de la
+    columna) en las demás pestañas.
+    """
+    context = {'task': task, 'task_id': task.id, 'column_type': task.column_type, 'remove_previous': True}
+    if after_id is None:
+        context.update(insert_into=COLUMN_BODY_SELECTORS[task.column_type], insert_position='afterbegin')
+    else:
+        context.update(insert_into=f'#task-card-{after_id}', insert_position='afterend')
+    return context
+
+
+def get_task_removed_context(task_id, previous_column):
+    """Contexto para quitar la tarjeta de una tarea borrada definitivamente"""
+    return {
+        'task_id': task_id,
+        'remove_previous': True,
+        'columns': get_columns_context(Task.objects.status_counts(), previous_column),
+    }
+
+
+def render_task_fragments(request, task, previous_column=None, context=None):
+    """Renderiza solo la tarjeta modificada y los contadores afectados"""
+    if context is None:
+        context = get_task_fragments_context(task, previous_column)
+    return render(request, 'partials/task_fragments.html', context)
+
+
+def render_task_change(request, task, previous_column=None, context=None):
+    """
+    Respuesta HTMX de una mutación: los fragmentos de la tarea o el contenedor
+    completo (si se pidió o si la mutación falló y `task` es None). `context`
+    es el que retornó publish_task_event; se reutiliza para no repetir las
+    consultas del evento.
+    """
+    if task is not None and wants_fragments(request):
+        return render_task_fragments(request, task, previous_column, context)
+    return render_tasks_container(request, context.get('counts') if context else None)
+
+
+def render_task_removed(request, task_id, previous_column, context=None):
+    """Elimina la tarjeta de una tarea borrada definitivamente y actualiza su contador"""
+    if context is None:
+        context = get_task_removed_context(task_id, previous_column)
+    return render(request, 'partials/task_fragments.html', context)
@@ -0,0 +1,108 @@
+"""
+Caché del HTML de las tarjetas del tablero (partials/task_card.html).
+
+Cada tarjeta se cachea con la clave (id, updated_at, column_type): toda
+mutación de una tarea actualiza updated_at (auto_now, toggle_completed,
+soft_delete y las operaciones masivas), así que una tarjeta modificada apunta
+a una clave nueva y nunca hace falta invalidar. Las entradas viejas se
+descartan por antigüedad de uso.
+
+Hay dos niveles:
+- Un LRU acotado en memoria de cada proceso (TASK_CARD_CACHE_SIZE tarjetas).
+- Opcionalmente un backend de caché compartido entre workers
+  (TASK_CARD_CACHE_ALIAS, un alias de CACHES), consultado con un solo
+  get_many() por página de tarjetas.
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import get_template
+from django.utils import timezone, translation
+from django.utils.safestring import mark_safe
+
+# Segundos que se conservan las tarjetas en la caché compartida
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class LRUCache:
+    """Diccionario acotado que descarta la entrada usada hace más tiempo"""
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local_cards = LRUCache(settings.TASK_CARD_CACHE_SIZE)
+
+
+def get_shared_cache():
+    """Backend compartido configurado o None si solo se usa el LRU local"""
+    alias = settings.TASK_CARD_CACHE_ALIAS
+    return caches[alias] if alias else None
+
+
+def get_card_cache_key(task, column_type, oob=False):
+    """
+    Clave de la tarjeta. Incluye el idioma y la zona horaria activos porque el
+    filtro date de la plantilla depende de ambos.
+    """
+    return "task-card:{}:{}:{}:{}:{}:{}".format(
+        task.id,
+        task.updated_at.timestamp(),
+        column_type,
+        int(bool(oob)),
+        translation.get_language(),
+        timezone.get_current_timezone_name(),
+    )
+
+
+def render_task_cards(tasks, column_type, oob=False):
+    """Retorna el HTML de cada tarjeta, renderizando solo las que no están en caché"""
+    keys = [get_card_cache_key(task, column_type, oob) for task in tasks]
+    cards = {key: local_cards.get(key) for key in keys}
+
+    missing = [key for key in keys if cards[key] is None]
+    shared = get_shared_cache()
+    if missing and shared is not None:
+        for key, html in shared.get_many(missing).items():
+            cards[key] = html
+            local_cards.set(key, html)
+
+    rendered = {}
+    template = None
+    for task, key in zip(tasks, keys):
+        if cards[key] is None:
+            template = template or get_template('partials/task_card.html')
+            cards[key] = rendered[key] = template.render({
+                'task': task, 'column_type': column_type, 'oob': oob,
+            })
+            local_cards.set(key, cards[key])
+    if rendered and shared is not None:
+        shared.set_many(rendered, CARD_CACHE_TIMEOUT)
+
+    return [mark_safe(cards[key]) for key in keys]
+
+
+def render_task_card(task, column_type, oob=False):
+    """HTML de una sola tarjeta"""
+    return render_task_cards([task], column_type, oob)[0]
@@ -0,0 +1,189 @@
+from datetime import timedelta
+import hashlib
+from django.core.cache import cache
+import math
+from .instrumentation import timed
+
+# Segundos que se conservan los gráficos en caché
+CHARTS_CACHE_TIMEOUT = 60 * 60
+
+
+def get_charts_cache_key(pending_tasks, completed_tasks, deleted_tasks):
+    return f"dashboard-charts:{pending_tasks}:{completed_tasks}:{deleted_tasks}"
+
+
+def get_dashboard_charts(pending_tasks, completed_tasks, deleted_tasks):
+    """
+    Retorna los pares script/div de los gráficos del dashboard.
+    Los gráficos dependen solo de los conteos por estado, por lo que se cachean
+    con esa tupla como clave: cualquier mutación que cambie los conteos apunta a
+    una clave nueva, y un dashboard sin cambios no ejecuta Bokeh.
+    """
+    key = get_charts_cache_key(pending_tasks, completed_tasks, deleted_tasks)
+    charts = cache.get(key)
+    if charts is None:
+        with timed('bokeh'):
+            charts = build_dashboard_charts(pending_tasks, completed_tasks, deleted_tasks)
+        cache.set(key, charts, CHARTS_CACHE_TIMEOUT)
+    return charts
+
+
+def build_dashboard_charts(pending_tasks, completed_tasks, deleted_tasks):
+    """
+    Construye con Bokeh el gráfico de torta y el de barras.
+    Bokeh se importa aquí y no a nivel de módulo para que los workers que solo
+    atienden el tablero o la API no paguen su costo de importación al arrancar.
+    """
+    from bokeh.plotting import figure
+    from bokeh.embed import components
+
+    total_tasks = pending_tasks + completed_tasks + deleted_tasks
+    charts = {}
+
+    # Gráfico tipo pie
+    if total_tasks > 0:
+        data = {
+            'status': ['Pendientes', 'Completadas', 'Eliminadas'],
+            'count': [pending_tasks, completed_tasks, deleted_tasks],
+            'color': ['#EAB308', '#22C55E', '#EF4444']
+        }
+
+        angles = []
+        for count in data['count']:
+            angle = (count / total_tasks) * 2 * math.pi
+            angles.append(angle)
+
+        pie_chart = figure(
+            width=500,
+            height=400,
+            title="Distribución de Tareas por Estado",
+            toolbar_location=None,
+            tools="hover",
+            tooltips="@status: @count",
+            x_range=(-0.5, 1.0)
+        )
+
+        start_angle = 0
+        for i, (status, count, color, angle) in enumerate(zip(data['status'], data['count'], data['color'], angles)):
+            if count > 0:
+                pie_chart.wedge(
+                    x=0, y=1,
+                    radius=0.4,
+                    start_angle=start_angle,
+                    end_angle=start_angle + angle,
+                    color=color,
+                    alpha=0.8,
+                    legend_label=f"{status}: {count}"
+                )
+                start_angle += angle
+
+        pie_chart.axis.axis_label = None
+        pie_chart.axis.visible = False
+        pie_chart.grid.grid_line_color = None
+        pie_chart.legend.location = "top_right"
+
+        script_pie, div_pie = components(pie_chart)
+        charts['script_pie'] = script_pie
+        charts['div_pie'] = div_pie
+    else:
+        charts['script_pie'] = ''
+        charts['div_pie'] = '<p class="text-center text-gray-500">No hay datos para mostrar</p>'
+
+    # Gráfico de barras
+    bar_chart = figure(
+        x_range=['Pendientes', 'Completadas', 'Eliminadas'],
+        width=500,
+        height=400,
+        title="Comparación de Tareas por Estado",
+        toolbar_location=None,
+        tools=""
+    )
+
+    bar_chart.vbar(
+        x=['Pendientes', 'Completadas', 'Eliminadas'],
+        top=[pending_tasks, completed_tasks, deleted_tasks],
+        width=0.6,
+        color=['#EAB308', '#22C55E', '#EF4444'],
+        alpha=0.8
+    )
+
+    bar_chart.xgrid.grid_line_color = None
+    bar_chart.y_range.start = 0
+    bar_chart.yaxis.axis_label = "Cantidad de Tareas"
+
+    script_bar, div_bar = components(bar_chart)
+    charts['script_bar'] = script_bar
+    charts['div_bar'] = div_bar
+    
+    return charts
+
+
+def get_trend_chart(rows, start, end):
+    """
+    Retorna el par script/div del gráfico de líneas de tareas creadas,
+    completadas y eliminadas por día entre `start` y `end`, a partir de las
+    filas de TaskDailyRollup.objects.series(). Se cachea con el rango y un
+    hash de las filas: una escritura que cambia un día del rango cambia la clave.
+    """
+    digest = hashlib.md5(repr(rows).encode()).hexdigest()
+    key = f"dashboard-trend:{start}:{end}:{digest}"
+    chart = cache.get(key)
+    if chart is None:
+        with timed('bokeh'):
+            chart = build_trend_chart(rows, start, end)
+        cache.set(key, chart, CHARTS_CACHE_TIMEOUT)
+    return chart
+
+
+def build_trend_chart(rows, start, end):
+    """Construye con Bokeh el gráfico de líneas; los días sin fila valen cero"""
+    from bokeh.embed import components
+    from bokeh.models import ColumnDataSource, HoverTool
+    from bokeh.plotting import figure
+
+    by_day = {day: counts for day, *counts in rows}
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    data = {'day': days, 'created': [], 'completed': [], 'deleted': []}
+    for day in days:
+        created, completed, deleted = by_day.get(day, (0, 0, 0))
+        data['created'].append(created)
+        data['completed'].append(completed)
+        data['deleted'].append(deleted)
+    source = ColumnDataSource(data)
+
+    trend_chart = figure(
+        x_axis_type='datetime',
+        height=350,
+        sizing_mode='stretch_width',
+        title="Tareas por Día",
+        toolbar_location=None,
+        tools="",
+    )
+    lines = [
+        ('created', 'Creadas', '#3B82F6'),
+        ('completed', 'Completadas', '#22C55E'),
+        ('deleted', 'Eliminadas', '#EF4444'),
+    ]
+    renderers = [
+        trend_chart.line(x='day', y=column, source=source, line_width=2, color=color, legend_label=label)
+        for column, label, color in lines
+    ]
+    # Un solo tooltip por día con los tres valores
+    trend_chart.add_tools(HoverTool(
+        renderers=renderers[:1],
+        tooltips=[
+            ("Día", "@day{%F}"),
+            ("Creadas", "@created"),
+            ("Completadas", "@completed"),
+            ("Eliminadas", "@deleted"),
+        ],
+        formatters={'@day': 'datetime'},
+        mode='vline',
+    ))
+
+    trend_chart.y_range.start = 0
+    trend_chart.yaxis.axis_label = "Cantidad de Tareas"
+    trend_chart.legend.location = "top_left"
+
+    script_trend, div_trend = components(trend_chart)
+    return {'script_trend': script_trend, 'div_trend': div_trend}
@@ -0,0 +1,65 @@
+"""
+GET condicional (ETag / 304) para el tablero, el dashboard y el listado de la API.
+
+El ETag se deriva de Task.objects.revision(), que cuesta una consulta indexada,
+por lo que una respuesta 304 evita las consultas de la vista y el render.
+No se envía Last-Modified: max(updated_at) no refleja los borrados definitivos,
+así que solo el ETag (que incluye la cantidad de tareas) es confiable.
+
+Con vistas asíncronas la revisión se consulta antes con el ORM asíncrono y se
+deja en request.tasks_revision, porque condition() llama a etag_func de forma
+síncrona dentro del event loop.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import Task
+
+
+def tasks_etag(request, *args, **kwargs):
+    """
+    ETag de la respuesta: versión de las tareas más todo lo que cambia el
+    contenido (URL, variante HTMX, el token CSRF embebido en el HTML y la
+    fecha local, de la que depende el rango por defecto del dashboard).
+    """
+    revision = getattr(request, 'tasks_revision', None)
+    last_modified, last_moved, total = revision if revision is not None else Task.objects.revision()
+    parts = [
+        str(total),
+        last_modified.isoformat() if last_modified else '',
+        last_moved.isoformat() if last_moved else '',
+        request.path,
+        request.META.get('QUERY_STRING', ''),
+        request.headers.get('HX-Request', ''),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        timezone.localdate().isoformat(),
+    ]
+    return hashlib.md5('|'.join(parts).encode()).hexdigest()
+
+
+def conditional_on_tasks(view_func):
+    """Responde 304 si el ETag del cliente sigue vigente y obliga a revalidar siempre"""
+    conditional_view = condition(etag_func=tasks_etag)(view_func)
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            request.tasks_revision = await Task.objects.arevision()
+            response = await conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, no_cache=True)
+            return response
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response = conditional_view(request, *args, **kwargs)
+        patch_cache_control(response, no_cache=True)
+        return response
+    return wrapper
@@ -0,0 +1,132 @@
+"""
+Eventos de cambios en las tareas para actualizar el tablero en vivo (SSE).
+
+Las vistas publican un evento por mutación (created, toggled, updated, deleted)
+con el HTML de los fragmentos out-of-band ya renderizado, una sola vez por
+evento. El broker reparte el evento a todas las conexiones abiertas de
+/events/. El backend se configura con el setting TASK_EVENTS_BROKER y debe
+implementar publish(event) y el generador asíncrono listen().
+
+InProcessBroker no cruza procesos: el que publica y las conexiones que lo
+escuchan deben estar en el mismo worker. Por eso el despliegue (render.yaml)
+corre un solo worker ASGI que sirve tanto las vistas como /events/. Para
+varios workers, o para servir las vistas con WSGI y solo /events/ con ASGI,
+hace falta un broker entre procesos en TASK_EVENTS_BROKER.
+"""
+import asyncio
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .board import get_task_fragments_context, get_task_removed_context
+
+# Eventos que pueden llegar al cliente (ver sse-swap en home.html)
+TASK_EVENTS = ['created', 'toggled', 'updated', 'deleted', 'moved']
+
+# Evento que pide recargar el contenedor completo (operaciones masivas)
+REFRESH_EVENT = 'refresh'
+
+
+class InProcessBroker:
+    """
+    Broker en memoria del proceso. Cada suscriptor tiene una cola acotada en
+    su event loop; publish() se puede llamar desde cualquier hilo (las vistas
+    síncronas corren en un threadpool bajo ASGI). Si un cliente lento llena su
+    cola, se descartan sus eventos más antiguos en vez de bloquear al resto.
+    """
+    def __init__(self, max_queued_events=100):
+        self.max_queued_events = max_queued_events
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.deliver, queue, event)
+            except RuntimeError:
+                # El event loop del suscriptor ya se cerró
+                with self.lock:
+                    self.subscribers.discard((loop, queue))
+
+    def deliver(self, queue, event):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    async def listen(self):
+        """Generador asíncrono con los eventos publicados desde que se suscribe"""
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.max_queued_events))
+        with self.lock:
+            self.subscribers.add(subscriber)
+        try:
+            while True:
+                yield await subscriber[1].get()
+        finally:
+            with self.lock:
+                self.subscribers.discard(subscriber)
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    """Instancia única del broker configurado en TASK_EVENTS_BROKER"""
+    return import_string(settings.TASK_EVENTS_BROKER)()
+
+
+def publish_event(event):
+    """Publica el evento cuando se confirma la transacción en curso"""
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def build_task_event(kind, task, previous_column=None, context=None):
+    """
+    Evento con los fragmentos de una tarea creada, alternada, actualizada,
+    eliminada (soft-delete) o movida. `context` permite reutilizar el contexto ya
+    calculado para la respuesta. Siempre se elimina la tarjeta anterior antes
+    de insertarla para que aplicar el evento sea idempotente, incluso en la
+    pestaña que originó el cambio y ya recibió su propia respuesta.
+    """
+    context = dict(context or get_task_fragments_context(task, previous_column), oob=True)
+    if 'insert_into' in context:
+        context['remove_previous'] = True
+    return {'event': kind, 'data': render_to_string('partials/task_fragments.html', context)}
+
+
+def publish_task_event(kind, task, previous_column=None, context=None):
+    """
+    Publica el evento de una tarea al confirmarse la transacción. Retorna el
+    contexto de los fragmentos para reutilizarlo en la respuesta (ver
+    board.render_task_change).
+    """
+    if context is None:
+        context = get_task_fragments_context(task, previous_column)
+    publish_event(build_task_event(kind, task, previous_column, context))
+    return context
+
+
+def publish_task_removed(task_id, previous_column):
+    """
+    Publica el borrado definitivo de una tarea. Retorna el contexto de los
+    fragmentos para reutilizarlo en la respuesta (ver board.render_task_removed).
+    """
+    context = get_task_removed_context(task_id, previous_column)
+    html = render_to_string('partials/task_fragments.html', context)
+    publish_event({'event': 'deleted', 'data': html})
+    return context
+
+
+def publish_refresh():
+    """Pide a los clientes recargar el contenedor completo"""
+    publish_event({'event': REFRESH_EVENT, 'data': ''})
+
+
+def format_sse(event):
+    """Serializa un evento en el formato text/event-stream"""
+    lines = [f"event: {event['event']}"]
+    lines.extend(f"data: {line}" for line in event['data'].splitlines() or [''])
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,167 @@
+"""
+Instrumentación por petición: tiempo y cantidad de consultas SQL, render de
+plantillas, construcción de gráficos Bokeh y serialización de la API.
+
+Los tiempos se acumulan en un objeto RequestTimings guardado en una
+ContextVar, así que llegan tanto desde vistas síncronas como asíncronas (el
+contexto se copia a los hilos de sync_to_async). ServerTimingMiddleware los
+expone en la cabecera Server-Timing, los escribe como una línea JSON en el
+logger tasks.performance (con nivel INFO, ver PERFORMANCE_LOG_LEVEL) y los acumula en los histogramas de tasks/metrics.py.
+Con QUERY_DETECTOR además guarda cada consulta con su origen para advertir
+consultas duplicadas y N+1 (ver tasks/querydetector.py).
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+from .metrics import REQUEST_DURATION, DB_DURATION, DB_QUERIES, PHASE_DURATION
+from .querydetector import QueryRecord, get_query_origin, report_query_issues
+
+logger = logging.getLogger('tasks.performance')
+
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """Tiempos acumulados de una petición, en segundos, por fase"""
+    def __init__(self, record_queries=False):
+        self.start = time.perf_counter()
+        self.db_time = 0
+        self.db_queries = 0
+        # QueryRecord de cada consulta, solo con el detector activo
+        self.queries = [] if record_queries else None
+        self.phases = {}
+        # Fases en curso: una plantilla renderizada dentro de otra no se cuenta dos veces
+        self.active = set()
+
+    def add(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0) + seconds
+
+
+@contextmanager
+def timed(phase):
+    """Suma la duración del bloque a la fase de la petición en curso, si la hay"""
+    timings = current_timings.get()
+    if timings is None or phase in timings.active:
+        yield
+        return
+    timings.active.add(phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+        timings.active.discard(phase)
+
+
+def record_query(execute, sql, params, many, context):
+    """execute_wrapper que cuenta y mide las consultas de la petición en curso"""
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    if timings.queries is not None:
+        timings.queries.append(QueryRecord(sql, params, get_query_origin()))
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_time += time.perf_counter() - start
+        timings.db_queries += 1
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Receptor de connection_created: agrega record_query a cada conexión nueva"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed('template'):
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """Backend de plantillas de Django que mide el tiempo de render de cada petición"""
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
+
+
+class ServerTimingMiddleware:
+    """
+    Mide cada petición y agrega la cabecera Server-Timing, por ejemplo:
+    Server-Timing: db;dur=3.1;desc="5 consultas", template;dur=8.2, total;dur=14.9
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.detect_queries = settings.QUERY_DETECTOR
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings(self.detect_queries)
+        token = current_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.finish(request, response, timings)
+        return response
+
+    async def __acall__(self, request):
+        timings = RequestTimings(self.detect_queries)
+        token = current_timings.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        self.finish(request, response, timings)
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.start
+        match = request.resolver_match
+        view = match.view_name if match and match.view_name else 'unresolved'
+        labels = (view, request.method)
+
+        parts = [f'db;dur={timings.db_time * 1000:.1f};desc="{timings.db_queries} consultas"']
+        parts.extend(f"{phase};dur={seconds * 1000:.1f}" for phase, seconds in timings.phases.items())
+        parts.append(f"total;dur={total * 1000:.1f}")
+        response['Server-Timing'] = ", ".join(parts)
+
+        REQUEST_DURATION.observe(total, *labels, response.status_code)
+        DB_DURATION.observe(timings.db_time, *labels)
+        DB_QUERIES.observe(timings.db_queries, *labels)
+        for phase, seconds in timings.phases.items():
+            PHASE_DURATION.observe(seconds, *labels, phase)
+
+        # Desactivado por defecto (PERFORMANCE_LOG_LEVEL=INFO lo activa): sin
+        # armar la línea JSON en cada petición
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'total_ms': round(total * 1000, 2),
+                'db_ms': round(timings.db_time * 1000, 2),
+                'db_queries': timings.db_queries,
+                **{f"{phase}_ms": round(seconds * 1000, 2) for phase, seconds in timings.phases.items()},
+            }))
+        if timings.queries:
+            report_query_issues(view, request, timings.queries)
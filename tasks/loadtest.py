@@ -0,0 +1,195 @@
+"""
+Escenarios de la suite de carga (ver el comando benchmark_endpoints).
+
+Cada escenario es una petición a un endpoint del tablero HTMX o de la API
+REST. Se ejecuta en proceso con django.test.Client para medir, por petición,
+la latencia, las consultas SQL (CaptureQueriesContext) y los bytes de la
+respuesta, sin depender de la red ni de un servidor externo.
+"""
+import json
+import time
+from collections import namedtuple
+from itertools import cycle
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .board import get_column_page
+
+# Métricas de cada escenario que se comparan contra la línea base (la mediana
+# de la latencia; el p95 y el p99 se reportan pero son demasiado ruidosos
+# con pocas peticiones para decidir una regresión)
+TRACKED_METRICS = ['p50_ms', 'queries', 'bytes']
+
+# Cabeceras de una petición HTMX que espera solo los fragmentos afectados
+HTMX = {'HTTP_HX_REQUEST': 'true'}
+
+# Tareas por petición en los endpoints masivos
+BULK_SIZE = 20
+
+# `request(client)` hace una petición y retorna la respuesta
+Scenario = namedtuple('Scenario', ['name', 'status', 'request'])
+
+
+class TaskIds:
+    """
+    Reparte ids de tareas existentes entre los escenarios. Los que solo
+    modifican la tarea reutilizan un grupo fijo; los que la borran toman ids
+    nuevos para no pedir tareas que ya no existen.
+    """
+    def __init__(self, ids, reusable=200):
+        self.reusable = cycle(ids[:reusable])
+        self.disposable = iter(ids[reusable:])
+
+    def reuse(self):
+        return next(self.reusable)
+
+    def take(self, count=None):
+        if count is None:
+            return next(self.disposable)
+        return [next(self.disposable) for _ in range(count)]
+
+
+def get_etag(client, path, **headers):
+    """ETag vigente de la página; la primera petición fija la cookie CSRF, que forma parte del ETag"""
+    client.get(path, **headers)
+    return client.get(path, **headers)['ETag']
+
+
+def get_next_page(client, path):
+    """URL relativa de la segunda página de un listado paginado por cursor"""
+    next_url = client.get(path).json()['next']
+    if not next_url:
+        return path
+    parts = urlsplit(next_url)
+    return f"{parts.path}?{parts.query}"
+
+
+def json_request(client, method, path, data):
+    return getattr(client, method)(path, json.dumps(data), content_type='application/json')
+
+
+def build_scenarios(client, ids):
+    """Escenarios del tablero HTMX y de /api/tasks/ con sus estados esperados"""
+    _, deleted_cursor = get_column_page('deleted')
+    home_etag = get_etag(client, '/', **HTMX)
+    api_list = reverse('tasks-list')
+    api_next_page = get_next_page(client, api_list)
+
+    def task_url(name, task_id):
+        return reverse(name, args=[task_id])
+
+    return [
+        Scenario('home', 200, lambda c: c.get('/')),
+        Scenario('home_htmx', 200, lambda c: c.get('/', **HTMX)),
+        Scenario('home_not_modified', 304, lambda c: c.get('/', HTTP_IF_NONE_MATCH=home_etag, **HTMX)),
+        Scenario('column_page', 200, lambda c: c.get(
+            reverse('column_page', args=['deleted']), {'cursor': deleted_cursor or ''}, **HTMX
+        )),
+        Scenario('dashboard', 200, lambda c: c.get(reverse('dashboard'), **HTMX)),
+        Scenario('search', 200, lambda c: c.get(reverse('search_tasks'), {'q': 'tarea de prue'}, **HTMX)),
+        Scenario('edit_form', 200, lambda c: c.get(task_url('edit_task', ids.reuse()), **HTMX)),
+        Scenario('htmx_create', 200, lambda c: c.post(
+            reverse('api_create_task'), {'title': "Tarea de carga", 'description': "Creada por la suite"}, **HTMX
+        )),
+        Scenario('htmx_toggle', 200, lambda c: c.post(task_url('api_toggle_task', ids.reuse()), **HTMX)),
+        Scenario('htmx_update', 200, lambda c: c.post(
+            task_url('api_update_task', ids.reuse()), {'title': "Tarea editada", 'description': ""}, **HTMX
+        )),
+        Scenario('htmx_delete', 200, lambda c: c.post(task_url('api_delete_task', ids.reuse()), **HTMX)),
+        Scenario('htmx_move', 200, lambda c: c.post(task_url('api_move_task', ids.reuse()), {'after': ''}, **HTMX)),
+        Scenario('api_list', 200, lambda c: c.get(api_list)),
+        Scenario('api_list_filtered', 200, lambda c: c.get(
+            api_list, {'completed': 'false', 'deleted': 'false', 'fields': 'id,title,completed'}
+        )),
+        Scenario('api_list_next_page', 200, lambda c: c.get(api_next_page)),
+        Scenario('api_search', 200, lambda c: c.get(api_list, {'q': 'descripción generada'})),
+        Scenario('api_create', 201, lambda c: json_request(c, 'post', api_list, {
+            'title': "Tarea de carga", 'description': "Creada por la suite",
+        })),
+        Scenario('api_update', 200, lambda c: json_request(c, 'put', task_url('tasks-detail', ids.reuse()), {
+            'title': "Tarea editada", 'description': "", 'completed': False, 'deleted': False,
+        })),
+        Scenario('api_partial_update', 200, lambda c: json_request(
+            c, 'patch', task_url('tasks-detail', ids.reuse()), {'completed': True}
+        )),
+        Scenario('api_toggle', 200, lambda c: c.post(task_url('tasks-toggle', ids.reuse()))),
+        Scenario('api_destroy', 204, lambda c: c.delete(task_url('tasks-detail', ids.take()))),
+        Scenario('api_bulk_create', 201, lambda c: json_request(c, 'post', reverse('tasks-bulk-create'), [
+            {'title': f"Tarea masiva {number}"} for number in range(BULK_SIZE)
+        ])),
+        Scenario('api_bulk_update', 200, lambda c: json_request(c, 'post', reverse('tasks-bulk-update'), [
+            {'id': ids.reuse(), 'title': "Tarea editada en lote"} for _ in range(BULK_SIZE)
+        ])),
+        Scenario('api_bulk_toggle', 200, lambda c: json_request(c, 'post', reverse('tasks-bulk-toggle'), {
+            'ids': [ids.reuse() for _ in range(BULK_SIZE)],
+        })),
+        Scenario('api_bulk_delete', 200, lambda c: json_request(c, 'post', reverse('tasks-bulk-delete'), {
+            'ids': ids.take(BULK_SIZE),
+        })),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_scenario(client, scenario, requests, warmup=3):
+    """
+    Ejecuta el escenario y retorna sus métricas. Las consultas y los bytes
+    reportados son el máximo observado, para que una variación ocasional no
+    quede oculta en un promedio.
+    """
+    latencies, queries, sizes = [], [], []
+    for number in range(warmup + requests):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = scenario.request(client)
+            elapsed = time.perf_counter() - start
+        if response.status_code != scenario.status:
+            raise AssertionError(
+                f"{scenario.name}: se esperaba {scenario.status} y se obtuvo {response.status_code}"
+            )
+        if number >= warmup:
+            latencies.append(elapsed * 1000)
+            queries.append(len(captured))
+            sizes.append(len(response.content))
+    latencies.sort()
+    return {
+        'p50_ms': percentile(latencies, 0.50),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'queries': max(queries),
+        'bytes': max(sizes),
+    }
+
+
+def find_regressions(results, baseline, thresholds, latency_slack_ms=5):
+    """
+    Compara los resultados con la línea base. `thresholds` indica el aumento
+    relativo tolerado por métrica (0 para las consultas: cualquier consulta
+    extra es una regresión). Las latencias además toleran `latency_slack_ms`
+    absolutos, para que el ruido en endpoints de pocos milisegundos no falle.
+    Retorna una lista de mensajes.
+    """
+    regressions = []
+    for key, metrics in results.items():
+        if key not in baseline:
+            continue
+        for metric in TRACKED_METRICS:
+            limit = baseline[key][metric] * (1 + thresholds[metric])
+            if metric.endswith('_ms'):
+                limit = max(limit, baseline[key][metric] + latency_slack_ms)
+            if metrics[metric] > limit:
+                regressions.append(
+                    f"{key} {metric}: {metrics[metric]:.1f} > {limit:.1f} (línea base {baseline[key][metric]:.1f})"
+                )
+    return regressions
+
+
+def new_client():
+    """Cliente con un host permitido por ALLOWED_HOSTS"""
+    return Client(HTTP_HOST='localhost')
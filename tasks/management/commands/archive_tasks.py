@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from tasks.archive import JSONLArchive, TableArchive, archive_deleted_tasks, get_archivable_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Archiva las tareas eliminadas hace más de --days días y las borra de la tabla de tareas. "
+        "Trabaja por lotes (una transacción por lote) y puede volver a ejecutarse si se interrumpe. "
+        "Se restauran con restore_tasks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.TASK_ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--to', choices=['table', 'file'], default='table',
+            help="Destino: la tabla ArchivedTask o un archivo JSONL comprimido con gzip",
+        )
+        parser.add_argument(
+            '--output', help="Archivo de destino con --to file (por defecto en TASK_ARCHIVE_DIR)",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Solo cuenta las tareas a archivar")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        if options['dry_run']:
+            count = get_archivable_queryset(cutoff).count()
+            self.stdout.write(f"{count} tareas eliminadas antes de {cutoff:%Y-%m-%d %H:%M} se archivarían.")
+            return
+
+        if options['to'] == 'file':
+            path = options['output']
+            if path is None:
+                settings.TASK_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+                path = settings.TASK_ARCHIVE_DIR / f"tasks-{timezone.now():%Y%m%d-%H%M%S}.jsonl.gz"
+            archive = JSONLArchive(path)
+            destination = str(path)
+        else:
+            archive = TableArchive()
+            destination = "la tabla de archivo"
+
+        archived = 0
+        try:
+            for archived in archive_deleted_tasks(cutoff, archive, batch_size=options['batch_size']):
+                self.stdout.write(f"  {archived} tareas archivadas...")
+        finally:
+            archive.close()
+        self.stdout.write(self.style.SUCCESS(f"{archived} tareas archivadas en {destination}."))
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.rollups import BACKFILL_BATCH_SIZE, compare_rollups, get_models, rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los conteos diarios del dashboard (TaskDailyRollup) desde Task y ArchivedTask, "
+        "recorriendo las tablas por rangos de id con una consulta agrupada por día en cada rango. "
+        "Las escrituras de tareas esperan hasta que termine. Con --verify solo compara la tabla "
+        "con el recálculo y falla si difieren."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE, help="Ids por rango")
+        parser.add_argument('--verify', action='store_true', help="Comparar sin escribir")
+
+    def handle(self, *args, **options):
+        rollup_model, models = get_models()
+
+        def progress(model, last_id):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {model._meta.object_name} hasta el id {last_id}...")
+
+        start = time.perf_counter()
+        if options['verify']:
+            differences = compare_rollups(rollup_model, models, batch_size=options['batch_size'], progress=progress)
+            if differences:
+                lines = [f"{day}: guardado {stored}, recalculado {expected}" for day, stored, expected in differences]
+                raise CommandError(f"{len(differences)} días difieren:\n  " + "\n  ".join(lines[:20]))
+            self.stdout.write(self.style.SUCCESS(
+                f"Conteos diarios correctos ({time.perf_counter() - start:.2f}s)."
+            ))
+            return
+
+        totals = rebuild_rollups(rollup_model, models, batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(totals)} días recalculados en {time.perf_counter() - start:.2f}s."
+        ))
@@ -0,0 +1,99 @@
+import json
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from tasks.loadtest import TaskIds, build_scenarios, find_regressions, new_client, run_scenario
+from tasks.models import Task
+from tasks.seeding import seed_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Suite de carga reproducible: crea una base de datos de prueba (SQLite o PostgreSQL "
+        "según DATABASE_URL), carga N tareas con bulk_create y recorre el tablero, el "
+        "dashboard, las mutaciones de api-htmx y las rutas de /api/tasks/, reportando "
+        "latencias p50/p95/p99, consultas por petición y bytes de respuesta. Con --baseline "
+        "falla si alguna métrica empeora más allá del umbral."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tasks', type=int, nargs='+', default=[10000],
+            help="Tamaños del tablero a medir, en orden creciente (ej. --tasks 10000 100000 1000000)",
+        )
+        parser.add_argument('--requests', type=int, default=30, help="Peticiones medidas por escenario")
+        parser.add_argument('--only', nargs='+', help="Ejecutar solo estos escenarios")
+        parser.add_argument('--keepdb', action='store_true', help="Conservar la base de prueba (y sus tareas) entre ejecuciones")
+        parser.add_argument('--output', help="Guardar los resultados en este archivo JSON")
+        parser.add_argument('--baseline', help="Archivo JSON de una ejecución anterior para comparar")
+        parser.add_argument('--latency-threshold', type=float, default=0.25, help="Aumento tolerado de la latencia p50 (0.25 = 25%%)")
+        parser.add_argument('--latency-slack-ms', type=float, default=5, help="Aumento absoluto de la latencia siempre tolerado")
+        parser.add_argument('--bytes-threshold', type=float, default=0.05, help="Aumento tolerado de los bytes de respuesta")
+        parser.add_argument('--queries-threshold', type=float, default=0, help="Aumento tolerado de las consultas por petición")
+
+    def handle(self, *args, **options):
+        # Una línea JSON por petición taparía el reporte
+        logging.getLogger('tasks.performance').setLevel(logging.WARNING)
+
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+
+        # Base de datos de prueba aislada: nunca se tocan los datos reales
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            results = {}
+            for size in sorted(options['tasks']):
+                results.update(self.benchmark_size(size, options))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+
+        if options['output']:
+            with open(options['output'], 'w') as output_file:
+                json.dump({'vendor': connection.vendor, 'results': results}, output_file, indent=2)
+            self.stdout.write(f"Resultados guardados en {options['output']}")
+
+        if baseline is not None:
+            regressions = find_regressions(results, baseline, {
+                'p50_ms': options['latency_threshold'],
+                'bytes': options['bytes_threshold'],
+                'queries': options['queries_threshold'],
+            }, options['latency_slack_ms'])
+            if regressions:
+                raise CommandError("Regresiones respecto a la línea base:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS("Sin regresiones respecto a la línea base"))
+
+    def benchmark_size(self, size, options):
+        """Completa el tablero hasta `size` tareas y mide todos los escenarios"""
+        existing = Task.objects.count()
+        if existing < size:
+            self.stdout.write(f"Cargando {size - existing} tareas...")
+            seed_tasks(size - existing, seed=existing)
+
+        # Ids suficientes para los escenarios que borran tareas (incluye el calentamiento)
+        needed = 200 + (options['requests'] + 3) * 25
+        ids = list(Task.objects.order_by('-id').values_list('id', flat=True)[:needed])
+        client = new_client()
+        scenarios = build_scenarios(client, TaskIds(ids))
+        if options['only']:
+            scenarios = [scenario for scenario in scenarios if scenario.name in options['only']]
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"\n{connection.vendor}, {size:,} tareas ({options['requests']} peticiones por escenario)"
+        ))
+        self.stdout.write(f"  {'escenario':22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'consultas':>9} {'bytes':>9}")
+        results = {}
+        for scenario in scenarios:
+            try:
+                metrics = run_scenario(client, scenario, options['requests'])
+            except AssertionError as e:
+                raise CommandError(str(e))
+            results[f"{size}:{scenario.name}"] = metrics
+            self.stdout.write(
+                f"  {scenario.name:22} {metrics['p50_ms']:8.1f} {metrics['p95_ms']:8.1f} "
+                f"{metrics['p99_ms']:8.1f} {metrics['queries']:9} {metrics['bytes']:9}"
+            )
+        return results
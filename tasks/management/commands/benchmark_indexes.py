@@ -0,0 +1,86 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from tasks.board import COLUMN_TYPES, get_column_page
+from tasks.models import Task
+from tasks.seeding import seed_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara planes de consulta y tiempos del tablero y el dashboard con y sin "
+        "los índices de Task. Trabaja dentro de una transacción que se revierte al final, "
+        "por lo que no deja datos ni cambios de esquema."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Tareas sintéticas a insertar")
+        parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por consulta")
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.stdout.write(f"Insertando {options['rows']} tareas...")
+            seed_tasks(options['rows'], batch_size=options['batch_size'])
+
+            self.set_indexes(enabled=False)
+            before = self.run_queries(options['repeat'])
+            self.set_indexes(enabled=True)
+            after = self.run_queries(options['repeat'])
+
+            self.report(before, after)
+            transaction.set_rollback(True)
+
+    def get_queries(self):
+        """Consultas de las vistas del tablero y del dashboard"""
+        queries = [
+            (f"columna {column_type}", lambda column_type=column_type: get_column_page(column_type))
+            for column_type in COLUMN_TYPES
+        ]
+        queries.append(("conteos por estado", Task.objects.status_counts))
+        return queries
+
+    def set_indexes(self, enabled):
+        """
+        Crea o elimina los índices declarados en Task.Meta ejecutando el SQL
+        directamente (el schema editor de SQLite no se puede usar dentro de atomic).
+        """
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Task._meta.indexes:
+                sql = index.create_sql(Task, editor) if enabled else index.remove_sql(Task, editor)
+                if sql is not None:
+                    cursor.execute(str(sql))
+            cursor.execute(f"ANALYZE {Task._meta.db_table}")
+
+    def run_queries(self, repeat):
+        """Retorna {nombre: (mediana_ms, plan)} para cada consulta"""
+        results = {}
+        for name, query in self.get_queries():
+            with CaptureQueriesContext(connection) as captured:
+                query()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query()
+                timings.append((time.perf_counter() - start) * 1000)
+            plans = [self.explain(executed['sql']) for executed in captured.captured_queries]
+            results[name] = (statistics.median(timings), "\n".join(plans))
+        return results
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}")
+            return "\n".join(" ".join(str(col) for col in row) for row in cursor.fetchall())
+
+    def report(self, before, after):
+        for name, (before_ms, before_plan) in before.items():
+            after_ms, after_plan = after[name]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {name}"))
+            self.stdout.write(f"sin índices: {before_ms:.2f} ms | con índices: {after_ms:.2f} ms")
+            self.stdout.write(f"-- plan sin índices:\n{before_plan}")
+            self.stdout.write(f"-- plan con índices:\n{after_plan}")
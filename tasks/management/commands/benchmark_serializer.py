@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from tasks.models import Task
+from tasks.renderers import FastJSONRenderer
+from tasks.seeding import seed_tasks
+from tasks.serializers import TaskSerializer, task_rows_to_representation
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara filas/segundo del listado de la API: TaskSerializer + JSONRenderer "
+        "contra .values_list() + task_rows_to_representation + FastJSONRenderer, y verifica "
+        "que ambos produzcan los mismos bytes. Los datos se insertan en una transacción "
+        "que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help="Tareas sintéticas a insertar")
+        parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por variante")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed_tasks(options['rows'])
+            # Caracteres que JSONRenderer escapa de forma especial
+            Task.objects.create(title="Separadores    y ñandú", description="línea\ncon \"comillas\"\t\x01")
+
+            queryset = Task.objects.order_by('created_at', 'id')
+            rows = queryset.count()
+            serializer_bytes, serializer_s = self.measure(options['repeat'], lambda: JSONRenderer().render(
+                TaskSerializer(queryset, many=True).data
+            ))
+            fields = TaskSerializer.Meta.fields
+            fast_bytes, fast_s = self.measure(options['repeat'], lambda: FastJSONRenderer().render(
+                task_rows_to_representation(queryset.values_list(*fields), fields)
+            ))
+            transaction.set_rollback(True)
+
+        if serializer_bytes != fast_bytes:
+            raise CommandError("La lectura rápida no produce los mismos bytes que TaskSerializer")
+
+        self.stdout.write(f"{rows} filas, {len(fast_bytes)} bytes (salidas idénticas)")
+        self.stdout.write(f"  TaskSerializer:  {rows / serializer_s:12,.0f} filas/s ({serializer_s * 1000:.1f} ms)")
+        self.stdout.write(f"  Lectura rápida:  {rows / fast_s:12,.0f} filas/s ({fast_s * 1000:.1f} ms)")
+        self.stdout.write(self.style.SUCCESS(f"  Aceleración: x{serializer_s / fast_s:.1f}"))
+
+    def measure(self, repeat, render):
+        """Retorna (bytes, mejor tiempo en segundos) de `repeat` ejecuciones"""
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = render()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return output, best
@@ -0,0 +1,138 @@
+import http.client
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.models import Task
+
+# Servidores comparados: nombre -> (argumentos de gunicorn, variables de entorno)
+SERVERS = {
+    'wsgi': (['app.wsgi:application'], {'ASYNC_VIEWS': 'False'}),
+    'asgi': (['app.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'], {'ASYNC_VIEWS': 'True'}),
+    # ASGI con las vistas síncronas: separa el efecto del servidor del de las vistas
+    'asgi-sync': (['app.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'], {'ASYNC_VIEWS': 'False'}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga del tablero servido con gunicorn (WSGI, vistas síncronas) y con "
+        "gunicorn + UvicornWorker (ASGI, con vistas asíncronas y con las síncronas). Mezcla GET / vía HTMX con "
+        "toggles y reporta peticiones/s y latencias p50/p99. Usa la base de datos "
+        "configurada: los toggles alternan tareas reales, que deben existir de antemano."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument('--workers', type=int, default=2, help="Procesos de gunicorn")
+        parser.add_argument('--concurrency', type=int, default=32, help="Clientes simultáneos")
+        parser.add_argument('--duration', type=float, default=10, help="Segundos de carga por servidor")
+        parser.add_argument('--toggle-ratio', type=float, default=0.2, help="Fracción de peticiones que son toggles")
+        parser.add_argument('--port', type=int, default=8765)
+
+    def handle(self, *args, **options):
+        task_ids = list(Task.objects.filter(deleted=False).values_list('id', flat=True)[:1000])
+        if options['toggle_ratio'] and not task_ids:
+            raise CommandError("No hay tareas para alternar; cargue datos o use --toggle-ratio 0")
+
+        for name in options['servers']:
+            process = self.start_server(name, options)
+            try:
+                results = self.run_load(options, task_ids)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+            self.report(name, results, options['duration'])
+
+    def start_server(self, name, options):
+        """Lanza gunicorn y espera a que acepte conexiones"""
+        target, env = SERVERS[name]
+        command = [
+            sys.executable, '-m', 'gunicorn', *target,
+            '--workers', str(options['workers']),
+            '--bind', f"127.0.0.1:{options['port']}",
+            '--log-level', 'warning',
+        ]
+        # Sin el log de rendimiento por petición, que competiría con la carga por la salida
+        env = {**os.environ, 'PERFORMANCE_LOG_LEVEL': 'WARNING', **env}
+        process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"El servidor {name} terminó al arrancar")
+            try:
+                socket.create_connection(('127.0.0.1', options['port']), timeout=1).close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f"El servidor {name} no aceptó conexiones en 30 s")
+
+    def run_load(self, options, task_ids):
+        """Ejecuta los clientes en hilos y retorna {escenario: [latencias]} y la cantidad de errores"""
+        results = {'home': [], 'toggle': [], 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def client(seed):
+            rng = random.Random(seed)
+            connection = http.client.HTTPConnection('127.0.0.1', options['port'], timeout=30)
+            headers = {'HX-Request': 'true'}
+            # El token CSRF se obtiene de la cookie del primer GET
+            connection.request('GET', '/', headers=headers)
+            response = connection.getresponse()
+            response.read()
+            cookie = SimpleCookie(response.headers.get('Set-Cookie', ''))
+            token = cookie[settings.CSRF_COOKIE_NAME].value if settings.CSRF_COOKIE_NAME in cookie else ''
+            headers.update({'Cookie': f"{settings.CSRF_COOKIE_NAME}={token}", 'X-CSRFToken': token})
+
+            while time.monotonic() < deadline:
+                if task_ids and rng.random() < options['toggle_ratio']:
+                    scenario, method = 'toggle', 'POST'
+                    url = f"/api-htmx/tasks/{rng.choice(task_ids)}/toggle/"
+                else:
+                    scenario, method, url = 'home', 'GET', '/'
+                start = time.perf_counter()
+                try:
+                    connection.request(method, url, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    ok = response.status == 200
+                except (OSError, http.client.HTTPException):
+                    ok = False
+                    connection.close()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    if ok:
+                        results[scenario].append(elapsed)
+                    else:
+                        results['errors'] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=client, args=(seed,)) for seed in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def report(self, name, results, duration):
+        total = len(results['home']) + len(results['toggle'])
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{name}: {total / duration:,.1f} peticiones/s ({total} en {duration:.0f} s, {results['errors']} errores)"
+        ))
+        for scenario in ('home', 'toggle'):
+            latencies = sorted(results[scenario])
+            if not latencies:
+                continue
+            p50 = latencies[len(latencies) // 2] * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            self.stdout.write(f"  {scenario:7} {len(latencies):7} peticiones  p50 {p50:8.1f} ms  p99 {p99:8.1f} ms")
@@ -0,0 +1,61 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, features
+
+# Imágenes de static/ con variantes por ancho; src/input.css las usa con
+# image-set() en media queries, así que los anchos deben coincidir
+RESPONSIVE_IMAGES = {
+    'img/bg.jpg': (1280, 1920, 2560),
+}
+
+# Formato: (plugin de Pillow, opciones de guardado)
+VARIANT_FORMATS = {
+    'avif': ('avif', {'quality': 50, 'speed': 6}),
+    'webp': ('webp', {'quality': 75, 'method': 6}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera variantes WebP y AVIF redimensionadas de las imágenes de static/ "
+        "(ej. img/bg-1280.webp) para image-set(). Se ejecuta antes de collectstatic; solo "
+        "regenera las variantes más antiguas que la imagen original."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerar todas las variantes")
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        formats = {
+            extension: (plugin, params) for extension, (plugin, params) in VARIANT_FORMATS.items()
+            if features.check(plugin)
+        }
+        for extension in VARIANT_FORMATS.keys() - formats.keys():
+            self.stderr.write(self.style.WARNING(f"Pillow no soporta {extension}; se omiten esas variantes"))
+        if not formats:
+            raise CommandError("Pillow no soporta ningún formato de variante")
+
+        for name, widths in RESPONSIVE_IMAGES.items():
+            source = static_dir / name
+            with Image.open(source) as image:
+                image = image.convert('RGB')
+                for width in widths:
+                    if width >= image.width:
+                        raise CommandError(f"{name} mide {image.width}px; no se puede generar {width}px")
+                    resized = None
+                    for extension, (plugin, params) in formats.items():
+                        target = source.with_name(f"{source.stem}-{width}.{extension}")
+                        if not options['force'] and target.exists() and target.stat().st_mtime >= source.stat().st_mtime:
+                            continue
+                        if resized is None:
+                            height = round(image.height * width / image.width)
+                            resized = image.resize((width, height), Image.LANCZOS)
+                        resized.save(target, plugin, **params)
+                        self.stdout.write(
+                            f"  {target.relative_to(static_dir)}: {target.stat().st_size / 1024:.0f} KB "
+                            f"(original {source.stat().st_size / 1024:.0f} KB)"
+                        )
+        self.stdout.write(self.style.SUCCESS("Variantes al día."))
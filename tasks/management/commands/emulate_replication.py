@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.replication import copy_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Emula la replicación hacia DATABASE_REPLICAS copiando `default` cada --lag segundos, "
+        "para probar en local el router de réplicas con dos bases SQLite o PostgreSQL "
+        "(ej. DATABASE_REPLICA_URLS=sqlite:////tmp/replica.sqlite3)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=float, default=2, help="Segundos entre copias")
+        parser.add_argument('--once', action='store_true', help="Copiar una vez y terminar")
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No hay réplicas: define DATABASE_REPLICA_URLS")
+        while True:
+            start = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database('default', alias)
+            self.stdout.write(
+                f"  default -> {', '.join(settings.DATABASE_REPLICAS)} "
+                f"en {(time.perf_counter() - start) * 1000:.0f} ms"
+            )
+            if options['once']:
+                return
+            time.sleep(options['lag'])
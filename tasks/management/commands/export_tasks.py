@@ -0,0 +1,43 @@
+import gzip
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from tasks.transfer import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Exporta todas las tareas en NDJSON o CSV, leyendo la base de datos por bloques. "
+        "Escribe en --output (comprimido con gzip si termina en .gz) o en la salida estándar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', help="Archivo de destino (por defecto la salida estándar)")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['output']
+        if path is None:
+            output = sys.stdout
+        elif path.endswith('.gz'):
+            output = gzip.open(path, 'wt', encoding='utf-8', newline='')
+        else:
+            output = open(path, 'w', encoding='utf-8', newline='')
+
+        start = time.perf_counter()
+        written = 0
+        try:
+            queryset = Task.objects.order_by('id')
+            for chunk in iter_export(queryset, TaskSerializer.Meta.fields, options['format'], options['chunk_size']):
+                output.write(chunk)
+                written += len(chunk)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        elapsed = time.perf_counter() - start
+        self.stderr.write(f"{written / 1e6:.1f} MB exportados en {elapsed:.1f} s.")
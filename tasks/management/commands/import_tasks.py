@@ -0,0 +1,56 @@
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.events import publish_refresh
+from tasks.transfer import IMPORT_BATCH_SIZE, PARSERS, iter_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa tareas desde un archivo NDJSON o CSV (opcionalmente .gz) o desde la entrada "
+        "estándar ('-'), leyendo línea a línea y guardando con bulk_create por lotes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Archivo a importar, o '-' para la entrada estándar")
+        parser.add_argument(
+            '--format', choices=list(PARSERS),
+            help="Formato de la entrada (por defecto según la extensión; ndjson si no se reconoce)",
+        )
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or ('csv' if path.removesuffix('.gz').endswith('.csv') else 'ndjson')
+        try:
+            if path == '-':
+                lines = sys.stdin
+            elif path.endswith('.gz'):
+                lines = gzip.open(path, 'rt', encoding='utf-8', newline='')
+            else:
+                lines = open(path, encoding='utf-8', newline='')
+        except FileNotFoundError:
+            raise CommandError(f"No existe el archivo {path}")
+
+        try:
+            for report in iter_import(PARSERS[import_format](lines), options['batch_size']):
+                self.stdout.write(
+                    f"  {report.created} tareas importadas ({report.rows_per_second:.0f} filas/s)..."
+                )
+        finally:
+            if lines is not sys.stdin:
+                lines.close()
+
+        for error in report.errors:
+            details = "; ".join(f"{name}: {' '.join(map(str, messages))}" for name, messages in error['errors'].items())
+            self.stderr.write(f"Línea {error['line']}: {details}")
+        if report.error_count > len(report.errors):
+            self.stderr.write(f"... y {report.error_count - len(report.errors)} filas inválidas más.")
+        if report.created:
+            publish_refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.created} tareas importadas, {report.error_count} filas inválidas, "
+            f"{report.seconds:.1f} s ({report.rows_per_second:.0f} filas/s)."
+        ))
@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo de importación en frío (python -X importtime) de un worker: "
+        "django.setup() más los módulos indicados. Falla si se supera el presupuesto "
+        "o si se importa algún módulo prohibido, para detectar regresiones de arranque."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'modules', nargs='*', default=['app.wsgi', 'app.urls'],
+            help="Módulos a importar después de django.setup() (por defecto app.wsgi y app.urls)",
+        )
+        parser.add_argument('--top', type=int, default=15, help="Cantidad de módulos a listar")
+        parser.add_argument('--max-ms', type=float, help="Presupuesto total de importación en ms")
+        parser.add_argument(
+            '--forbid', action='append', default=[],
+            help="Paquete que no debe importarse al arrancar (ej. --forbid bokeh); repetible",
+        )
+
+    def handle(self, *args, **options):
+        timings = self.measure(options['modules'])
+        total_ms = sum(self_us for self_us, _ in timings.values()) / 1000
+
+        by_package = defaultdict(int)
+        for module, (self_us, _) in timings.items():
+            by_package[module.split('.')[0]] += self_us
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Importación total: {total_ms:.1f} ms ({len(timings)} módulos)"))
+        self.stdout.write(self.style.MIGRATE_HEADING("\nPor paquete (tiempo propio acumulado):"))
+        for package, self_us in sorted(by_package.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {self_us / 1000:9.1f} ms  {package}")
+        self.stdout.write(self.style.MIGRATE_HEADING("\nPor módulo (tiempo acumulado):"))
+        ranking = sorted(timings.items(), key=lambda item: -item[1][1])[:options['top']]
+        for module, (_, cumulative_us) in ranking:
+            self.stdout.write(f"  {cumulative_us / 1000:9.1f} ms  {module}")
+
+        errors = []
+        for package in options['forbid']:
+            imported = [m for m in timings if m == package or m.startswith(f"{package}.")]
+            if imported:
+                errors.append(f"se importó '{package}' al arrancar ({len(imported)} módulos)")
+        if options['max_ms'] is not None and total_ms > options['max_ms']:
+            errors.append(f"la importación tomó {total_ms:.1f} ms (máximo {options['max_ms']:.1f} ms)")
+        if errors:
+            raise CommandError("; ".join(errors))
+
+    def measure(self, modules):
+        """Retorna {módulo: (propio_us, acumulado_us)} ejecutando un intérprete nuevo"""
+        code = "import django; django.setup()" + "".join(f"; import {module}" for module in modules)
+        env = dict(os.environ)
+        env.setdefault('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if result.returncode != 0:
+            raise CommandError(f"Falló la importación:\n{result.stderr[-2000:]}")
+
+        timings = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+            self_us, cumulative_us, module = line[len('import time:'):].split('|')
+            timings[module.strip()] = (int(self_us), int(cumulative_us))
+        return timings
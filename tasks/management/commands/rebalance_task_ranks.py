@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.board import COLUMN_TYPES
+from tasks.ranking import RANK_REBALANCE_LENGTH, rebalance_column
+
+
+class Command(BaseCommand):
+    help = (
+        "Reparte de nuevo las claves de orden manual (Task.rank) de las tarjetas con claves de más de "
+        f"{RANK_REBALANCE_LENGTH} caracteres o repetidas, columna por columna y sin cambiar el orden. "
+        "Los movimientos lo hacen al detectarlas en su columna; el comando recorre todas las columnas."
+    )
+
+    def handle(self, *args, **options):
+        for column_type in COLUMN_TYPES:
+            start = time.perf_counter()
+            rewritten = rebalance_column(column_type)
+            self.stdout.write(
+                f"  {column_type:10} {rewritten:6} tarjetas reescritas en {time.perf_counter() - start:.2f}s"
+            )
+        self.stdout.write(self.style.SUCCESS("Claves de orden reequilibradas"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.archive import restore_from_file, restore_from_table
+
+
+class Command(BaseCommand):
+    help = (
+        "Restaura tareas archivadas por archive_tasks a la columna de eliminadas, desde la "
+        "tabla ArchivedTask o desde un archivo JSONL comprimido. Las tareas que ya existen se omiten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', help="Archivo .jsonl.gz generado con archive_tasks --to file")
+        parser.add_argument('--ids', type=int, nargs='+', help="Restaurar solo estas tareas")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ids = set(options['ids']) if options['ids'] else None
+        if options['file']:
+            try:
+                batches = restore_from_file(options['file'], ids=ids, batch_size=options['batch_size'])
+                restored = self.consume(batches)
+            except FileNotFoundError:
+                raise CommandError(f"No existe el archivo {options['file']}")
+        else:
+            restored = self.consume(restore_from_table(ids=ids, batch_size=options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"{restored} tareas restauradas."))
+
+    def consume(self, batches):
+        restored = 0
+        for restored in batches:
+            self.stdout.write(f"  {restored} tareas restauradas...")
+        return restored
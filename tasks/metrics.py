@@ -0,0 +1,108 @@
+"""
+Histogramas en memoria del proceso con exposición en el formato de texto de
+Prometheus (ver MetricsView). Cada worker lleva sus propios contadores; el
+scraper los distingue por instancia.
+"""
+import threading
+from bisect import bisect_left
+
+# Límites superiores de los buckets en segundos
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Límites superiores de los buckets de consultas por petición
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+class Histogram:
+    """Histograma acumulativo con etiquetas, al estilo de prometheus_client"""
+    def __init__(self, name, documentation, buckets, labels=('view', 'method')):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self.labels = labels
+        # {valores de las etiquetas: [conteo por bucket..., +Inf], suma}
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.series.get(label_values, ([0] * (len(self.buckets) + 1), 0))
+            counts[index] += 1
+            self.series[label_values] = (counts, total + value)
+
+    def format_labels(self, label_values, **extra):
+        pairs = list(zip(self.labels, label_values)) + list(extra.items())
+        return ",".join(f'{name}="{escape_label(value)}"' for name, value in pairs)
+
+    def expose(self):
+        """Líneas del histograma en el formato de texto 0.0.4"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self.series.items())
+        for label_values, counts, total in series:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{{{self.format_labels(label_values, le=bound)}}} {cumulative}")
+            labels = self.format_labels(label_values)
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Fases medidas en cada petición (ver tasks/instrumentation.py)
+REQUEST_DURATION = Histogram(
+    'tasks_request_duration_seconds', "Duración total de la petición.", DURATION_BUCKETS,
+    labels=('view', 'method', 'status'),
+)
+DB_DURATION = Histogram('tasks_db_duration_seconds', "Tiempo en consultas SQL por petición.", DURATION_BUCKETS)
+DB_QUERIES = Histogram('tasks_db_queries', "Consultas SQL por petición.", QUERY_BUCKETS)
+PHASE_DURATION = Histogram(
+    'tasks_phase_duration_seconds',
+    "Tiempo por fase de la petición (template, bokeh, serialize).",
+    DURATION_BUCKETS, labels=('view', 'method', 'phase'),
+)
+
+HISTOGRAMS = [REQUEST_DURATION, DB_DURATION, DB_QUERIES, PHASE_DURATION]
+
+
+# Estadísticas de los pools de conexiones (tasks/pool.py): (métrica, tipo, descripción, campo de PoolStats)
+POOL_METRICS = [
+    ('tasks_db_pool_max_connections', 'gauge', "Conexiones máximas del pool en el proceso.", 'max_connections'),
+    ('tasks_db_pool_in_use_connections', 'gauge', "Conexiones entregadas a una petición.", 'in_use'),
+    ('tasks_db_pool_idle_connections', 'gauge', "Conexiones libres en el pool.", 'idle'),
+    ('tasks_db_pool_acquisitions_total', 'counter', "Conexiones entregadas por el pool.", 'acquisitions'),
+    ('tasks_db_pool_created_total', 'counter', "Conexiones abiertas por el pool.", 'created'),
+    ('tasks_db_pool_discarded_total', 'counter',
+     "Conexiones descartadas (fallaron la verificación, vencieron o tuvieron errores).", 'discarded'),
+    ('tasks_db_pool_waits_total', 'counter', "Peticiones que esperaron una conexión libre.", 'waits'),
+    ('tasks_db_pool_wait_seconds_total', 'counter', "Tiempo total esperando una conexión libre.", 'wait_seconds'),
+    ('tasks_db_pool_wait_seconds_max', 'gauge', "Espera más larga por una conexión libre.", 'max_wait_seconds'),
+    ('tasks_db_pool_timeouts_total', 'counter', "Peticiones sin conexión tras el TIMEOUT del pool.", 'timeouts'),
+]
+
+
+def expose_pool_metrics():
+    from .pool import get_pool_stats
+    stats = get_pool_stats()
+    lines = []
+    for name, kind, documentation, field in POOL_METRICS:
+        lines.extend([f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"])
+        for pool in stats:
+            labels = f'alias="{escape_label(pool.alias)}",database="{escape_label(pool.database)}"'
+            lines.append(f"{name}{{{labels}}} {getattr(pool, field)}")
+    return lines
+
+
+def expose_metrics():
+    """Todas las métricas en el formato de texto de Prometheus"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.expose())
+    lines.extend(expose_pool_metrics())
+    return "\n".join(lines) + "\n"
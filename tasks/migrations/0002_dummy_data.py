@@ -2,7 +2,8 @@ from django.db import migrations
 
 def seed_data(apps, schema_editor):
     Task = apps.get_model('tasks', 'Task')
-    Task.objects.bulk_create([
+    # En la base que se migra, no en la que elija el router
+    Task.objects.using(schema_editor.connection.alias).bulk_create([
         Task(title="Configurar entorno de trabajo", description="Instalar Django, Docker y preparar el proyecto base."),
         Task(title="Definir modelo Task", description="Crear estructura de datos para almacenar tareas."),
         Task(title="Cargar datos dummy", description="Revisar que se visualicen."),
@@ -16,7 +17,7 @@ def seed_data(apps, schema_editor):
 
 def unseed_data(apps, schema_editor):
     Task = apps.get_model('tasks', 'Task')
-    Task.objects.all().delete()
+    Task.objects.using(schema_editor.connection.alias).all().delete()
 
 class Migration(migrations.Migration):
     dependencies = [
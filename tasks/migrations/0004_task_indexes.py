@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 09:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_updates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['deleted', 'completed', '-created_at'], name='task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('deleted', False)), fields=['-created_at', '-id'], name='task_pending_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', True), ('deleted', False)), fields=['-created_at', '-id'], name='task_completed_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', True)), fields=['-created_at', '-id'], name='task_deleted_created_idx'),
+        ),
+    ]
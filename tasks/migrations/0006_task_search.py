@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from tasks.search import install_search_index, uninstall_search_index
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+    """
+    Índice de búsqueda de texto completo según el motor: GIN sobre el tsvector
+    en PostgreSQL, tabla FTS5 con triggers en SQLite (ver tasks/search.py).
+    """
+
+    dependencies = [
+        ('tasks', '0005_task_api_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:45
+
+from django.db import migrations, models
+from django.db.models import F
+
+from tasks.rollups import install_rollup_triggers, rebuild_rollups, uninstall_rollup_triggers
+
+
+def fill_status_timestamps(apps, schema_editor):
+    # Sin historial de transiciones, updated_at es la mejor estimación
+    alias = schema_editor.connection.alias
+    for model_name in ('Task', 'ArchivedTask'):
+        model = apps.get_model('tasks', model_name)
+        model.objects.using(alias).filter(completed=True).update(completed_at=F('updated_at'))
+    apps.get_model('tasks', 'Task').objects.using(alias).filter(deleted=True).update(deleted_at=F('updated_at'))
+    apps.get_model('tasks', 'ArchivedTask').objects.using(alias).update(deleted_at=F('updated_at'))
+
+
+def create_rollup_triggers(apps, schema_editor):
+    install_rollup_triggers(schema_editor.connection)
+    rebuild_rollups(
+        apps.get_model('tasks', 'TaskDailyRollup'),
+        [apps.get_model('tasks', 'Task'), apps.get_model('tasks', 'ArchivedTask')],
+        using=schema_editor.connection.alias,
+    )
+
+
+def drop_rollup_triggers(apps, schema_editor):
+    uninstall_rollup_triggers(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    completed_at / deleted_at y los conteos diarios que mantienen los triggers
+    de tasks/rollups.py.
+    """
+
+    dependencies = [
+        ('tasks', '0007_archivedtask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyRollup',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('created', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('deleted', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(fill_status_timestamps, migrations.RunPython.noop),
+        migrations.RunPython(create_rollup_triggers, drop_rollup_triggers),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.0.14 on 2026-10-18 10:53
+
+import tasks.ranking
+from django.db import migrations, models
+
+# Tareas por UPDATE al asignar las claves iniciales
+BATCH_SIZE = 2000
+
+
+def fill_ranks(apps, schema_editor):
+    # El orden inicial es el de antes (-created_at, -id); el id separa las
+    # tareas creadas en el mismo microsegundo
+    Task = apps.get_model('tasks', 'Task')
+    queryset = Task.objects.using(schema_editor.connection.alias)
+    rows = queryset.order_by('id').values_list('id', 'created_at').iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for task_id, created_at in rows:
+        batch.append(Task(id=task_id, rank=tasks.ranking.time_rank(created_at, task_id)))
+        if len(batch) == BATCH_SIZE:
+            queryset.bulk_update(batch, ['rank'])
+            batch = []
+    queryset.bulk_update(batch, ['rank'])
+
+
+class Migration(migrations.Migration):
+    """
+    Orden manual de las tarjetas (ver tasks/ranking.py). En SQLite agregar
+    rank reconstruye tasks_task; los triggers de búsqueda y de conteos
+    diarios se restauran en post_migrate.
+    """
+
+    dependencies = [
+        ('tasks', '0008_task_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_status_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_pending_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_completed_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_deleted_created_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.CharField(default=tasks.ranking.new_rank, max_length=255),
+        ),
+        migrations.RunPython(fill_ranks, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['deleted', 'completed', '-rank'], name='task_status_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('deleted', False)), fields=['-rank', '-id'], name='task_pending_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', True), ('deleted', False)), fields=['-rank', '-id'], name='task_completed_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted', True)), fields=['-rank', '-id'], name='task_deleted_rank_idx'),
+        ),
+    ]
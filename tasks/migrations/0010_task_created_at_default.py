@@ -0,0 +1,25 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_rank'),
+    ]
+
+    # La columna no cambia (el valor por defecto lo pone Django, no la base):
+    # solo el estado, sin que SQLite reconstruya la tabla
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='task',
+                    name='created_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+                ),
+            ],
+        ),
+    ]
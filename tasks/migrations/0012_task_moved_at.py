@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_archivedtask_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='moved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['moved_at'], name='task_moved_idx'),
+        ),
+    ]
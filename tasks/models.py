@@ -1,12 +1,251 @@
 from django.db import models
+from django.db.models import Case, Count, DateTimeField, F, Max, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .ranking import new_rank
+
+# Marca de tiempo de cada estado: completed -> completed_at, deleted -> deleted_at
+STATUS_TIMESTAMPS = {'completed': 'completed_at', 'deleted': 'deleted_at'}
+
+# Consulta de TaskQuerySet.revision(), resuelta con los índices de updated_at y moved_at
+REVISION_AGGREGATES = {
+    'last_modified': Max('updated_at'),
+    'last_moved': Max('moved_at'),
+    'total': Count('id'),
+}
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Consultas del tablero. Cada método tiene su variante asíncrona (prefijo a)
+    para las vistas de tasks/async_views.py.
+    """
+    def get_status_aggregates(self):
+        return {
+            'pending': Count('id', filter=Q(completed=False, deleted=False)),
+            'completed': Count('id', filter=Q(completed=True, deleted=False)),
+            'deleted': Count('id', filter=Q(deleted=True)),
+        }
+
+    def status_counts(self):
+        """Cuenta las tareas de cada columna del tablero en una sola consulta."""
+        return self.aggregate(**self.get_status_aggregates())
+
+    async def astatus_counts(self):
+        return await self.aaggregate(**self.get_status_aggregates())
+
+    def revision(self):
+        """
+        Versión barata del tablero: (última modificación, último movimiento,
+        cantidad de tareas). Cambia con cada escritura, incluidos los borrados
+        definitivos y los cambios de orden.
+        """
+        result = self.aggregate(**REVISION_AGGREGATES)
+        return result['last_modified'], result['last_moved'], result['total']
+
+    async def arevision(self):
+        result = await self.aaggregate(**REVISION_AGGREGATES)
+        return result['last_modified'], result['last_moved'], result['total']
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            # Completada o eliminada al crearse: en el mismo instante de created_at
+            obj.set_status_timestamps(obj.created_at)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        fields = list(fields)
+        stamps = [STATUS_TIMESTAMPS[name] for name in STATUS_TIMESTAMPS if name in fields]
+        if stamps:
+            now = timezone.now()
+            for obj in objs:
+                obj.set_status_timestamps(now)
+            fields += [stamp for stamp in stamps if stamp not in fields]
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        """
+        Un UPDATE que fija completed o deleted también fija su marca de tiempo
+        (la conserva si la tarea ya estaba en ese estado). Con una expresión en
+        vez de un booleano la marca debe indicarse explícitamente.
+        """
+        now = timezone.now()
+        for name, stamp in STATUS_TIMESTAMPS.items():
+            if name not in kwargs or stamp in kwargs:
+                continue
+            value = kwargs[name]
+            if value is True:
+                kwargs[stamp] = Coalesce(F(stamp), Value(now))
+            elif value is False:
+                kwargs[stamp] = None
+            else:
+                raise ValueError(f"update() con una expresión para '{name}' debe fijar también '{stamp}'")
+        return super().update(**kwargs)
+
+    def get_toggle_values(self):
+        now = timezone.now()
+        return {
+            'completed': Case(When(completed=True, then=Value(False)), default=Value(True)),
+            'completed_at': Case(
+                When(completed=True, then=Value(None)), default=Value(now), output_field=DateTimeField()
+            ),
+            'updated_at': now,
+        }
+
+    def toggle_completed(self):
+        """Alterna `completed` con un único UPDATE, sin leer las filas antes"""
+        return self.update(**self.get_toggle_values())
+
+    async def atoggle_completed(self):
+        return await self.aupdate(**self.get_toggle_values())
+
+    def soft_delete(self):
+        """Marca las tareas como eliminadas escribiendo solo deleted, deleted_at y updated_at"""
+        return self.update(deleted=True, updated_at=timezone.now())
+
+    async def asoft_delete(self):
+        return await self.aupdate(deleted=True, updated_at=timezone.now())
+
 
 class Task(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     completed = models.BooleanField(default=False)
     deleted = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Se fija al construir la instancia (no en el INSERT, como auto_now_add) para
+    # que completed_at y deleted_at de una tarea nueva no queden antes que ella
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
+    # Momento en que la tarea pasó a completada / eliminada (None si no lo está);
+    # atribuyen cada transición a su día en TaskDailyRollup
+    completed_at = models.DateTimeField(null=True, blank=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # Posición manual en su columna (orden descendente), ver tasks/ranking.py
+    rank = models.CharField(max_length=255, default=new_rank)
+    # Último cambio de posición: mover no es editar, así que no toca updated_at
+    moved_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Filtro por estado + orden manual (conteos del dashboard y motores
+            # sin índices parciales)
+            models.Index(
+                fields=['deleted', 'completed', '-rank'],
+                name='task_status_rank_idx',
+            ),
+            # Un índice parcial por columna del tablero, en el orden de la paginación
+            # por keyset (Django los omite en motores que no los soportan)
+            models.Index(
+                fields=['-rank', '-id'],
+                condition=Q(completed=False, deleted=False),
+                name='task_pending_rank_idx',
+            ),
+            models.Index(
+                fields=['-rank', '-id'],
+                condition=Q(completed=True, deleted=False),
+                name='task_completed_rank_idx',
+            ),
+            models.Index(
+                fields=['-rank', '-id'],
+                condition=Q(deleted=True),
+                name='task_deleted_rank_idx',
+            ),
+            # Paginación por cursor y filtro updated_since de la API
+            models.Index(fields=['created_at', 'id'], name='task_created_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+            # max(moved_at) de la revisión del ETag
+            models.Index(fields=['moved_at'], name='task_moved_idx'),
+        ]
 
     def __str__(self):
         return self.title
+
+    def save(self, *args, update_fields=None, **kwargs):
+        self.set_status_timestamps(self.created_at if self._state.adding else None)
+        if update_fields is not None:
+            update_fields = list(update_fields)
+            update_fields += [
+                stamp for name, stamp in STATUS_TIMESTAMPS.items()
+                if name in update_fields and stamp not in update_fields
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def set_status_timestamps(self, now=None):
+        """Fija (o limpia) completed_at y deleted_at según el estado de la tarea"""
+        for name, stamp in STATUS_TIMESTAMPS.items():
+            if not getattr(self, name):
+                setattr(self, stamp, None)
+            elif getattr(self, stamp) is None:
+                setattr(self, stamp, now or timezone.now())
+
+    @property
+    def column_type(self):
+        """Columna del tablero en la que se muestra la tarea."""
+        if self.deleted:
+            return 'deleted'
+        if self.completed:
+            return 'completed'
+        return 'pending'
+
+
+class ArchivedTask(models.Model):
+    """
+    Tarea eliminada (soft-delete) movida fuera de Task por el comando
+    archive_tasks. Conserva el id original para poder restaurarla.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    completed = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    # Última modificación de la tarea al archivarla
+    updated_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    # Posición en la columna; nula en las filas archivadas antes de guardarla
+    rank = models.CharField(max_length=255, null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['archived_at'], name='archived_task_archived_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class TaskDailyRollupQuerySet(models.QuerySet):
+    def get_series_rows(self, start, end):
+        return self.filter(day__range=(start, end)).order_by('day').values_list(
+            'day', 'created', 'completed', 'deleted'
+        )
+
+    def series(self, start, end):
+        """Filas (día, creadas, completadas, eliminadas) del rango, solo los días con datos"""
+        return list(self.get_series_rows(start, end))
+
+    async def aseries(self, start, end):
+        return [row async for row in self.get_series_rows(start, end)]
+
+
+class TaskDailyRollup(models.Model):
+    """
+    Conteos por día (en TIME_ZONE) de las tareas creadas, completadas y
+    eliminadas, entre Task y ArchivedTask. Los mantienen los triggers de
+    tasks/rollups.py en cada escritura; el dashboard solo lee estas filas.
+    """
+    day = models.DateField(primary_key=True)
+    created = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    deleted = models.IntegerField(default=0)
+
+    objects = TaskDailyRollupQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.day}: {self.created}/{self.completed}/{self.deleted}"
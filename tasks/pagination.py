@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """
+    Paginación por cursor ordenada por (created_at, id).
+    El cliente puede ajustar el tamaño de página con ?page_size= hasta max_page_size.
+    """
+    ordering = ('created_at', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
@@ -0,0 +1,284 @@
+"""
+Pool de conexiones a la base de datos, por proceso.
+
+Django 5.0 no trae pool: con CONN_MAX_AGE cada hilo conserva su propia
+conexión (bajo ASGI, una por hilo de sync_to_async) y sin él abre una por
+petición. Los backends de tasks/backends/ piden las conexiones a un
+ConnectionPool y, cuando Django las cierra al terminar la petición
+(CONN_MAX_AGE = 0), las devuelven al pool en vez de cerrarlas.
+
+Cada pool abre a lo sumo MAX_CONNECTIONS conexiones; app/settings.py reparte
+DB_POOL_MAX_CONNECTIONS entre los workers de gunicorn (WEB_CONCURRENCY) para
+que el total del servicio no supere ese límite. Si todas están en uso, la
+petición espera hasta TIMEOUT segundos y luego falla con PoolTimeout. Una
+conexión que estuvo inactiva más de CHECK_AFTER segundos se verifica con
+SELECT 1 antes de entregarla, y las que superan MAX_LIFETIME se reemplazan.
+Las estadísticas (en uso, inactivas, esperas) se exponen en /metrics/.
+"""
+import os
+import threading
+import time
+import weakref
+from collections import deque, namedtuple
+
+from django.db import OperationalError
+from django.db.backends.base.base import NO_DB_ALIAS
+
+from .instrumentation import timed
+
+# Configuración por defecto; DATABASES[alias]['POOL'] la sobrescribe
+POOL_DEFAULTS = {
+    # Conexiones abiertas como máximo por proceso
+    'MAX_CONNECTIONS': 10,
+    # Segundos de espera por una conexión libre antes de fallar
+    'TIMEOUT': 10,
+    # Segundos de inactividad a partir de los cuales se verifica la conexión
+    'CHECK_AFTER': 1,
+    # Segundos de vida de una conexión antes de reemplazarla
+    'MAX_LIFETIME': 1800,
+}
+
+PoolStats = namedtuple('PoolStats', [
+    'alias', 'database', 'max_connections', 'in_use', 'idle',
+    'acquisitions', 'created', 'discarded', 'waits', 'wait_seconds', 'max_wait_seconds', 'timeouts',
+])
+
+
+class PoolTimeout(OperationalError):
+    """No se liberó ninguna conexión dentro del TIMEOUT del pool"""
+
+
+class PooledConnection:
+    """Conexión DB-API del pool con sus tiempos de creación y último uso"""
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = self.released_at = time.monotonic()
+
+
+def ping(connection):
+    """Verifica que la conexión responde; la deja sin transacción abierta"""
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        finally:
+            cursor.close()
+        connection.rollback()
+    except Exception:
+        return False
+    return True
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    def __init__(self, alias, database, max_connections, timeout, check_after, max_lifetime):
+        self.alias = alias
+        self.database = database
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.check_after = check_after
+        self.max_lifetime = max_lifetime
+        # Conexiones libres; la última devuelta se entrega primero
+        self.idle = deque()
+        # {id(conexión DB-API): PooledConnection} de las entregadas
+        self.in_use = {}
+        # Conexiones abiertas, incluidas las que se están creando o verificando
+        self.size = 0
+        # Turnos de las peticiones que esperan una conexión, en orden de llegada
+        self.waiters = deque()
+        self.closed = False
+        self.condition = threading.Condition()
+        self.acquisitions = self.created = self.discarded = 0
+        self.waits = self.timeouts = 0
+        self.wait_seconds = self.max_wait_seconds = 0
+
+    def acquire(self, connect):
+        """Conexión DB-API libre; `connect()` abre una nueva si hay cupo"""
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self.condition:
+                # Las peticiones esperan en orden de llegada: una conexión liberada
+                # es para la que lleva más tiempo esperando
+                turn = object()
+                self.waiters.append(turn)
+                while self.waiters[0] is not turn or (not self.idle and self.size >= self.max_connections):
+                    remaining = start + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        self.waiters.remove(turn)
+                        self.condition.notify_all()
+                        self.timeouts += 1
+                        raise PoolTimeout(
+                            f"Pool de '{self.alias}' sin conexiones libres tras {self.timeout}s "
+                            f"({self.max_connections} en uso)"
+                        )
+                    waited = True
+                    self.condition.wait(remaining)
+                self.waiters.popleft()
+                self.condition.notify_all()
+                pooled = self.idle.pop() if self.idle else None
+                # La conexión queda reservada: cuenta en size mientras se verifica o crea
+                new = pooled is None
+                if new:
+                    self.size += 1
+
+            if pooled is not None and not self.is_healthy(pooled):
+                close_quietly(pooled.connection)
+                self.discard(pooled)
+                continue
+            if new:
+                try:
+                    pooled = PooledConnection(connect())
+                except BaseException:
+                    with self.condition:
+                        self.size -= 1
+                        self.condition.notify_all()
+                    raise
+
+            with self.condition:
+                self.created += new
+                self.in_use[id(pooled.connection)] = pooled
+                self.acquisitions += 1
+                if waited:
+                    wait = time.monotonic() - start
+                    self.waits += 1
+                    self.wait_seconds += wait
+                    self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            return pooled.connection
+
+    def is_healthy(self, pooled):
+        now = time.monotonic()
+        if now - pooled.created_at >= self.max_lifetime:
+            return False
+        return now - pooled.released_at < self.check_after or ping(pooled.connection)
+
+    def release(self, connection):
+        """Devuelve una conexión entregada por acquire(); si no sirve, la cierra"""
+        with self.condition:
+            pooled = self.in_use.pop(id(connection), None)
+        if pooled is None:
+            close_quietly(connection)
+            return
+        try:
+            # Una transacción abierta no pasa a la siguiente petición
+            connection.rollback()
+        except Exception:
+            close_quietly(connection)
+            self.discard(pooled)
+            return
+        with self.condition:
+            if self.closed:
+                self.size -= 1
+                close_quietly(connection)
+            else:
+                pooled.released_at = time.monotonic()
+                self.idle.append(pooled)
+            self.condition.notify_all()
+
+    def discard(self, pooled_or_connection):
+        """Descuenta una conexión (ya cerrada) del pool"""
+        with self.condition:
+            if not isinstance(pooled_or_connection, PooledConnection):
+                self.in_use.pop(id(pooled_or_connection), None)
+            self.size -= 1
+            self.discarded += 1
+            self.condition.notify_all()
+
+    def close(self):
+        """Cierra las conexiones libres; las entregadas se cierran al devolverse"""
+        with self.condition:
+            self.closed = True
+            while self.idle:
+                close_quietly(self.idle.pop().connection)
+                self.size -= 1
+            self.condition.notify_all()
+
+    def stats(self):
+        with self.condition:
+            return PoolStats(
+                self.alias, self.database, self.max_connections, len(self.in_use), len(self.idle),
+                self.acquisitions, self.created, self.discarded,
+                self.waits, self.wait_seconds, self.max_wait_seconds, self.timeouts,
+            )
+
+
+# {(alias, parámetros de conexión): ConnectionPool} del proceso
+pools = {}
+pools_lock = threading.Lock()
+pools_pid = os.getpid()
+
+
+def get_pool(alias, settings_dict, conn_params):
+    """Pool del alias para esos parámetros de conexión (las pruebas cambian NAME)"""
+    global pools_pid
+    key = (alias, repr(sorted(conn_params.items())))
+    with pools_lock:
+        # Un proceso hijo (fork) no comparte las conexiones del padre
+        if pools_pid != os.getpid():
+            pools.clear()
+            pools_pid = os.getpid()
+        pool = pools.get(key)
+        if pool is None or pool.closed:
+            options = {**POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+            pool = pools[key] = ConnectionPool(
+                alias, str(settings_dict['NAME']), options['MAX_CONNECTIONS'], options['TIMEOUT'],
+                options['CHECK_AFTER'], options['MAX_LIFETIME'],
+            )
+        return pool
+
+
+def close_pools(alias=None):
+    """Cierra los pools del proceso (todos o los de un alias)"""
+    with pools_lock:
+        for key in [key for key in pools if alias is None or key[0] == alias]:
+            pools.pop(key).close()
+
+
+def get_pool_stats():
+    with pools_lock:
+        return [pool.stats() for pool in pools.values()]
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Para DatabaseWrapper: toma las conexiones del pool y las devuelve al
+    cerrarlas. Django llama a get_new_connection() y a _close() una vez por
+    petición con CONN_MAX_AGE = 0.
+    """
+    def uses_pool(self):
+        # La conexión sin base de datos de las pruebas (crear y borrar la base) no se reutiliza
+        return self.alias != NO_DB_ALIAS
+
+    def get_new_connection(self, conn_params):
+        if not self.uses_pool():
+            return super().get_new_connection(conn_params)
+        self.pool = get_pool(self.alias, self.settings_dict, conn_params)
+        with timed('db_pool'):
+            connection = self.pool.acquire(
+                lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params)
+            )
+        # Si el DatabaseWrapper se descarta sin cerrar la conexión (un hilo que
+        # termina sin pasar por request_finished), vuelve al pool igual
+        self.pool_finalizer = weakref.finalize(self, self.pool.release, connection)
+        return connection
+
+    def _close(self):
+        if self.connection is None or not self.uses_pool():
+            return super()._close()
+        self.pool_finalizer.detach()
+        # Cerrada dentro de atomic(), Django conserva self.connection hasta salir
+        # del bloque: no puede pasar a otro hilo mientras tanto
+        if self.in_atomic_block or self.errors_occurred:
+            try:
+                return super()._close()
+            finally:
+                self.pool.discard(self.connection)
+        with self.wrap_database_errors:
+            self.pool.release(self.connection)
@@ -0,0 +1,98 @@
+"""
+Presupuesto de consultas SQL por petición para cada URL de tasks/urls.py y
+tasks/api_urls.py.
+
+assert_query_budget() sirve en pruebas:
+
+    with assert_query_budget('home'):
+        self.client.get(reverse('home'))
+
+y falla si la petición supera QUERY_BUDGETS['home'] o repite consultas
+(duplicadas o N+1, ver tasks/querydetector.py). QueryBudgetTests
+(tasks/tests.py) recorre así todas las URLs con los escenarios de
+tasks/loadtest.py y exige que cada ruta nueva tenga su presupuesto.
+"""
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import URLPattern, URLResolver
+
+from .querydetector import QueryRecorder, find_query_issues, format_issue
+
+# Consultas máximas por petición, por nombre de ruta (el máximo entre sus
+# escenarios, medido en SQLite, donde el BEGIN de transaction.atomic() también
+# cuenta; en PostgreSQL las escrituras atómicas usan una consulta menos).
+# Las vistas con ETag suman la consulta de revisión de conditional_on_tasks.
+QUERY_BUDGETS = {
+    # Tablero HTMX: revisión + conteos por estado + una página por columna
+    'home': 5,
+    # Dashboard: revisión + conteos por estado + conteos diarios del rango
+    'dashboard': 3,
+    'edit_task': 1,
+    'column_page': 1,
+    'search_tasks': 2,
+    'metrics': 0,
+    # Mutaciones de api-htmx: escritura, lectura de la tarea y conteos
+    'api_create_task': 2,
+    'api_toggle_task': 3,
+    'api_update_task': 3,
+    'api_delete_task': 3,
+    # Reordenar: lectura de la tarea y, en una transacción, claves de las
+    # vecinas y escritura (el reequilibrio ocasional de la columna no cuenta)
+    'api_move_task': 4,
+    # /api/tasks/
+    'api-root': 0,
+    'tasks-list': 3,
+    'tasks-detail': 3,
+    'tasks-toggle': 3,
+    'tasks-bulk-create': 2,
+    'tasks-bulk-update': 3,
+    'tasks-bulk-toggle': 3,
+    'tasks-bulk-delete': 3,
+    'tasks-export': 1,
+    'tasks-import': 2,
+}
+
+# Rutas sin presupuesto: el flujo SSE no termina
+UNBUDGETED_URLS = {'task_events'}
+
+
+def iter_url_names(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name
+
+
+def get_url_names():
+    """Nombres de las rutas de la app (tablero y API)"""
+    from . import api_urls, urls
+    return set(iter_url_names(urls.urlpatterns)) | set(iter_url_names(api_urls.urlpatterns))
+
+
+def get_missing_budgets():
+    """Rutas de la app sin presupuesto en QUERY_BUDGETS"""
+    return sorted(get_url_names() - set(QUERY_BUDGETS) - UNBUDGETED_URLS)
+
+
+def check_query_budget(url_name, records):
+    """Lista de problemas de las consultas (QueryRecord) de una petición a `url_name`"""
+    problems = []
+    budget = QUERY_BUDGETS[url_name]
+    if len(records) > budget:
+        problems.append(f"{url_name}: {len(records)} consultas, presupuesto {budget}")
+        problems.extend(f"  {record.sql[:200]} ({record.origin})" for record in records)
+    problems.extend(f"{url_name}: {format_issue(issue)}" for issue in find_query_issues(records))
+    return problems
+
+
+@contextmanager
+def assert_query_budget(url_name, using=DEFAULT_DB_ALIAS):
+    """Falla con AssertionError si las consultas del bloque exceden el presupuesto o se repiten"""
+    recorder = QueryRecorder()
+    with connections[using].execute_wrapper(recorder):
+        yield recorder
+    problems = check_query_budget(url_name, recorder.records)
+    if problems:
+        raise AssertionError("\n".join(problems))
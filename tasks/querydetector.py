@@ -0,0 +1,115 @@
+"""
+Detector de consultas duplicadas y N+1 para desarrollo y pruebas.
+
+Con QUERY_DETECTOR activo (por defecto igual a DEBUG), record_query guarda
+cada consulta de la petición con su origen: las líneas del proyecto en
+la pila y, si se ejecutó al renderizar una plantilla, la plantilla y la línea
+del nodo. Al terminar la petición, ServerTimingMiddleware agrupa las consultas
+por SQL (con los parámetros aparte, así que dos consultas con distinto id
+tienen el mismo SQL) y advierte en el logger tasks.queries:
+
+- duplicada: el mismo SQL con los mismos parámetros más de una vez.
+- N+1: el mismo SQL con N_PLUS_ONE_THRESHOLD o más parámetros distintos,
+  típicamente una consulta por elemento de un listado.
+"""
+import logging
+import re
+import sys
+from collections import Counter, defaultdict, namedtuple
+from pathlib import Path
+
+from django.conf import settings
+from django.template.base import Node
+
+logger = logging.getLogger('tasks.queries')
+
+# Repeticiones del mismo SQL con parámetros distintos que se consideran N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+# Orígenes mostrados por problema
+MAX_ORIGINS = 3
+
+# Líneas del proyecto en la pila que forman el origen (la consulta y quién la llama)
+ORIGIN_DEPTH = 2
+
+QueryRecord = namedtuple('QueryRecord', ['sql', 'params', 'origin'])
+QueryIssue = namedtuple('QueryIssue', ['kind', 'sql', 'count', 'origins'])
+
+# Listas de marcadores (IN (...) y VALUES de bulk_create) de largo variable
+PLACEHOLDER_LIST = re.compile(r'\(%s(?:, %s)*\)(?:, \(%s(?:, %s)*\))*')
+
+PROJECT_DIR = str(Path(settings.BASE_DIR).resolve())
+IGNORED_FILES = {
+    str(Path(__file__).resolve()),
+    str((Path(__file__).parent / 'instrumentation.py').resolve()),
+}
+
+
+def normalize_sql(sql):
+    """SQL sin el largo de las listas de marcadores"""
+    return PLACEHOLDER_LIST.sub('(%s...)', sql)
+
+
+def get_query_origin():
+    """
+    "archivo:línea en función" de las líneas del proyecto que ejecutan la
+    consulta (la más interna primero), seguido de "plantilla:línea" si ocurre
+    durante un render.
+    """
+    code_origins, template_origin = [], None
+    frame = sys._getframe(1)
+    while frame is not None and len(code_origins) < ORIGIN_DEPTH:
+        code = frame.f_code
+        if template_origin is None and code is Node.render_annotated.__code__:
+            node = frame.f_locals.get('self')
+            token, origin = getattr(node, 'token', None), getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                template_origin = f"{origin.template_name or origin.name}:{token.lineno}"
+        filename = code.co_filename
+        if (filename.startswith(PROJECT_DIR) and 'site-packages' not in filename
+                and filename not in IGNORED_FILES):
+            code_origins.append(f"{Path(filename).relative_to(PROJECT_DIR)}:{frame.f_lineno} en {code.co_name}")
+        frame = frame.f_back
+    return " / ".join(filter(None, [" <- ".join(code_origins), template_origin])) or "desconocido"
+
+
+class QueryRecorder:
+    """execute_wrapper que guarda las consultas con su origen (ver connection.execute_wrapper)"""
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.records.append(QueryRecord(sql, params, get_query_origin()))
+        return execute(sql, params, many, context)
+
+
+def find_query_issues(records, threshold=N_PLUS_ONE_THRESHOLD):
+    """Consultas duplicadas y patrones N+1 entre los QueryRecord de una petición"""
+    groups = defaultdict(list)
+    for record in records:
+        groups[normalize_sql(record.sql)].append(record)
+
+    issues = []
+    for sql, group in groups.items():
+        if len(group) < 2:
+            continue
+        origins = [origin for origin, _ in Counter(record.origin for record in group).most_common(MAX_ORIGINS)]
+        params = Counter(repr(record.params) for record in group)
+        if len(params) >= threshold:
+            issues.append(QueryIssue('N+1', sql, len(group), origins))
+        elif len(params) < len(group):
+            issues.append(QueryIssue('duplicada', sql, len(group), origins))
+    return issues
+
+
+def format_issue(issue):
+    return (
+        f"{issue.kind}: {issue.count} consultas {issue.sql[:200]!r} "
+        f"desde {'; '.join(issue.origins)}"
+    )
+
+
+def report_query_issues(view, request, records):
+    """Advierte en tasks.queries los problemas de las consultas de una petición"""
+    for issue in find_query_issues(records):
+        logger.warning("%s %s (%s): %s", request.method, request.path, view, format_issue(issue))
@@ -0,0 +1,196 @@
+"""
+Orden manual de las tarjetas con claves de orden lexicográficas (Task.rank).
+
+Cada columna se ordena por (rank, id) descendente. Una clave es una fracción
+en base 36 escrita con RANK_ALPHABET: entre dos claves siempre hay otra, así
+que mover una tarjeta solo reescribe su propia fila con una clave entre las de
+sus nuevas vecinas (rank_between).
+
+Una tarea nueva recibe una clave derivada del instante de creación
+(new_rank), mayor que todas las anteriores: aparece arriba de su columna sin
+leer las demás, como el orden por -created_at de antes. Por eso las claves de
+las tarjetas movidas arriba de todo se limitan a la clave del instante actual
+y no tapan a las tareas que se creen después.
+
+Las claves crecen cuando muchas tarjetas se insertan en el mismo hueco. Al
+superar RANK_REBALANCE_LENGTH caracteres (o si dos tarjetas quedan con la
+misma clave) se reparten de nuevo, en la transacción del mismo movimiento, las
+claves de los tramos afectados de la columna, sin cambiar el orden
+(rebalance_column).
+"""
+import random
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+
+RANK_ALPHABET = '0123456789abcdefghijklmnopqrstuvwxyz'
+RANK_BASE = len(RANK_ALPHABET)
+
+# Dígitos del instante (microsegundos desde 1970) en las claves de tareas
+# nuevas; alcanzan hasta pasado el año 6000
+RANK_TIME_DIGITS = 11
+
+# Largo de clave a partir del cual la columna se reequilibra
+RANK_REBALANCE_LENGTH = 20
+
+# Filas leídas por consulta al recorrer una columna para reequilibrarla
+RANK_REBALANCE_CHUNK_SIZE = 2000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+last_time_rank = [0]
+time_rank_lock = threading.Lock()
+
+
+def encode_number(number, width):
+    digits = []
+    while number:
+        number, digit = divmod(number, RANK_BASE)
+        digits.append(RANK_ALPHABET[digit])
+    return ''.join(reversed(digits)).rjust(width, '0')
+
+
+def get_time_micros(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def time_rank(moment, salt):
+    """
+    Clave del instante `moment` con dos caracteres de `salt` al final, que
+    separan tareas creadas en el mismo microsegundo y evitan que la clave
+    termine en '0' (entre 'x' y 'x0' no hay ninguna clave).
+    """
+    salt %= RANK_BASE * (RANK_BASE - 1)
+    return (
+        encode_number(get_time_micros(moment), RANK_TIME_DIGITS)
+        + RANK_ALPHABET[salt // (RANK_BASE - 1)]
+        + RANK_ALPHABET[1 + salt % (RANK_BASE - 1)]
+    )
+
+
+def new_rank():
+    """Clave de una tarea nueva (default de Task.rank): crece con cada llamada del proceso"""
+    with time_rank_lock:
+        micros = max(get_time_micros(timezone.now()), last_time_rank[0] + 1)
+        last_time_rank[0] = micros
+    return time_rank(EPOCH + timedelta(microseconds=micros), random.randrange(RANK_BASE * (RANK_BASE - 1)))
+
+
+def get_now_bound():
+    """Cota superior de las claves de tarjetas movidas: la clave del instante actual"""
+    return encode_number(get_time_micros(timezone.now()), RANK_TIME_DIGITS).rstrip('0')
+
+
+def midpoint(lower, upper):
+    """
+    Clave entre `lower` ('' es el mínimo) y `upper` (None es el infinito),
+    ninguna terminada en '0'. Comparte el prefijo común y elige el dígito
+    intermedio, o agrega un dígito si los de ambas son consecutivos.
+    """
+    if upper is not None:
+        n = 0
+        while (lower[n] if n < len(lower) else '0') == upper[n]:
+            n += 1
+        if n:
+            return upper[:n] + midpoint(lower[n:], upper[n:])
+    low = RANK_ALPHABET.index(lower[0]) if lower else 0
+    high = RANK_ALPHABET.index(upper[0]) if upper is not None else RANK_BASE
+    if high - low > 1:
+        return RANK_ALPHABET[(low + high) // 2]
+    if upper is not None and len(upper) > 1:
+        return upper[:1]
+    return RANK_ALPHABET[low] + midpoint(lower[1:], None)
+
+
+def rank_between(lower, upper):
+    """
+    Clave estrictamente entre `lower` y `upper` (None: sin vecina abajo o
+    arriba). Sin vecina arriba la clave no supera la del instante actual.
+    ValueError si lower >= upper.
+    """
+    lower = lower or ''
+    if upper is None:
+        bound = get_now_bound()
+        if lower < bound:
+            upper = bound
+    if upper is not None and lower >= upper:
+        raise ValueError(f"No hay claves entre {lower!r} y {upper!r}")
+    return midpoint(lower, upper)
+
+
+def ranks_between(lower, upper, count):
+    """`count` claves ordenadas entre `lower` y `upper`, repartidas por bisección"""
+    if count <= 0:
+        return []
+    middle = rank_between(lower, upper)
+    half = count // 2
+    return ranks_between(lower, middle, half) + [middle] + ranks_between(middle, upper, count - half - 1)
+
+
+def needs_rebalance(rank):
+    return len(rank) > RANK_REBALANCE_LENGTH
+
+
+def iter_rebalance_runs(rows):
+    """
+    Recorre (id, rank) en orden ascendente y genera (clave_inferior, tramo,
+    clave_superior) por cada tramo de claves largas o repetidas, con las
+    claves válidas que lo rodean (None en los extremos de la columna).
+    """
+    lower, run = None, []
+    for task_id, rank in rows:
+        if needs_rebalance(rank) or (lower is not None and rank <= lower) or (run and rank <= run[-1][1]):
+            run.append((task_id, rank))
+            continue
+        if run:
+            yield lower, run, rank
+            run = []
+        lower = rank
+    if run:
+        yield lower, run, None
+
+
+def rebalance_column(column_type):
+    """
+    Reparte las claves de los tramos largos o repetidos de la columna entre
+    sus vecinas, sin cambiar el orden. Cada tramo se escribe en su propia
+    transacción (un savepoint dentro de la de un movimiento) y se omite si
+    alguna de sus tarjetas se movió mientras tanto.
+    Retorna la cantidad de tarjetas reescritas.
+    """
+    from .board import COLUMN_FILTERS
+    from .models import Task
+
+    rows = (
+        Task.objects.filter(COLUMN_FILTERS[column_type]).order_by('rank', 'id')
+        .values_list('id', 'rank').iterator(chunk_size=RANK_REBALANCE_CHUNK_SIZE)
+    )
+    # Los tramos se leen antes de escribir: SQLite no aísla la lectura en
+    # curso de las escrituras de la misma conexión
+    rewritten = 0
+    for lower, run, upper in list(iter_rebalance_runs(rows)):
+        ranks = ranks_between(lower, upper, len(run))
+        # Solo si acorta las claves: un hueco muy estrecho no mejora
+        if max(len(rank) for rank in ranks) >= max(len(rank) for _, rank in run) and not has_ties(lower, run):
+            continue
+        with transaction.atomic():
+            current = dict(
+                Task.objects.select_for_update().filter(id__in=[task_id for task_id, _ in run])
+                .values_list('id', 'rank')
+            )
+            if current != dict(run):
+                continue
+            Task.objects.bulk_update(
+                [Task(id=task_id, rank=rank) for (task_id, _), rank in zip(run, ranks)],
+                ['rank'], batch_size=500,
+            )
+        rewritten += len(run)
+    return rewritten
+
+
+def has_ties(lower, run):
+    """El tramo tiene claves repetidas (entre sí o con la clave inferior)"""
+    ranks = ([lower] if lower is not None else []) + [rank for _, rank in run]
+    return any(previous >= rank for previous, rank in zip(ranks, ranks[1:]))
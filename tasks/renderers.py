@@ -0,0 +1,51 @@
+import re
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+from .instrumentation import timed
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+# Floats que orjson escribe distinto que json: con exponente (1e20 frente a
+# 1e+20) o menores que 1e-4 (0.00001 frente a 1e-05). Puede coincidir dentro
+# de un string; entonces solo se pierde la ruta rápida
+DIVERGENT_FLOAT = re.compile(rb'[0-9]e-?[0-9]|0\.0000')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer que codifica con orjson cuando está instalado.
+    Produce los mismos bytes que JSONRenderer en su configuración compacta
+    (UTF-8 sin escapar y \\u2028/\\u2029 escapados); si se pide indentación,
+    salida ASCII o orjson no está disponible, delega en JSONRenderer. Las
+    fechas pasan por el encoder de DRF, y los valores que orjson no escribe
+    igual (floats con exponente, enteros de más de 64 bits, claves que no son
+    strings) también delegan en JSONRenderer. La excepción son los floats
+    infinitos o NaN: JSONRenderer los rechaza y orjson los escribe como null.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # La codificación JSON se mide junto con la serialización del listado
+        with timed('serialize'):
+            return self.encode(data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if orjson is None or indent is not None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=encoders.JSONEncoder().default, option=orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if DIVERGENT_FLOAT.search(ret):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,34 @@
+"""
+Replicación emulada para probar tasks/routers.py sin un servidor réplica: copia
+`default` a una réplica cada cierto tiempo (comando emulate_replication), así
+que entre copias la réplica queda atrasada como una réplica real.
+"""
+from django.apps import apps
+from django.db import connections, transaction
+
+# Filas por lote al copiar entre bases que no son SQLite
+COPY_BATCH_SIZE = 2000
+
+
+def copy_database(source, target):
+    """Reemplaza el contenido de `target` con el de `source` (alias de DATABASES)"""
+    source_connection, target_connection = connections[source], connections[target]
+    if source_connection.vendor == target_connection.vendor == 'sqlite':
+        # Copia de la base completa con la API de respaldo de SQLite
+        source_connection.ensure_connection()
+        target_connection.ensure_connection()
+        source_connection.connection.backup(target_connection.connection)
+        return
+    # Las tablas de la app; el esquema de la réplica se crea con migrate --database
+    models = list(apps.get_app_config('tasks').get_models())
+    with transaction.atomic(using=target):
+        for model in models:
+            model.objects.using(target).all().delete()
+            rows = model.objects.using(source).order_by('pk').iterator(chunk_size=COPY_BATCH_SIZE)
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) == COPY_BATCH_SIZE:
+                    model.objects.using(target).bulk_create(batch)
+                    batch = []
+            model.objects.using(target).bulk_create(batch)
@@ -0,0 +1,326 @@
+"""
+Conteos diarios de tareas creadas, completadas y eliminadas (TaskDailyRollup)
+mantenidos de forma incremental, para que el dashboard dibuje tendencias sin
+recorrer la tabla Task.
+
+Un día D cuenta las tareas de Task y ArchivedTask cuyo created_at,
+completed_at o deleted_at cae en D (fecha local de TIME_ZONE). Los triggers
+de la base aplican la diferencia de cada escritura, incluidos bulk_create,
+los UPDATE masivos, los borrados definitivos y el archivo:
+
+- PostgreSQL: triggers por sentencia con tablas de transición; una sentencia
+  que toca miles de filas hace un solo upsert agrupado por día.
+- SQLite: triggers por fila que llaman a tasks_local_date, una función en
+  Python registrada en cada conexión (SQLite no conoce las zonas horarias).
+
+Las tareas archivadas en un archivo JSONL (archive_tasks --to file) salen de
+los conteos, igual que las borradas definitivamente.
+
+Las filas de un día concurrido se bloquean hasta el commit de cada escritura
+que lo toca, así que las transacciones que escriben tareas deben ser cortas.
+rebuild_rollups() recalcula todo desde las tablas (comando
+backfill_task_rollups), por ejemplo tras cambiar TIME_ZONE.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+ROLLUP_TABLE = 'tasks_taskdailyrollup'
+
+# Tablas cuyas filas se cuentan
+SOURCE_TABLES = ['tasks_task', 'tasks_archivedtask']
+
+# Columna de TaskDailyRollup que cuenta cada marca de tiempo
+TIMESTAMP_COUNTERS = {
+    'created_at': 'created',
+    'completed_at': 'completed',
+    'deleted_at': 'deleted',
+}
+
+COUNTERS = list(TIMESTAMP_COUNTERS.values())
+
+# Rango de ids leído por consulta al recalcular
+BACKFILL_BATCH_SIZE = 10000
+
+SQLITE_DATE_FUNCTION = 'tasks_local_date'
+POSTGRESQL_FUNCTION = 'tasks_rollup_apply'
+
+
+def local_date(value):
+    """Fecha local (ISO) de un datetime guardado por Django en SQLite"""
+    if value is None:
+        return None
+    moment = datetime.fromisoformat(value)
+    if settings.USE_TZ:
+        moment = moment.replace(tzinfo=dt_timezone.utc).astimezone(timezone.get_default_timezone())
+    return moment.date().isoformat()
+
+
+def register_sqlite_functions(sender, connection, **kwargs):
+    """Receptor de connection_created: los triggers de SQLite usan tasks_local_date"""
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(SQLITE_DATE_FUNCTION, 1, local_date, deterministic=True)
+
+
+def get_sqlite_upsert(row, column, sign, condition=None):
+    """Suma `sign` al contador de `column` en el día de la fila `row` (new u old)"""
+    counter = TIMESTAMP_COUNTERS[column]
+    values = ", ".join(str(sign) if name == counter else "0" for name in COUNTERS)
+    where = f"{row}.{column} IS NOT NULL" + (f" AND {condition}" if condition else "")
+    return (
+        f"INSERT INTO {ROLLUP_TABLE} (day, {', '.join(COUNTERS)}) "
+        f"SELECT {SQLITE_DATE_FUNCTION}({row}.{column}), {values} WHERE {where} "
+        f"ON CONFLICT(day) DO UPDATE SET {counter} = {counter} + excluded.{counter};"
+    )
+
+
+def get_sqlite_triggers(table):
+    """{nombre: SQL} de los triggers de `table`"""
+    columns = list(TIMESTAMP_COUNTERS)
+    inserts = "\n        ".join(get_sqlite_upsert('new', column, 1) for column in columns)
+    deletes = "\n        ".join(get_sqlite_upsert('old', column, -1) for column in columns)
+    # Solo las marcas que cambiaron: se resta en el día anterior y se suma en el nuevo
+    updates = "\n        ".join(
+        get_sqlite_upsert(row, column, sign, condition=f"old.{column} IS NOT new.{column}")
+        for column in columns
+        for row, sign in (('old', -1), ('new', 1))
+    )
+    return {
+        f'{table}_rollup_insert': f"""CREATE TRIGGER IF NOT EXISTS {table}_rollup_insert AFTER INSERT ON {table} BEGIN
+        {inserts}
+    END""",
+        f'{table}_rollup_delete': f"""CREATE TRIGGER IF NOT EXISTS {table}_rollup_delete AFTER DELETE ON {table} BEGIN
+        {deletes}
+    END""",
+        f'{table}_rollup_update': f"""CREATE TRIGGER IF NOT EXISTS {table}_rollup_update
+    AFTER UPDATE OF {', '.join(columns)} ON {table} BEGIN
+        {updates}
+    END""",
+    }
+
+
+def get_postgresql_day(column):
+    if not settings.USE_TZ:
+        return f"{column}::date"
+    time_zone = settings.TIME_ZONE.replace("'", "''")
+    return f"({column} AT TIME ZONE '{time_zone}')::date"
+
+
+def get_postgresql_deltas(transition_table, sign):
+    """SELECT de (día, contadores) de cada marca de tiempo de las filas de la tabla de transición"""
+    selects = []
+    for column, counter in TIMESTAMP_COUNTERS.items():
+        values = ", ".join(str(sign) if name == counter else "0" for name in COUNTERS)
+        selects.append(
+            f"SELECT {get_postgresql_day(column)} AS day, {values} "
+            f"FROM {transition_table} WHERE {column} IS NOT NULL"
+        )
+    return " UNION ALL ".join(selects)
+
+
+def get_postgresql_upsert(deltas):
+    # ORDER BY day: dos sentencias concurrentes bloquean los días en el mismo orden
+    sums = [f"sum({counter})" for counter in COUNTERS]
+    return f"""INSERT INTO {ROLLUP_TABLE} (day, {', '.join(COUNTERS)})
+            SELECT day, {', '.join(sums)} FROM ({deltas}) AS deltas ({', '.join(['day', *COUNTERS])})
+            GROUP BY day HAVING {' OR '.join(f'{total} <> 0' for total in sums)} ORDER BY day
+            ON CONFLICT (day) DO UPDATE SET {', '.join(
+                f'{counter} = {ROLLUP_TABLE}.{counter} + excluded.{counter}' for counter in COUNTERS
+            )};"""
+
+
+def get_postgresql_function():
+    inserted, deleted = get_postgresql_deltas('new_rows', 1), get_postgresql_deltas('old_rows', -1)
+    return f"""CREATE OR REPLACE FUNCTION {POSTGRESQL_FUNCTION}() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            {get_postgresql_upsert(inserted)}
+        ELSIF TG_OP = 'DELETE' THEN
+            {get_postgresql_upsert(deleted)}
+        ELSE
+            {get_postgresql_upsert(f'{inserted} UNION ALL {deleted}')}
+        END IF;
+        RETURN NULL;
+    END;
+    $$"""
+
+
+def get_postgresql_triggers(table):
+    """SQL de los triggers por sentencia de `table` (un trigger por operación)"""
+    transitions = {
+        'insert': 'REFERENCING NEW TABLE AS new_rows',
+        'update': 'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows',
+        'delete': 'REFERENCING OLD TABLE AS old_rows',
+    }
+    return [
+        f"CREATE TRIGGER {table}_rollup_{operation} AFTER {operation.upper()} ON {table} "
+        f"{referencing} FOR EACH STATEMENT EXECUTE FUNCTION {POSTGRESQL_FUNCTION}()"
+        for operation, referencing in transitions.items()
+    ]
+
+
+def get_trigger_names():
+    return [
+        f'{table}_rollup_{operation}'
+        for table in SOURCE_TABLES for operation in ('insert', 'delete', 'update')
+    ]
+
+
+def install_rollup_triggers(db_connection):
+    """
+    Crea los triggers que faltan (idempotente). Retorna True si faltaba
+    alguno: las escrituras hechas sin ellos no se contaron.
+    """
+    vendor = db_connection.vendor
+    with db_connection.cursor() as cursor:
+        if vendor == 'postgresql':
+            cursor.execute(
+                "SELECT tgname FROM pg_trigger WHERE tgname = ANY(%s) AND NOT tgisinternal",
+                [get_trigger_names()],
+            )
+            missing = set(get_trigger_names()) - {row[0] for row in cursor.fetchall()}
+            # La función se reemplaza siempre: incorpora el TIME_ZONE actual
+            cursor.execute(get_postgresql_function())
+            for table in SOURCE_TABLES:
+                for operation in ('insert', 'update', 'delete'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_rollup_{operation} ON {table}")
+                for sql in get_postgresql_triggers(table):
+                    cursor.execute(sql)
+            return bool(missing)
+        if vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE %s",
+                ['%_rollup_%'],
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            if existing.issuperset(get_trigger_names()):
+                return False
+            for table in SOURCE_TABLES:
+                for sql in get_sqlite_triggers(table).values():
+                    cursor.execute(sql)
+            return True
+    return False
+
+
+def uninstall_rollup_triggers(db_connection):
+    vendor = db_connection.vendor
+    with db_connection.cursor() as cursor:
+        for table in SOURCE_TABLES:
+            for operation in ('insert', 'update', 'delete'):
+                if vendor == 'postgresql':
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_rollup_{operation} ON {table}")
+                elif vendor == 'sqlite':
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_rollup_{operation}")
+        if vendor == 'postgresql':
+            cursor.execute(f"DROP FUNCTION IF EXISTS {POSTGRESQL_FUNCTION}()")
+
+
+def lock_source_tables(using, models):
+    """
+    Dentro de una transacción, impide escrituras en las tablas contadas hasta
+    el commit (las lecturas siguen): el recálculo ve un estado consistente y
+    ninguna escritura de los triggers se pierde al reemplazar la tabla.
+    """
+    db_connection = connections[using]
+    with db_connection.cursor() as cursor:
+        if db_connection.vendor == 'postgresql':
+            tables = ", ".join(model._meta.db_table for model in models)
+            cursor.execute(f"LOCK TABLE {tables} IN SHARE MODE")
+        elif db_connection.vendor == 'sqlite':
+            # Toma el bloqueo de escritura de la base sin modificar nada
+            cursor.execute(f"DELETE FROM {ROLLUP_TABLE} WHERE 0")
+
+
+def count_rollups(models, using='default', batch_size=BACKFILL_BATCH_SIZE, progress=None):
+    """
+    Recalcula {día: {contador: n}} recorriendo las tablas por rangos de id,
+    con una consulta agrupada por día y marca de tiempo en cada rango: la
+    memoria depende de la cantidad de días, no de tareas. `progress(model,
+    hasta_id)` se llama tras cada rango.
+    """
+    totals = {}
+    for model in models:
+        queryset = model.objects.using(using)
+        bounds = queryset.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            continue
+        start = bounds['first']
+        while start <= bounds['last']:
+            end = start + batch_size
+            batch = queryset.filter(pk__gte=start, pk__lt=end)
+            for column, counter in TIMESTAMP_COUNTERS.items():
+                days = (
+                    batch.filter(**{f'{column}__isnull': False})
+                    .annotate(day=TruncDate(column)).order_by().values_list('day')
+                    .annotate(total=Count('pk'))
+                )
+                for day, total in days:
+                    counts = totals.setdefault(day, dict.fromkeys(COUNTERS, 0))
+                    counts[counter] += total
+            if progress is not None:
+                progress(model, min(end - 1, bounds['last']))
+            start = end
+    return totals
+
+
+def read_rollups(rollup_model, using='default'):
+    """{día: {contador: n}} de la tabla, sin los días en cero"""
+    return {
+        row['day']: {counter: row[counter] for counter in COUNTERS}
+        for row in rollup_model.objects.using(using).values('day', *COUNTERS)
+        if any(row[counter] for counter in COUNTERS)
+    }
+
+
+def rebuild_rollups(rollup_model, models, using='default', batch_size=BACKFILL_BATCH_SIZE, progress=None):
+    """Reemplaza el contenido de la tabla de conteos por el recálculo desde `models`"""
+    with transaction.atomic(using=using):
+        lock_source_tables(using, models)
+        totals = count_rollups(models, using, batch_size, progress)
+        rollup_model.objects.using(using).all().delete()
+        rollup_model.objects.using(using).bulk_create(
+            [rollup_model(day=day, **counts) for day, counts in sorted(totals.items())],
+            batch_size=1000,
+        )
+    return totals
+
+
+def compare_rollups(rollup_model, models, using='default', batch_size=BACKFILL_BATCH_SIZE, progress=None):
+    """Días en que la tabla difiere del recálculo: [(día, guardado, recalculado)]"""
+    with transaction.atomic(using=using):
+        lock_source_tables(using, models)
+        expected = count_rollups(models, using, batch_size, progress)
+        stored = read_rollups(rollup_model, using)
+    empty = dict.fromkeys(COUNTERS, 0)
+    return [
+        (day, stored.get(day, empty), expected.get(day, empty))
+        for day in sorted(set(stored) | set(expected))
+        if stored.get(day, empty) != expected.get(day, empty)
+    ]
+
+
+def get_models():
+    from django.apps import apps
+    return (
+        apps.get_model('tasks', 'TaskDailyRollup'),
+        [apps.get_model('tasks', 'Task'), apps.get_model('tasks', 'ArchivedTask')],
+    )
+
+
+def repair_rollups(sender, using, **kwargs):
+    """
+    Receptor de post_migrate: SQLite borra los triggers cuando una migración
+    reconstruye una tabla; si faltaba alguno se restauran y se recalculan los
+    conteos con las escrituras que no se contaron.
+    """
+    db_connection = connections[using]
+    if db_connection.vendor != 'sqlite':
+        return
+    if ROLLUP_TABLE not in db_connection.introspection.table_names():
+        return
+    if install_rollup_triggers(db_connection):
+        rebuild_rollups(*get_models(), using=using)
@@ -0,0 +1,113 @@
+"""
+Router de réplicas de lectura con "read-your-writes".
+
+Con DATABASE_REPLICAS (alias de app/settings.py), las lecturas de una
+petición van a una réplica y las escrituras a `default`. Una réplica puede ir
+atrasada respecto de `default`, así que una petición lee de `default` si:
+
+- su método no es seguro (POST, PUT, PATCH, DELETE): una mutación lee y
+  escribe la misma tarea, y la respuesta HTMX muestra la tarjeta recién
+  guardada;
+- ya escribió algo durante la petición o está dentro de transaction.atomic();
+- el cliente escribió hace menos de REPLICA_STICKY_SECONDS: la respuesta de
+  una escritura deja la cookie PRIMARY_COOKIE con el fin de esa ventana.
+
+Fuera de una petición (comandos de gestión, el cuerpo de las respuestas en
+streaming) todo va a `default`.
+"""
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Cookie con el instante (epoch) hasta el que el cliente lee de `default`
+PRIMARY_COOKIE = 'primary_until'
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS', 'TRACE'}
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+class RequestRouting:
+    """Estado de la petición en curso para ReplicaRouter"""
+    def __init__(self, use_primary=False):
+        self.use_primary = use_primary
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        routing = current_routing.get()
+        if not replicas or routing is None or routing.use_primary or routing.wrote:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Las réplicas tienen los mismos datos que `default`
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def is_sticky(request):
+    """El cliente escribió dentro de la ventana de REPLICA_STICKY_SECONDS"""
+    try:
+        return float(request.COOKIES.get(PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRoutingMiddleware:
+    """Fija el estado de ReplicaRouter por petición y deja la cookie tras una escritura"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        routing = self.start(request)
+        token = current_routing.set(routing)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(response, routing)
+
+    async def __acall__(self, request):
+        routing = self.start(request)
+        token = current_routing.set(routing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        return self.finish(response, routing)
+
+    def start(self, request):
+        return RequestRouting(use_primary=request.method not in SAFE_METHODS or is_sticky(request))
+
+    def finish(self, response, routing):
+        if routing.wrote and settings.DATABASE_REPLICAS:
+            window = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                PRIMARY_COOKIE, f"{time.time() + window:.3f}",
+                max_age=window, httponly=True, samesite='Lax',
+            )
+        return response
@@ -0,0 +1,186 @@
+"""
+Búsqueda de texto completo sobre el título y la descripción de las tareas.
+
+- PostgreSQL: índice GIN sobre la expresión tsvector (título con peso A,
+  descripción con peso B); la consulta usa la misma expresión, así que el
+  planificador la resuelve con el índice y ordena por ts_rank.
+- SQLite: tabla virtual FTS5 de contenido externo (tasks_task_fts) que los
+  triggers mantienen sincronizada en cada INSERT, UPDATE y DELETE, incluidos
+  bulk_create y los UPDATE masivos; se ordena por bm25.
+- Otros motores: icontains sin ranking.
+
+La consulta del usuario se reduce a palabras que deben aparecer todas; la
+última se busca como prefijo porque es la que se está escribiendo en la
+búsqueda en vivo.
+"""
+import re
+
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+
+# Configuración de texto de PostgreSQL. 'simple' no aplica stemming, igual que
+# el tokenizador unicode61 de FTS5, así ambos motores encuentran lo mismo.
+SEARCH_CONFIG = 'simple'
+
+# Nombre del índice GIN (PostgreSQL) y de la tabla FTS5 (SQLite)
+SEARCH_INDEX_NAME = 'task_search_idx'
+FTS_TABLE = 'tasks_task_fts'
+
+# Palabras consideradas de una consulta
+MAX_SEARCH_TERMS = 8
+
+# Tarjetas que muestra la búsqueda en vivo del tablero
+SEARCH_RESULTS_LIMIT = 50
+
+# Coincidencias más recientes que se ordenan por relevancia. Ordenar todas
+# las coincidencias de una palabra frecuente (cientos de miles de filas)
+# domina la latencia, y entre esas tareas las recientes son las que se buscan.
+SEARCH_CANDIDATES = 5000
+
+# Los índices de prefijo (2 a 6 caracteres) evitan que una palabra a medio
+# escribir tenga que combinar las listas de todos los términos que empiezan igual
+SQLITE_FTS_TABLE_SQL = f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, description, content='tasks_task', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3 4 5 6'
+)"""
+
+SQLITE_TRIGGERS_SQL = [
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE OF title, description ON tasks_task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+SQLITE_TRIGGER_NAMES = [f'{FTS_TABLE}_insert', f'{FTS_TABLE}_delete', f'{FTS_TABLE}_update']
+
+
+def get_search_vector():
+    """Expresión tsvector indexada; contrib.postgres solo se importa con PostgreSQL"""
+    from django.contrib.postgres.search import SearchVector
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def get_search_terms(query):
+    """Palabras de la consulta (sin operadores ni comillas del usuario)"""
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_tasks(queryset, query):
+    """
+    Filtra el queryset por la consulta y lo ordena por relevancia (anotada
+    como search_rank) entre las SEARCH_CANDIDATES coincidencias más recientes.
+    Una consulta sin palabras no encuentra nada.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    db = queryset.db
+    vendor = connections[db].vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        search_query = SearchQuery(
+            " & ".join([*terms[:-1], f"{terms[-1]}:*"]), config=SEARCH_CONFIG, search_type='raw'
+        )
+        candidates = queryset.annotate(search_vector=get_search_vector()).filter(
+            search_vector=search_query
+        ).order_by('-id').values('id')[:SEARCH_CANDIDATES]
+        return queryset.filter(id__in=candidates).annotate(
+            search_rank=SearchRank(get_search_vector(), search_query),
+        ).order_by('-search_rank', '-id')
+
+    if vendor == 'sqlite':
+        # Cada palabra entre comillas (escapando las propias), la última como prefijo
+        match = " ".join('"{}"'.format(term.replace('"', '""')) for term in terms) + "*"
+        # Join con la tabla FTS5: el MATCH guía el plan y bm25 (menor es mejor)
+        # se expone como rank; RawSQL obligaría a repetir el MATCH por fila
+        where = [f"{FTS_TABLE}.rowid = tasks_task.id", f"{FTS_TABLE} MATCH %s"]
+        params = [match]
+        # Las listas de FTS5 están ordenadas por rowid: recorrerlas desde el
+        # final da el rowid mínimo de la ventana de candidatos sin calcular bm25
+        with connections[db].cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s ORDER BY rowid DESC LIMIT 1 OFFSET %s",
+                [match, SEARCH_CANDIDATES - 1],
+            )
+            row = cursor.fetchone()
+        if row is not None:
+            where.append(f"{FTS_TABLE}.rowid >= %s")
+            params.append(row[0])
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=where,
+            params=params,
+            select={'search_rank': f"-bm25({FTS_TABLE}, 10.0, 1.0)"},
+        ).order_by('-search_rank', '-id')
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(description__icontains=term)
+    return queryset.filter(condition).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    ).order_by('-id')
+
+
+def install_search_index(schema_editor, model):
+    """Crea el índice de búsqueda del motor en uso (idempotente)"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        with schema_editor.connection.cursor() as cursor:
+            constraints = schema_editor.connection.introspection.get_constraints(cursor, model._meta.db_table)
+        if SEARCH_INDEX_NAME not in constraints:
+            schema_editor.add_index(model, GinIndex(get_search_vector(), name=SEARCH_INDEX_NAME))
+    elif vendor == 'sqlite':
+        install_sqlite_triggers(schema_editor.connection, create_table=True)
+
+
+def uninstall_search_index(schema_editor, model):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {SEARCH_INDEX_NAME}")
+    elif vendor == 'sqlite':
+        for trigger in SQLITE_TRIGGER_NAMES:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def install_sqlite_triggers(db_connection, create_table=False):
+    """
+    Crea la tabla FTS5 (si se pide) y los triggers que faltan. SQLite borra los
+    triggers cuando una migración reconstruye tasks_task, por eso esto también
+    corre en post_migrate; si faltaba alguno, el índice se reconstruye desde
+    la tabla para recuperar los cambios que no se sincronizaron.
+    """
+    with db_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name LIKE %s",
+            [f'{FTS_TABLE}%'],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if FTS_TABLE not in existing:
+            if not create_table:
+                return
+            cursor.execute(SQLITE_FTS_TABLE_SQL)
+        if existing.issuperset(SQLITE_TRIGGER_NAMES):
+            return
+        for sql in SQLITE_TRIGGERS_SQL:
+            cursor.execute(sql)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def repair_search_index(sender, using, **kwargs):
+    """Receptor de post_migrate: restaura los triggers de FTS5 si una migración los borró"""
+    if connections[using].vendor == 'sqlite':
+        install_sqlite_triggers(connections[using])
@@ -0,0 +1,37 @@
+"""
+Generación de tareas sintéticas para benchmarks.
+Usa bulk_create por lotes, igual que la migración 0002_dummy_data.
+"""
+import random
+from .models import Task
+
+# Distribución por estado: (completed, deleted, peso). Predominan las eliminadas,
+# como en tableros con mucho historial.
+STATUS_WEIGHTS = [
+    (False, False, 15),
+    (True, False, 25),
+    (False, True, 45),
+    (True, True, 15),
+]
+
+
+def build_task(rng, number):
+    """Construye (sin guardar) una tarea sintética"""
+    completed, deleted, _ = rng.choices(STATUS_WEIGHTS, weights=[w for *_, w in STATUS_WEIGHTS])[0]
+    return Task(
+        title=f"Tarea de prueba {number}",
+        description=f"Descripción generada para la tarea {number}. " * rng.randint(0, 4),
+        completed=completed,
+        deleted=deleted,
+    )
+
+
+def seed_tasks(count, batch_size=5000, seed=0):
+    """Inserta `count` tareas sintéticas por lotes y retorna la cantidad creada"""
+    rng = random.Random(seed)
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        Task.objects.bulk_create([build_task(rng, created + i) for i in range(size)])
+        created += size
+    return created
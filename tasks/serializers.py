@@ -1,9 +1,79 @@
+from django.utils import timezone
 from rest_framework import serializers
 from .models import Task
 
 
 class TaskSerializer(serializers.ModelSerializer):
+    """
+    Acepta el argumento opcional `fields` para serializar solo un subconjunto
+    de campos (ej. TaskSerializer(tasks, many=True, fields=['id', 'title'])).
+    """
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
     class Meta:
         model = Task
         fields = ['id', 'title', 'description', 'completed', 'deleted', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+# Máximo de tareas por petición en los endpoints masivos
+BULK_MAX_ITEMS = 1000
+
+
+class TaskIdsSerializer(serializers.Serializer):
+    """Entrada de los endpoints masivos que operan sobre IDs"""
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=BULK_MAX_ITEMS
+    )
+
+
+class BulkToggleSerializer(TaskIdsSerializer):
+    # Si se indica, fija el estado en vez de alternarlo
+    completed = serializers.BooleanField(required=False)
+
+
+class BulkDeleteSerializer(TaskIdsSerializer):
+    # soft=True mueve las tareas a eliminadas en vez de borrarlas
+    soft = serializers.BooleanField(default=False)
+
+
+# Campos de Task que se serializan como datetime (completed_at y deleted_at no
+# son parte de la API, pero sí de los archivos de tasks/archive.py)
+DATETIME_FIELDS = {'created_at', 'updated_at', 'completed_at', 'deleted_at'}
+
+
+def datetime_to_representation(value, tz):
+    """Mismo formato que serializers.DateTimeField (ISO 8601 en la zona horaria `tz`)"""
+    if value is None:
+        return None
+    value = value.astimezone(tz).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def task_rows_to_representation(rows, fields):
+    """
+    Lectura rápida para listados: convierte tuplas de
+    Task.objects.values_list(*fields, ...) en diccionarios idénticos a
+    TaskSerializer(...).data, sin instanciar modelos ni recorrer los campos del
+    serializer. `fields` debe seguir el orden de TaskSerializer.Meta.fields; las
+    columnas extra al final de cada tupla se ignoran. Las escrituras siguen
+    usando TaskSerializer.
+    """
+    tz = timezone.get_current_timezone()
+    datetime_positions = [
+        position for position, name in enumerate(fields) if name in DATETIME_FIELDS
+    ]
+    data = []
+    for row in rows:
+        item = dict(zip(fields, row))
+        for position in datetime_positions:
+            name = fields[position]
+            item[name] = datetime_to_representation(item[name], tz)
+        data.append(item)
+    return data
@@ -0,0 +1,18 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from tasks.cards import render_task_card, render_task_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def task_card(task, column_type, oob=False):
+    """Tarjeta de una tarea desde la caché de tarjetas (ver tasks/cards.py)"""
+    return render_task_card(task, column_type, oob)
+
+
+@register.simple_tag
+def task_cards(tasks, column_type):
+    """Tarjetas de una columna, resolviendo la caché en bloque"""
+    return mark_safe("\n".join(render_task_cards(tasks, column_type)))
@@ -1,3 +1,1159 @@
-from django.test import TestCase
+import gzip
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
 
-# Create your tests here.
+import brotli
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.utils import load_backend
+from django.http import HttpResponseNotFound
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .archive import (
+    JSONLArchive, TableArchive, archive_deleted_tasks, get_archivable_queryset, restore_from_file, restore_from_table,
+)
+from .board import COLUMN_FILTERS, COLUMN_PAGE_SIZE, get_column_page
+from .cards import local_cards, render_task_card, render_task_cards
+from .loadtest import Scenario, TaskIds, build_scenarios
+from .management.commands.build_responsive_images import RESPONSIVE_IMAGES, VARIANT_FORMATS
+from .metrics import expose_pool_metrics
+from .models import ArchivedTask, Task, TaskDailyRollup
+from .pool import PoolTimeout, close_pools, get_pool_stats
+from .querybudget import (
+    QUERY_BUDGETS, UNBUDGETED_URLS, assert_query_budget, check_query_budget, get_missing_budgets
+)
+from .querydetector import QueryRecorder
+from .ranking import (
+    RANK_ALPHABET, get_now_bound, needs_rebalance, new_rank, rank_between, ranks_between, rebalance_column
+)
+from .renderers import FastJSONRenderer
+from .replication import copy_database
+from .rollups import compare_rollups, get_models, repair_rollups, uninstall_rollup_triggers
+from .routers import PRIMARY_COOKIE
+from .search import FTS_TABLE, search_tasks
+from .seeding import seed_tasks
+from .serializers import TaskSerializer
+
+HTMX = {'HTTP_HX_REQUEST': 'true'}
+
+# Las páginas se renderizan sin el manifiesto de collectstatic (ver
+# StaticAssetsTests para los archivos servidos)
+without_manifest = override_settings(STORAGES={
+    **settings.STORAGES,
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+
+
+@without_manifest
+class BoardTemplateTests(TestCase):
+    def test_search_targets_board_columns_only(self):
+        """La búsqueda reemplaza solo las columnas, no el contenedor con el buscador"""
+        html = self.client.get(reverse('home')).content.decode()
+        self.assertEqual(html.count('id="board-columns"'), 1)
+        self.assertEqual(html.count('id="columns-board"'), 1)
+        self.assertIn('hx-target="#board-columns"', html)
+
+
+class TaskToggleAPITests(TestCase):
+    def test_toggle(self):
+        task = Task.objects.create(title="Tarea")
+        response = self.client.post(f'/api/tasks/{task.id}/toggle/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['completed'])
+
+    def test_toggle_invalid_pk_is_not_found(self):
+        self.assertEqual(self.client.post('/api/tasks/abc/toggle/').status_code, 404)
+        self.assertEqual(self.client.post('/api/tasks/999999/toggle/').status_code, 404)
+
+
+class TaskEventsViewTests(TestCase):
+    def test_get_without_asgi_disables_stream(self):
+        """Bajo WSGI responde 204 para que EventSource no reconecte"""
+        self.assertEqual(self.client.get(reverse('task_events')).status_code, 204)
+
+    def test_other_methods_not_allowed(self):
+        response = self.client.post(reverse('task_events'))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET')
+
+
+class TaskBulkUpdateAPITests(TestCase):
+    def post(self, items):
+        return self.client.post(reverse('tasks-bulk-update'), items, content_type='application/json')
+
+    def test_each_item_writes_only_its_fields(self):
+        first = Task.objects.create(title="Primera", description="Original")
+        second = Task.objects.create(title="Segunda")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([{'id': first.id, 'title': "Editada"}, {'id': second.id, 'completed': True}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item['status'] for item in response.json()['results']], ['updated', 'updated'])
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(sum('"title"' in sql for sql in updates), 1)
+        self.assertEqual(sum('"completed"' in sql for sql in updates), 1)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.title, first.description, first.completed), ("Editada", "Original", False))
+        self.assertEqual((second.title, second.completed), ("Segunda", True))
+        self.assertIsNotNone(second.completed_at)
+        # Cada resultado es la tarea tal como quedó guardada
+        results = response.json()['results']
+        self.assertEqual(results[0]['task'], TaskSerializer(first).data)
+        self.assertEqual(results[1]['task'], TaskSerializer(second).data)
+
+    def test_ids_are_coerced_or_rejected(self):
+        task = Task.objects.create(title="Tarea")
+        response = self.post([{'id': str(task.id), 'title': "Con id texto"}, {'id': "abc", 'title': "x"}, {'title': "y"}])
+        results = response.json()['results']
+        self.assertEqual(results[0]['id'], task.id)
+        self.assertEqual(results[0]['status'], 'updated')
+        self.assertEqual([results[1]['status'], results[2]['status']], ['invalid', 'invalid'])
+        self.assertIn('id', results[1]['errors'])
+        task.refresh_from_db()
+        self.assertEqual(task.title, "Con id texto")
+
+    def test_non_object_items_are_rejected(self):
+        task = Task.objects.create(title="Tarea")
+        results = self.post([task.id, "texto", {'id': task.id, 'completed': True}]).json()['results']
+        self.assertEqual([result['status'] for result in results], ['invalid', 'invalid', 'updated'])
+        self.assertIn('non_field_errors', results[0]['errors'])
+        self.assertNotIn('id', results[0]['errors'])
+
+    def test_bulk_create_stamps_with_created_at(self):
+        tasks = Task.objects.bulk_create([Task(title="Hecha", completed=True), Task(title="Borrada", deleted=True)])
+        self.assertEqual(tasks[0].completed_at, tasks[0].created_at)
+        self.assertEqual(tasks[1].deleted_at, tasks[1].created_at)
+        task = Task.objects.create(title="Hecha", completed=True)
+        self.assertEqual(task.completed_at, task.created_at)
+
+
+class TaskImportAPITests(TestCase):
+    def post(self, body, content_type):
+        """Envía el cuerpo tal cual: client.post() lo recodificaría con el charset"""
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        return self.client.generic('POST', reverse('tasks-import'), body, content_type=content_type)
+
+    def test_csv_with_charset(self):
+        response = self.post("title,description\nDesde CSV,Con acento é\n", 'text/csv; charset=utf-8')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.get(title="Desde CSV").description, "Con acento é")
+
+    def test_csv_with_other_charset(self):
+        body = "title\nCodificada en latin-1 ñ\n".encode('latin-1')
+        response = self.post(body, 'Text/CSV; charset=ISO-8859-1')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(title="Codificada en latin-1 ñ").exists())
+
+    def test_ndjson_with_charset(self):
+        response = self.post('{"title": "Desde NDJSON"}\n', 'application/x-ndjson; charset=utf-8')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(title="Desde NDJSON").exists())
+
+    def test_unsupported_media_type(self):
+        self.assertEqual(self.post('{"title": "x"}', 'application/json').status_code, 415)
+        self.assertEqual(self.post(b"title\nx\n", 'text/csv; charset=no-existe').status_code, 415)
+
+
+# Cache-Control de los archivos con hash en el nombre (WhiteNoise.immutable_file_test)
+IMMUTABLE_CACHE_CONTROL = 'max-age=315360000, public, immutable'
+
+# Accept-Encoding de la petición: Content-Encoding esperado y cómo decodificarlo
+ENCODINGS = {
+    'br, gzip': ('br', brotli.decompress),
+    'gzip': ('gzip', gzip.decompress),
+    '': (None, lambda content: content),
+}
+
+
+class StaticAssetsTests(SimpleTestCase):
+    """
+    Estáticos de producción: collectstatic en un directorio temporal con
+    DEBUG=False y peticiones a WhiteNoise por el CSS y las variantes de las
+    imágenes.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        static_root = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(static_root.cleanup)
+        settings_override = override_settings(
+            DEBUG=False, STATIC_ROOT=static_root.name,
+            WHITENOISE_USE_FINDERS=False, WHITENOISE_AUTOREFRESH=False,
+        )
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.static_root = Path(static_root.name)
+        cls.middleware = WhiteNoiseMiddleware(lambda request: HttpResponseNotFound())
+
+    def get(self, path, accept_encoding=''):
+        """Pide `path` a WhiteNoise; retorna (respuesta, bytes)"""
+        response = self.middleware(RequestFactory().get(path, HTTP_ACCEPT_ENCODING=accept_encoding))
+        content = b''.join(response.streaming_content) if response.streaming else response.content
+        response.close()
+        return response, content
+
+    def assert_served(self, name, accept_encoding, expected_encoding, decode):
+        """El archivo con hash se sirve immutable, con la codificación esperada y sus bytes recolectados"""
+        with self.subTest(name=name, accept_encoding=accept_encoding):
+            response, content = self.get(staticfiles_storage.url(name), accept_encoding)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get('Content-Encoding'), expected_encoding)
+            self.assertEqual(response['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+            collected = (self.static_root / staticfiles_storage.stored_name(name)).read_bytes()
+            self.assertEqual(decode(content), collected)
+            return response
+
+    def get_variants(self):
+        for image, widths in RESPONSIVE_IMAGES.items():
+            path = Path(image)
+            for width in widths:
+                for extension in VARIANT_FORMATS:
+                    yield str(path.with_name(f"{path.stem}-{width}.{extension}")), extension
+
+    def test_css_precompressed_and_immutable(self):
+        for accept_encoding, (expected_encoding, decode) in ENCODINGS.items():
+            self.assert_served('css/dist.css', accept_encoding, expected_encoding, decode)
+
+    def test_unhashed_name_not_immutable(self):
+        response, _ = self.get('/static/css/dist.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response.get('Cache-Control', ''))
+
+    def test_css_references_hashed_variants(self):
+        css = (self.static_root / staticfiles_storage.stored_name('css/dist.css')).read_text()
+        for image in RESPONSIVE_IMAGES:
+            self.assertIn(staticfiles_storage.url(image), css)
+        for variant, _ in self.get_variants():
+            self.assertIn(staticfiles_storage.url(variant), css)
+
+    def test_images_served_as_is_and_immutable(self):
+        """Las imágenes ya están comprimidas: se sirven tal cual, pero immutable"""
+        for variant, extension in self.get_variants():
+            response = self.assert_served(variant, 'br, gzip', *ENCODINGS[''])
+            self.assertEqual(response.get('Content-Type'), f'image/{extension}')
+
+
+def build_extra_scenarios():
+    """Rutas que la suite de carga no recorre"""
+    return [
+        Scenario('metrics', 200, lambda c: c.get(reverse('metrics'))),
+        Scenario('api_root', 200, lambda c: c.get(reverse('api-root'))),
+        Scenario('api_export', 200, lambda c: c.get(
+            reverse('tasks-export', args=['ndjson']), {'completed': 'true', 'deleted': 'false'}
+        )),
+        Scenario('api_import', 201, lambda c: c.post(
+            reverse('tasks-import'), '{"title": "Importada"}\n{"title": "Importada 2"}\n',
+            content_type='application/x-ndjson',
+        )),
+    ]
+
+
+@without_manifest
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Cada URL dentro de su presupuesto de QUERY_BUDGETS, con los escenarios de
+    la suite de carga. TransactionTestCase porque los presupuestos cuentan el
+    BEGIN de transaction.atomic(), que en TestCase sería un SAVEPOINT más.
+    """
+    def test_every_url_has_a_budget(self):
+        self.assertEqual(get_missing_budgets(), [])
+
+    def send(self, scenario):
+        response = scenario.request(self.client)
+        # Las respuestas en streaming consultan mientras se envían
+        if response.streaming:
+            b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, scenario.status)
+        return response
+
+    def test_scenarios_within_budget(self):
+        seed_tasks(300)
+        ids = list(Task.objects.order_by('-id').values_list('id', flat=True)[:300])
+        measured = set()
+        for scenario in build_scenarios(self.client, TaskIds(ids)) + build_extra_scenarios():
+            with self.subTest(scenario=scenario.name):
+                # En frío se resuelve la ruta; en caliente (cachés de tarjetas
+                # y de ETag) se aplica assert_query_budget
+                recorder = QueryRecorder()
+                with connection.execute_wrapper(recorder):
+                    response = self.send(scenario)
+                url_name = resolve(response.request['PATH_INFO']).url_name
+                measured.add(url_name)
+                self.assertEqual(check_query_budget(url_name, recorder.records), [])
+                with assert_query_budget(url_name):
+                    response = self.send(scenario)
+        self.assertEqual(set(QUERY_BUDGETS) - UNBUDGETED_URLS - measured, set())
+
+
+# Backend con pool para cada backend de Django
+POOLED_ENGINES = {
+    'postgresql': 'tasks.backends.postgresql',
+    'sqlite': 'tasks.backends.sqlite3',
+}
+
+POOL_ALIAS = 'pool_test'
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """
+    Pool de conexiones (tasks/pool.py) con wrappers como los de cada hilo de
+    Django. Usa la base de DATABASES['default'] si es PostgreSQL (solo
+    ejecuta SELECT 1) y si no un archivo SQLite temporal.
+    """
+    def setUp(self):
+        default = connections['default']
+        self.settings_dict = {**default.settings_dict, 'CONN_MAX_AGE': 0}
+        self.settings_dict['ENGINE'] = POOLED_ENGINES[default.vendor]
+        if default.vendor == 'sqlite':
+            directory = tempfile.TemporaryDirectory()
+            self.addCleanup(directory.cleanup)
+            self.settings_dict['NAME'] = Path(directory.name) / 'pool.sqlite3'
+        self.backend = load_backend(self.settings_dict['ENGINE'])
+        close_pools(POOL_ALIAS)
+        self.addCleanup(close_pools, POOL_ALIAS)
+
+    def new_wrapper(self, **pool):
+        """DatabaseWrapper como el de un hilo de Django, con su propio POOL"""
+        return self.backend.DatabaseWrapper({**self.settings_dict, 'POOL': pool}, POOL_ALIAS)
+
+    def query(self, wrapper):
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            return cursor.fetchone()[0]
+
+    def get_stats(self):
+        stats, = [stats for stats in get_pool_stats() if stats.alias == POOL_ALIAS]
+        return stats
+
+    def test_threads_wait_and_never_exceed_max_connections(self):
+        threads, requests, max_connections = 16, 20, 4
+        peak, errors, done = [0], [], threading.Event()
+
+        def request_loop():
+            wrapper = self.new_wrapper(MAX_CONNECTIONS=max_connections, TIMEOUT=30)
+            try:
+                for _ in range(requests):
+                    self.query(wrapper)
+                    # Simula el resto de la petición con la conexión tomada
+                    time.sleep(0.001)
+                    wrapper.close()
+            except Exception as error:
+                errors.append(repr(error))
+
+        def sample():
+            while not done.is_set():
+                pools = [stats for stats in get_pool_stats() if stats.alias == POOL_ALIAS]
+                if pools:
+                    peak[0] = max(peak[0], pools[0].in_use + pools[0].idle)
+                time.sleep(0.0005)
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        workers = [threading.Thread(target=request_loop) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        done.set()
+        sampler.join()
+
+        stats = self.get_stats()
+        self.assertEqual(errors, [])
+        self.assertLessEqual(stats.created, max_connections)
+        self.assertLessEqual(peak[0], max_connections)
+        self.assertEqual(stats.acquisitions, threads * requests)
+        self.assertGreater(stats.waits, 0)
+        self.assertEqual(stats.in_use, 0)
+
+    def test_broken_idle_connection_is_replaced(self):
+        wrapper = self.new_wrapper(MAX_CONNECTIONS=1, CHECK_AFTER=0)
+        self.query(wrapper)
+        raw_connection = wrapper.connection
+        wrapper.close()
+        # Simula que el servidor cerró la conexión inactiva
+        raw_connection.close()
+
+        self.assertEqual(self.query(wrapper), 1)
+        self.assertIsNot(wrapper.connection, raw_connection)
+        wrapper.close()
+        stats = self.get_stats()
+        self.assertEqual((stats.discarded, stats.created), (1, 2))
+
+    def test_exhausted_pool_times_out(self):
+        pool = {'MAX_CONNECTIONS': 1, 'TIMEOUT': 0.2}
+        holder, waiter = self.new_wrapper(**pool), self.new_wrapper(**pool)
+        self.query(holder)
+        with self.assertRaises(PoolTimeout):
+            self.query(waiter)
+        holder.close()
+        waiter.close()
+        # Liberada la conexión, la siguiente petición la obtiene
+        self.assertEqual(self.query(waiter), 1)
+        waiter.close()
+
+        self.assertEqual(self.get_stats().timeouts, 1)
+        self.assertIn(f'tasks_db_pool_timeouts_total{{alias="{POOL_ALIAS}"', "\n".join(expose_pool_metrics()))
+
+
+REPLICA = 'replica_test'
+
+
+class AliasRecorder:
+    """execute_wrapper que cuenta las consultas de una conexión"""
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@without_manifest
+@override_settings(DATABASE_REPLICAS=[REPLICA], REPLICA_STICKY_SECONDS=30)
+class ReplicaRouterTests(TransactionTestCase):
+    """
+    Router de réplicas (tasks/routers.py) con una réplica que solo se
+    actualiza al copiarla, como una réplica atrasada.
+    """
+    # '__all__' se resuelve al preparar la clase, ya con la réplica registrada
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        # La réplica es otra base de prueba con la misma configuración que `default`
+        default = connections['default']
+        replica_settings = {**default.settings_dict, 'TEST': {**default.settings_dict['TEST'], 'MIRROR': None}}
+        if default.vendor != 'sqlite':
+            replica_settings['TEST']['NAME'] = f"{default.settings_dict['NAME']}_replica"
+        connections.settings[REPLICA] = replica_settings
+        cls.old_replica_name = connections[REPLICA].creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].creation.destroy_test_db(cls.old_replica_name, verbosity=0)
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+
+    def setUp(self):
+        seed_tasks(200)
+        copy_database('default', REPLICA)
+
+    def request(self, send):
+        """Ejecuta la petición contando las consultas por base; retorna (respuesta, {alias: consultas})"""
+        recorders = {alias: AliasRecorder() for alias in ('default', REPLICA)}
+        with connections['default'].execute_wrapper(recorders['default']), \
+                connections[REPLICA].execute_wrapper(recorders[REPLICA]):
+            response = send()
+        return response, {alias: recorder.count for alias, recorder in recorders.items()}
+
+    def test_read_your_writes(self):
+        title = "Escrita en la primaria"
+
+        _, counts = self.request(lambda: self.client.get(reverse('home')))
+        self.assertEqual(counts['default'], 0, "el tablero lee solo de la réplica")
+        self.assertGreater(counts[REPLICA], 0)
+
+        response, counts = self.request(lambda: self.client.post(
+            reverse('api_create_task'), {'title': title, 'description': ""}, **HTMX
+        ))
+        self.assertEqual(counts[REPLICA], 0, "la creación usa solo `default`")
+        self.assertGreater(counts['default'], 0)
+        self.assertIn(title, response.content.decode())
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+        self.assertFalse(Task.objects.using(REPLICA).filter(title=title).exists())
+
+        response, counts = self.request(lambda: self.client.get(reverse('home')))
+        self.assertEqual(counts[REPLICA], 0, "tras escribir, el tablero lee de `default`")
+        self.assertIn(title, response.content.decode())
+
+        response, counts = self.request(lambda: self.client.get(
+            reverse('tasks-list'), {'completed': 'false', 'deleted': 'false'}
+        ))
+        self.assertEqual(counts[REPLICA], 0, "tras escribir, la API lee de `default`")
+        self.assertIn(title, response.content.decode())
+
+        # Vence la ventana: el cliente vuelve a la réplica, todavía atrasada
+        self.client.cookies[PRIMARY_COOKIE] = '0'
+        response, counts = self.request(lambda: self.client.get(reverse('home')))
+        self.assertEqual(counts['default'], 0, "tras la ventana, el tablero lee de la réplica")
+        self.assertNotIn(title, response.content.decode())
+
+        copy_database('default', REPLICA)
+        response, counts = self.request(lambda: self.client.get(reverse('home')))
+        self.assertEqual(counts['default'], 0)
+        self.assertIn(title, response.content.decode())
+
+
+class DailyRollupTests(TestCase):
+    """Conteos diarios que mantienen los triggers de tasks/rollups.py"""
+    def assert_rollups_match(self):
+        self.assertEqual(compare_rollups(*get_models()), [])
+
+    def test_triggers_match_recount_on_every_write_path(self):
+        task = Task.objects.create(title="Creada")
+        Task.objects.bulk_create([Task(title=f"En lote {i}", completed=i % 2 == 0) for i in range(6)])
+        task.completed = True
+        task.save()
+        Task.objects.filter(title__startswith="En lote").toggle_completed()
+        Task.objects.filter(title="En lote 1").soft_delete()
+        other = Task.objects.get(title="En lote 2")
+        other.deleted = True
+        other.save(update_fields=['deleted', 'updated_at'])
+        Task.objects.filter(title="En lote 3").delete()
+        self.assert_rollups_match()
+
+        # Archivar y restaurar no cambian los conteos
+        before = TaskDailyRollup.objects.series(timezone.localdate(), timezone.localdate())
+        list(archive_deleted_tasks(timezone.now() + timedelta(seconds=1), TableArchive()))
+        self.assertFalse(Task.objects.filter(deleted=True).exists())
+        self.assert_rollups_match()
+        list(restore_from_table())
+        self.assert_rollups_match()
+        self.assertEqual(TaskDailyRollup.objects.series(timezone.localdate(), timezone.localdate()), before)
+
+    @skipUnlessDBFeature('can_rollback_ddl')
+    def test_post_migrate_restores_dropped_triggers(self):
+        """SQLite borra los triggers al reconstruir una tabla; post_migrate los restaura"""
+        if connection.vendor != 'sqlite':
+            self.skipTest("La reparación solo aplica a SQLite")
+        uninstall_rollup_triggers(connection)
+        Task.objects.create(title="Sin trigger")
+        repair_rollups(sender=None, using='default')
+        self.assert_rollups_match()
+        Task.objects.create(title="Con trigger")
+        self.assert_rollups_match()
+
+
+    def test_stamps_stay_out_of_the_api(self):
+        Task.objects.create(title="Hecha", completed=True)
+        response = self.client.get(reverse('tasks-list'))
+        self.assertEqual(
+            list(response.json()['results'][0]),
+            ['id', 'title', 'description', 'completed', 'deleted', 'created_at', 'updated_at'],
+        )
+
+
+def get_column(column_type):
+    return list(
+        Task.objects.filter(COLUMN_FILTERS[column_type]).order_by('-rank', '-id').values_list('id', flat=True)
+    )
+
+
+class ArchiveTests(TestCase):
+    """Retención y restauración de tareas eliminadas (tasks/archive.py)"""
+    def test_retention_counts_from_deleted_at(self):
+        old = Task.objects.create(title="Vieja")
+        Task.objects.filter(id=old.id).soft_delete()
+        Task.objects.filter(id=old.id).update(deleted_at=timezone.now() - timedelta(days=40))
+        # Editarla después no reinicia el plazo
+        Task.objects.filter(id=old.id).update(title="Editada", updated_at=timezone.now())
+        recent = Task.objects.create(title="Reciente", deleted=True)
+
+        cutoff = timezone.now() - timedelta(days=30)
+        list(archive_deleted_tasks(cutoff, TableArchive()))
+        self.assertEqual(list(ArchivedTask.objects.values_list('id', flat=True)), [old.id])
+        self.assertTrue(Task.objects.filter(id=recent.id).exists())
+
+        # Restaurada, la retención vuelve a contar desde la restauración
+        list(restore_from_table())
+        self.assertFalse(get_archivable_queryset(cutoff).exists())
+
+    def create_old_deleted(self):
+        """Tres tareas eliminadas hace 40 días, reordenadas a mano; retorna sus datos"""
+        tasks = [Task.objects.create(title=f"Archivada {n}", description="Texto", completed=n == 1) for n in range(3)]
+        ids = [task.id for task in tasks]
+        Task.objects.filter(id__in=ids).soft_delete()
+        Task.objects.filter(id__in=ids).update(deleted_at=timezone.now() - timedelta(days=40))
+        # La primera creada queda arriba de la columna, al revés del orden por defecto
+        for task, rank in zip(tasks, ['y', 'x', 'w']):
+            Task.objects.filter(id=task.id).update(rank=rank)
+        fields = ['id', 'title', 'description', 'completed', 'created_at', 'completed_at', 'rank']
+        return list(Task.objects.filter(id__in=ids).order_by('id').values(*fields)), fields
+
+    def assert_round_trip(self, archive, restore):
+        expected, fields = self.create_old_deleted()
+        column = get_column('deleted')
+        list(archive_deleted_tasks(timezone.now() - timedelta(days=30), archive))
+        archive.close()
+        self.assertFalse(Task.objects.filter(id__in=[item['id'] for item in expected]).exists())
+
+        list(restore())
+        restored = Task.objects.filter(id__in=[item['id'] for item in expected]).order_by('id')
+        self.assertEqual(list(restored.values(*fields)), expected)
+        # Vuelven a su posición, no arriba de la columna
+        self.assertEqual(get_column('deleted'), column)
+        self.assertEqual(compare_rollups(*get_models()), [])
+
+    def test_table_round_trip(self):
+        self.assert_round_trip(TableArchive(), restore_from_table)
+        self.assertFalse(ArchivedTask.objects.exists())
+
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / 'tareas.jsonl.gz'
+            self.assert_round_trip(JSONLArchive(path), lambda: restore_from_file(path, batch_size=2))
+            with gzip.open(path, 'rt', encoding='utf-8') as archive_file:
+                self.assertEqual(len(archive_file.readlines()), 3)
+
+    def test_restore_without_rank(self):
+        """Los archivos anteriores a rank restauran en el orden de created_at"""
+        expected, _ = self.create_old_deleted()
+        list(archive_deleted_tasks(timezone.now() - timedelta(days=30), TableArchive()))
+        ArchivedTask.objects.update(rank=None)
+        list(restore_from_table())
+        ids = [item['id'] for item in expected]
+        self.assertEqual([task_id for task_id in get_column('deleted') if task_id in ids], ids[::-1])
+
+
+@without_manifest
+class DashboardRangeTests(TestCase):
+    def test_valid_range(self):
+        today = timezone.localdate()
+        response = self.client.get(
+            reverse('dashboard'), {'start': str(today - timedelta(days=7)), 'end': str(today)}, **HTMX
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_invalid_range(self):
+        today = timezone.localdate()
+        for params in ({'start': '2024-13-45'}, {'start': str(today), 'end': str(today - timedelta(days=1))},
+                       {'start': str(today - timedelta(days=400)), 'end': str(today)}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse('dashboard'), params, **HTMX).status_code, 400)
+
+
+class RankKeyTests(SimpleTestCase):
+    """Claves de orden manual de tasks/ranking.py"""
+    def assert_valid_rank(self, rank):
+        self.assertTrue(rank)
+        self.assertFalse(rank.strip(RANK_ALPHABET))
+        self.assertFalse(rank.endswith('0'))
+
+    def test_rank_between_stays_between_neighbours(self):
+        rng = random.Random(0)
+        ranks = sorted({new_rank() for _ in range(50)})
+        for _ in range(5000):
+            index = rng.randrange(len(ranks) + 1)
+            lower = ranks[index - 1] if index else None
+            upper = ranks[index] if index < len(ranks) else None
+            rank = rank_between(lower, upper)
+            self.assert_valid_rank(rank)
+            if lower is not None:
+                self.assertGreater(rank, lower)
+            if upper is not None:
+                self.assertLess(rank, upper)
+            ranks.insert(index, rank)
+
+        spread = ranks_between(ranks[0], ranks[1], 1000)
+        self.assertEqual(spread, sorted(set(spread)))
+        self.assertTrue(all(ranks[0] < rank < ranks[1] for rank in spread))
+
+    def test_moved_to_top_stays_below_new_tasks(self):
+        moved = rank_between(new_rank(), None)
+        self.assertLessEqual(moved, get_now_bound())
+        self.assertGreater(new_rank(), moved)
+
+
+@without_manifest
+class TaskMoveTests(TestCase):
+    """Mover tarjetas con el endpoint HTMX"""
+    @classmethod
+    def setUpTestData(cls):
+        seed_tasks(150)
+
+    def move(self, task_id, after_id):
+        """Mueve con el endpoint HTMX; retorna (respuesta, UPDATEs ejecutados)"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse('api_move_task', args=[task_id]), {'after': after_id or ''}, **HTMX
+            )
+        return response, sum(query['sql'].startswith('UPDATE') for query in queries)
+
+    def test_moves_write_one_row_and_keep_order(self):
+        rng = random.Random(0)
+        expected = get_column('pending')
+        for _ in range(100):
+            task_id = rng.choice(expected)
+            expected.remove(task_id)
+            # Arriba de todo, bajo una tarjeta al azar o siempre en el mismo hueco
+            index = rng.choice([0, rng.randrange(len(expected) + 1), 1])
+            after_id = expected[index - 1] if index else None
+            expected.insert(index, task_id)
+            response, updates = self.move(task_id, after_id)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(updates, 1)
+        self.assertEqual(get_column('pending'), expected)
+
+    def test_move_is_not_an_edit(self):
+        """Mover no cambia updated_at (ni la marca de editada) pero sí el ETag"""
+        column = get_column('pending')
+        task = Task.objects.get(id=column[-1])
+        etag = self.client.get('/', **HTMX)['ETag']
+        self.move(task.id, column[0])
+        moved = Task.objects.get(id=task.id)
+        self.assertEqual(moved.updated_at, task.updated_at)
+        self.assertIsNotNone(moved.moved_at)
+        self.assertEqual(get_column('pending')[1], task.id)
+        self.assertNotEqual(self.client.get('/', **HTMX)['ETag'], etag)
+
+    def test_invalid_after(self):
+        task_id = get_column('pending')[0]
+        for after_id in (task_id, get_column('completed')[0]):
+            with self.subTest(after=after_id):
+                response, updates = self.move(task_id, after_id)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(updates, 0)
+
+
+@without_manifest
+class RebalanceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_tasks(150)
+
+    def damage_keys(self):
+        """Claves largas bajo la primera tarjeta y repetidas al final de la columna"""
+        column = get_column('pending')
+        # Claves largas: muchas tarjetas insertadas en el mismo hueco
+        top, below = Task.objects.filter(id__in=column[:2]).order_by('-rank')
+        upper, lower = top.rank, below.rank
+        # (si la columna no alcanza, la última tarjeta vuelve a ese hueco)
+        task_ids, task_id = iter(column[2:-7]), None
+        while not needs_rebalance(lower):
+            task_id = next(task_ids, task_id)
+            lower = rank_between(lower, upper)
+            Task.objects.filter(id=task_id).update(rank=lower)
+        # Claves repetidas
+        tied_rank = Task.objects.get(id=column[-1]).rank
+        Task.objects.filter(id__in=column[-6:]).update(rank=tied_rank)
+
+    def assert_keys_fixed(self):
+        ranks = list(Task.objects.filter(COLUMN_FILTERS['pending']).values_list('rank', flat=True))
+        self.assertFalse(any(needs_rebalance(rank) for rank in ranks))
+        self.assertEqual(len(set(ranks)), len(ranks))
+
+    def test_rebalance_keeps_order_and_fixes_keys(self):
+        self.damage_keys()
+        before = get_column('pending')
+        self.assertGreater(rebalance_column('pending'), 0)
+        self.assertEqual(get_column('pending'), before)
+        self.assert_keys_fixed()
+
+    def test_move_rebalances_in_its_transaction(self):
+        self.damage_keys()
+        expected = get_column('pending')
+        # Una tarjeta más en el hueco de las claves largas
+        task_id = expected.pop(-7)
+        expected.insert(1, task_id)
+        response = self.client.post(reverse('api_move_task', args=[task_id]), {'after': expected[0]}, **HTMX)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(get_column('pending'), expected)
+        self.assert_keys_fixed()
+
+
+@without_manifest
+class ConditionalGetTests(TestCase):
+    """ETag / 304 de tasks/conditional.py"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.task = Task.objects.create(title="Tarea")
+        cls.other = Task.objects.create(title="Otra")
+
+    def setUp(self):
+        # La primera petición fija la cookie CSRF, que forma parte del ETag
+        self.client.get('/')
+
+    def get_etag(self, path, **headers):
+        response = self.client.get(path, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_matching_etag_is_not_modified(self):
+        for path, headers in (('/', HTMX), ('/', {}), (reverse('dashboard'), HTMX), (reverse('tasks-list'), {})):
+            with self.subTest(path=path, headers=headers):
+                etag = self.get_etag(path, **headers)
+                response = self.client.get(path, HTTP_IF_NONE_MATCH=etag, **headers)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_every_write_changes_the_etag(self):
+        writes = [
+            ('create', lambda: Task.objects.create(title="Nueva")),
+            ('update', lambda: Task.objects.filter(id=self.task.id).update(title="Editada", updated_at=timezone.now())),
+            ('toggle', lambda: Task.objects.filter(id=self.task.id).toggle_completed()),
+            ('soft_delete', lambda: Task.objects.filter(id=self.task.id).soft_delete()),
+            # Borrar una tarea que no es la última modificada no cambia max(updated_at)
+            ('delete', lambda: Task.objects.filter(id=self.other.id).delete()),
+        ]
+        etag = self.get_etag('/', **HTMX)
+        for name, write in writes:
+            with self.subTest(write=name):
+                write()
+                new_etag = self.get_etag('/', **HTMX)
+                self.assertNotEqual(new_etag, etag)
+                response = self.client.get('/', HTTP_IF_NONE_MATCH=etag, **HTMX)
+                self.assertEqual(response.status_code, 200)
+                etag = new_etag
+
+    def test_variants_have_their_own_etag(self):
+        list_url = reverse('tasks-list')
+        self.assertNotEqual(self.get_etag('/', **HTMX), self.get_etag('/'))
+        self.assertNotEqual(self.get_etag(list_url), self.get_etag(list_url + '?completed=true'))
+        self.assertNotEqual(self.get_etag(list_url), self.get_etag(reverse('dashboard'), **HTMX))
+        # El ETag de una variante no sirve para la otra
+        etag = self.get_etag('/', **HTMX)
+        self.assertEqual(self.client.get('/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        etag = self.get_etag(list_url)
+        self.assertEqual(self.client.get(list_url + '?fields=id', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+def get_counters(html):
+    """Contadores out-of-band de una respuesta: {columna: cantidad}"""
+    return {
+        column_type: int(count)
+        for column_type, count in re.findall(r'id="(\w+)-count"[^>]*hx-swap-oob="true"\s*>(\d+)<', html)
+    }
+
+
+def get_card_ids(html):
+    return [int(task_id) for task_id in re.findall(r'id="task-card-(\d+)"', html)]
+
+
+@without_manifest
+class TaskFragmentTests(TestCase):
+    """Respuestas HTMX de las mutaciones: la tarjeta afectada y los contadores como OOB"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.pending = Task.objects.create(title="Pendiente")
+        Task.objects.create(title="Hecha", completed=True)
+
+    def post(self, name, *args, data=None, target=None):
+        # Las tarjetas apuntan a sí mismas (o usan hx-swap="none")
+        target = target or (f'task-card-{args[0]}' if args else '')
+        response = self.client.post(reverse(name, args=args), data or {}, HTTP_HX_TARGET=target, **HTMX)
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def assert_counters(self, html, *column_types):
+        counts = Task.objects.status_counts()
+        self.assertEqual(get_counters(html), {column_type: counts[column_type] for column_type in column_types})
+
+    def test_create(self):
+        html = self.post('api_create_task', data={'title': "Nueva"})
+        task = Task.objects.get(title="Nueva")
+        self.assertIn('hx-swap-oob="afterbegin:#pendingColumn .column__body"', html)
+        self.assertEqual(get_card_ids(html), [task.id])
+        self.assertNotIn('hx-swap-oob="delete"', html)
+        self.assert_counters(html, 'pending')
+        self.assertNotIn('id="tasks-container"', html)
+
+    def test_toggle_moves_the_card_between_columns(self):
+        html = self.post('api_toggle_task', self.pending.id)
+        self.assertIn(f'<div id="task-card-{self.pending.id}" hx-swap-oob="delete"></div>', html)
+        self.assertIn('hx-swap-oob="afterbegin:#completedColumn .column__body"', html)
+        self.assert_counters(html, 'pending', 'completed')
+        self.assertIn('id="pending-empty"', html)
+        self.assertIn('id="completed-empty"', html)
+
+    def test_update_in_place(self):
+        html = self.post('api_update_task', self.pending.id, data={'title': "Editada"})
+        # Misma columna: la tarjeta es el contenido principal, sin OOB ni contadores
+        self.assertEqual(get_card_ids(html), [self.pending.id])
+        self.assertNotIn('hx-swap-oob', html)
+        self.assertIn("Editada", html)
+
+    def test_soft_delete(self):
+        html = self.post('api_delete_task', self.pending.id)
+        self.assertIn(f'<div id="task-card-{self.pending.id}" hx-swap-oob="delete"></div>', html)
+        self.assertIn('hx-swap-oob="afterbegin:#deletedColumn .column__body"', html)
+        self.assert_counters(html, 'pending', 'deleted')
+
+    def test_hard_delete(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(
+                reverse('tasks-detail', args=[self.pending.id]), HTTP_HX_TARGET=f'task-card-{self.pending.id}',
+                **HTMX,
+            )
+        html = response.content.decode()
+        self.assertEqual(get_card_ids(html), [self.pending.id])
+        self.assertIn('hx-swap-oob="delete"', html)
+        self.assert_counters(html, 'pending')
+        # Los contadores del evento y de la respuesta salen de la misma consulta
+        self.assertEqual(sum('COUNT(' in query['sql'] for query in queries), 1)
+
+    def test_container_target_gets_the_full_board(self):
+        html = self.post('api_toggle_task', self.pending.id, target='tasks-container')
+        self.assertIn('id="tasks-container"', html)
+        self.assertEqual(get_counters(html), {})
+
+
+@without_manifest
+class ColumnPaginationTests(TestCase):
+    """Paginación por keyset de las columnas del tablero"""
+    @classmethod
+    def setUpTestData(cls):
+        tasks = Task.objects.bulk_create([Task(title=f"Tarea {i}") for i in range(COLUMN_PAGE_SIZE * 3 + 5)])
+        # Claves repetidas justo en los cortes de página: el id desempata
+        tied = [task.id for task in tasks[COLUMN_PAGE_SIZE - 5:COLUMN_PAGE_SIZE * 2 + 5]]
+        Task.objects.filter(id__in=tied).update(rank=tasks[0].rank)
+        Task.objects.create(title="Hecha", completed=True)
+
+    def test_cursor_pages_cover_the_column_once(self):
+        expected = get_column('pending')
+        pages, cursor = [], None
+        while True:
+            tasks, cursor = get_column_page('pending', cursor)
+            pages.append([task.id for task in tasks])
+            if cursor is None:
+                break
+        self.assertGreater(len(pages), 3)
+        self.assertTrue(all(len(page) == COLUMN_PAGE_SIZE for page in pages[:-1]))
+        self.assertEqual(sum(pages, []), expected)
+
+    def test_column_page_view_follows_the_cursor(self):
+        expected = get_column('pending')
+        seen, url = [], reverse('column_page', args=['pending'])
+        while url:
+            html = self.client.get(url, **HTMX).content.decode()
+            seen += get_card_ids(html)
+            match = re.search(r'hx-get="(/columns/[^"]+)"', html)
+            url = match and match.group(1)
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_or_column(self):
+        url = reverse('column_page', args=['pending'])
+        self.assertEqual(self.client.get(url, {'cursor': 'x!_1'}, **HTMX).status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': 'abc_x'}, **HTMX).status_code, 400)
+        self.assertEqual(self.client.get(reverse('column_page', args=['other']), **HTMX).status_code, 404)
+
+
+class TaskListAPITests(TestCase):
+    """Filtros, ?fields= y paginación por cursor del listado de la API"""
+    @classmethod
+    def setUpTestData(cls):
+        Task.objects.all().delete()
+        # Varias tareas con el mismo created_at: el id desempata el cursor
+        same_moment = timezone.now() - timedelta(days=1)
+        Task.objects.bulk_create(
+            [Task(title=f"Tarea {i}", created_at=same_moment, completed=i % 3 == 0) for i in range(12)]
+        )
+        Task.objects.bulk_create([Task(title=f"Otra {i}", deleted=i % 2 == 0) for i in range(13)])
+
+    def get(self, url=None, **params):
+        response = self.client.get(url or reverse('tasks-list'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pages(self):
+        expected = list(Task.objects.order_by('created_at', 'id').values_list('id', flat=True))
+        seen, page = [], self.get(page_size=5)
+        while True:
+            self.assertLessEqual(len(page['results']), 5)
+            seen += [item['id'] for item in page['results']]
+            if not page['next']:
+                break
+            page = self.get(page['next'])
+        self.assertEqual(seen, expected)
+
+    def test_filters(self):
+        cases = [
+            ({'completed': 'true'}, Q(completed=True)),
+            ({'completed': '0', 'deleted': 'false'}, Q(completed=False, deleted=False)),
+            ({'deleted': 'TRUE'}, Q(deleted=True)),
+            ({'updated_since': (timezone.now() - timedelta(hours=1)).isoformat()}, Q()),
+            ({'updated_since': '2999-01-01T00:00:00'}, Q(pk__in=[])),
+        ]
+        for params, condition in cases:
+            with self.subTest(params=params):
+                expected = list(Task.objects.filter(condition).order_by('created_at', 'id').values_list('id', flat=True))
+                results = self.get(page_size=1000, **params)['results']
+                self.assertEqual([item['id'] for item in results], expected)
+        for params in ({'completed': 'sí'}, {'updated_since': 'ayer'}, {'updated_since': '2024-13-01'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse('tasks-list'), params).status_code, 400)
+
+    def test_fields(self):
+        results = self.get(fields='title, id')['results']
+        # En el orden de TaskSerializer.Meta.fields, sin created_at aunque lo use el cursor
+        self.assertEqual(list(results[0]), ['id', 'title'])
+        for fields in ('', 'id,secret', 'password'):
+            with self.subTest(fields=fields):
+                self.assertEqual(self.client.get(reverse('tasks-list'), {'fields': fields}).status_code, 400)
+
+    def test_rows_match_the_serializer(self):
+        """La lectura con values_list() da lo mismo que TaskSerializer sobre instancias"""
+        Task.objects.create(title="Acentos y   separadores", description="ñandú", completed=True)
+        response = self.client.get(reverse('tasks-list'), {'page_size': 1000})
+        expected = TaskSerializer(Task.objects.order_by('created_at', 'id'), many=True).data
+        self.assertEqual(response.json()['results'], expected)
+        # Y el cuerpo son los bytes que escribiría JSONRenderer
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """FastJSONRenderer debe producir exactamente los bytes de JSONRenderer"""
+    def test_same_bytes_as_json_renderer(self):
+        moment = timezone.now()
+        samples = [
+            {'results': [{'id': 1, 'title': "ñandú 🐦", 'completed': True, 'created_at': None}], 'next': None},
+            {'text': "separadores   y  , comillas \" y barra \\ y </script>"},
+            {'moment': moment, 'day': moment.date(), 'decimal': Decimal('1.50'), 'uuid': uuid.UUID(int=1)},
+            {'lazy': gettext_lazy("Tarea"), 'floats': [0.1, 1.5, -0.0, 0.0001], 'nested': {'empty': [], 'map': {}}},
+            # Valores que orjson escribe distinto o no admite: delega en JSONRenderer
+            {'floats': [1e20, 1.5e300, 1e-05, 123456789.123], 'big': 2 ** 70, 'keys': {1: 'uno', None: 'nada'}},
+            [], "texto", 42, None,
+        ]
+        for data in samples:
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_and_ascii_fall_back(self):
+        data = {'title': "ñandú", 'items': [1, 2]}
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json', context),
+            JSONRenderer().render(data, 'application/json', context),
+        )
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'cards': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'cards-test'},
+})
+class CardCacheTests(TestCase):
+    """Caché de tarjetas de tasks/cards.py, con clave (id, updated_at, column_type)"""
+    def setUp(self):
+        local_cards.clear()
+        self.task = Task.objects.create(title="Original")
+
+    def test_cached_until_updated_at_changes(self):
+        self.assertIn("Original", render_task_card(self.task, 'pending'))
+        # Sin cambiar updated_at la tarjeta sale de la caché
+        self.task.title = "Editada"
+        self.assertIn("Original", render_task_card(self.task, 'pending'))
+        # Una escritura cambia updated_at y con él la clave
+        self.task.save()
+        self.assertIn("Editada", render_task_card(self.task, 'pending'))
+
+    def test_not_shared_across_columns(self):
+        pending = render_task_card(self.task, 'pending')
+        Task.objects.filter(id=self.task.id).toggle_completed()
+        self.task.refresh_from_db()
+        completed = render_task_card(self.task, 'completed')
+        self.assertNotEqual(completed, pending)
+        self.assertIn('border-green-500', completed)
+        # Misma tarea y updated_at, otra columna: otra entrada
+        deleted = render_task_card(self.task, 'deleted')
+        self.assertIn('border-red-500', deleted)
+        self.assertNotIn('type="checkbox"', deleted)
+        self.assertNotEqual(render_task_card(self.task, 'completed', oob=True), completed)
+
+    @override_settings(TASK_CARD_CACHE_ALIAS='cards')
+    def test_shared_cache(self):
+        render_task_cards([self.task], 'pending')
+        # Otro worker (LRU local vacío) lee la tarjeta de la caché compartida
+        local_cards.clear()
+        self.task.title = "Editada"
+        self.assertIn("Original", render_task_card(self.task, 'pending'))
+        self.task.save()
+        local_cards.clear()
+        self.assertIn("Editada", render_task_card(self.task, 'pending'))
+
+
+@without_manifest
+class SearchTests(TestCase):
+    """Búsqueda de texto completo (tasks/search.py) en el tablero y la API"""
+    @classmethod
+    def setUpTestData(cls):
+        cls.in_description = Task.objects.create(title="Reunión", description="Preparar el informe de ventas")
+        cls.in_title = Task.objects.create(title="Informe trimestral", description="Para dirección")
+        cls.other = Task.objects.create(title="Comprar café", description="Y azúcar", completed=True)
+
+    def search(self, query):
+        return list(search_tasks(Task.objects.all(), query).values_list('id', flat=True))
+
+    def assert_index_in_sync(self):
+        if connection.vendor == 'sqlite':
+            # Con rank = 1 compara el índice FTS5 con el contenido de tasks_task
+            with connection.cursor() as cursor:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+
+    def test_relevance_order(self):
+        # El título pesa más que la descripción
+        self.assertEqual(self.search("informe"), [self.in_title.id, self.in_description.id])
+        # Todas las palabras, la última como prefijo y sin acentos
+        self.assertEqual(self.search("informe vent"), [self.in_description.id])
+        self.assertEqual(self.search("CAFE"), [self.other.id])
+        self.assertEqual(self.search("' \" * -"), [])
+
+    def test_index_follows_every_write(self):
+        task = Task.objects.create(title="Llamar al banco")
+        self.assertEqual(self.search("banco"), [task.id])
+        task.title = "Llamar al seguro"
+        task.save()
+        self.assertEqual(self.search("banco"), [])
+        self.assertEqual(self.search("seguro"), [task.id])
+        Task.objects.filter(id=task.id).update(description="Póliza del auto")
+        self.assertEqual(self.search("poliza"), [task.id])
+        created = Task.objects.bulk_create([Task(title="Pagar seguro"), Task(title="Otra cosa")])
+        self.assertEqual(set(self.search("seguro")), {task.id, created[0].id})
+        # Alternar no toca el texto; el índice sigue igual
+        Task.objects.filter(id=task.id).toggle_completed()
+        Task.objects.filter(id=task.id).delete()
+        self.assertEqual(self.search("seguro"), [created[0].id])
+        self.assert_index_in_sync()
+
+    def test_board_search(self):
+        response = self.client.get(reverse('search_tasks'), {'q': "informe"}, **HTMX)
+        html = response.content.decode()
+        self.assertIn('id="searchResults"', html)
+        self.assertEqual(get_card_ids(html), [self.in_title.id, self.in_description.id])
+        # Sin consulta vuelve el tablero completo
+        html = self.client.get(reverse('search_tasks'), {'q': " "}, **HTMX).content.decode()
+        self.assertIn('id="pendingColumn"', html)
+
+    def test_api_search(self):
+        response = self.client.get(reverse('tasks-list'), {'q': "informe", 'fields': 'id,title'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            'next': None,
+            'previous': None,
+            'results': [
+                {'id': self.in_title.id, 'title': "Informe trimestral"},
+                {'id': self.in_description.id, 'title': "Reunión"},
+            ],
+        })
+        # Se combina con los filtros del listado
+        results = self.client.get(reverse('tasks-list'), {'q': "café", 'completed': 'false'}).json()['results']
+        self.assertEqual(results, [])
@@ -0,0 +1,204 @@
+"""
+Exportación e importación masiva de tareas en NDJSON y CSV, en streaming.
+
+La exportación recorre el queryset con .iterator() (o .aiterator() bajo
+ASGI) y emite un bloque de texto cada EXPORT_CHUNK_SIZE filas, así que la
+memoria no depende de la cantidad de tareas. La importación lee la entrada
+línea a línea, valida cada fila con los campos de TaskSerializer y escribe
+con bulk_create en lotes de IMPORT_BATCH_SIZE, una transacción por lote: si
+se interrumpe, los lotes ya confirmados quedan guardados.
+"""
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import SkipField, empty
+
+from .models import Task
+from .serializers import TaskSerializer, task_rows_to_representation
+
+# Tipo de contenido de cada formato
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+# Filas por bloque leído de la base de datos y enviado al cliente
+EXPORT_CHUNK_SIZE = 2000
+
+# Campos que se importan; id, created_at y updated_at los asigna la base de datos
+IMPORT_FIELDS = ['title', 'description', 'completed', 'deleted']
+
+# Tareas por INSERT (y por transacción) en la importación
+IMPORT_BATCH_SIZE = 1000
+
+# Errores de validación detallados en el reporte (el resto solo se cuenta)
+IMPORT_MAX_ERRORS = 100
+
+
+def format_rows(rows, fields, export_format):
+    """Texto de un bloque de tuplas de values_list(*fields)"""
+    data = task_rows_to_representation(rows, fields)
+    if export_format == 'ndjson':
+        return "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in data)
+    buffer = io.StringIO()
+    csv.DictWriter(buffer, fields).writerows(data)
+    return buffer.getvalue()
+
+
+def format_csv_header(fields):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(fields)
+    return buffer.getvalue()
+
+
+def iter_export(queryset, fields, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """Genera la exportación en bloques de texto"""
+    if export_format == 'csv':
+        yield format_csv_header(fields)
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    while chunk := list(islice(rows, chunk_size)):
+        yield format_rows(chunk, fields, export_format)
+
+
+async def aiter_export(queryset, fields, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Versión asíncrona de iter_export. Bajo ASGI, StreamingHttpResponse lee un
+    iterador síncrono completo en memoria antes de enviarlo.
+    """
+    if export_format == 'csv':
+        yield format_csv_header(fields)
+    chunk = []
+    # .values() y no .values_list(): en Django 5.0 el iterable de values_list
+    # ejecuta la consulta al crearse, fuera del hilo de aiterator()
+    async for row in queryset.values(*fields).aiterator(chunk_size=chunk_size):
+        chunk.append([row[name] for name in fields])
+        if len(chunk) == chunk_size:
+            yield format_rows(chunk, fields, export_format)
+            chunk = []
+    if chunk:
+        yield format_rows(chunk, fields, export_format)
+
+
+def parse_ndjson(lines):
+    """Genera (número de línea, objeto) de líneas de texto NDJSON; None si no es JSON válido"""
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError:
+            yield number, None
+
+
+def parse_csv(lines):
+    """Genera (número de línea, fila) de líneas de texto CSV con encabezado"""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        # Las celdas que faltan al final de la fila toman el valor por defecto
+        yield reader.line_num, {name: value for name, value in row.items() if value is not None}
+
+
+PARSERS = {
+    'ndjson': parse_ndjson,
+    'csv': parse_csv,
+}
+
+
+class TaskRowValidator:
+    """
+    Valida una fila con los campos de TaskSerializer (mismos tipos, largo
+    máximo y valores booleanos aceptados que la API) sin instanciar un
+    serializer por fila.
+    """
+    def __init__(self):
+        fields = TaskSerializer().fields
+        self.fields = {name: fields[name] for name in IMPORT_FIELDS}
+
+    def validate(self, item):
+        """Retorna (valores para Task, errores por campo)"""
+        if not isinstance(item, dict):
+            return None, {'non_field_errors': ["Se esperaba un objeto JSON."]}
+        values, errors = {}, {}
+        for name, field in self.fields.items():
+            try:
+                values[name] = field.run_validation(item.get(name, empty))
+            except SkipField:
+                pass
+            except ValidationError as error:
+                errors[name] = error.detail
+        return values, errors
+
+
+class ImportReport:
+    """Resultado de una importación: tareas creadas, errores y throughput"""
+    def __init__(self):
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.start = time.perf_counter()
+        self.seconds = 0
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def update(self):
+        self.seconds = time.perf_counter() - self.start
+
+    @property
+    def rows_per_second(self):
+        return self.created / self.seconds if self.seconds else 0
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows_per_second),
+        }
+
+
+def save_batch(batch):
+    with transaction.atomic():
+        Task.objects.bulk_create(batch)
+    return len(batch)
+
+
+def iter_import(records, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Importa (número de línea, fila) de PARSERS; las filas inválidas se omiten
+    y se reportan. Genera el reporte después de cada lote guardado.
+    """
+    validator = TaskRowValidator()
+    report = ImportReport()
+    batch = []
+    for line, item in records:
+        values, errors = validator.validate(item)
+        if errors:
+            report.add_error(line, errors)
+            continue
+        batch.append(Task(**values))
+        if len(batch) == batch_size:
+            report.created += save_batch(batch)
+            batch = []
+            report.update()
+            yield report
+    if batch:
+        report.created += save_batch(batch)
+    report.update()
+    yield report
+
+
+def import_tasks(records, batch_size=IMPORT_BATCH_SIZE):
+    """Importa todas las filas y retorna el ImportReport final"""
+    for report in iter_import(records, batch_size):
+        pass
+    return report
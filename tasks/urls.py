@@ -1,16 +1,53 @@
+from django.conf import settings
 from django.urls import path
+from .conditional import conditional_on_tasks
 from .views import (
-    HomeClass, DashboardView, EditTaskFormView,
-    APIToggleTaskView, APICreateTaskView, APIUpdateTaskView, APIDeleteTaskView
+    HomeClass, DashboardView, EditTaskFormView, ColumnPageView, SearchView, TaskEventsView,
+    MetricsView, APIToggleTaskView, APICreateTaskView, APIUpdateTaskView, APIDeleteTaskView,
+    APIMoveTaskView
 )
 
+if settings.ASYNC_VIEWS:
+    # Con ASYNC_VIEWS (bajo ASGI): mismas URLs y respuestas, con el ORM asíncrono.
+    # conditional_on_tasks se aplica a la vista ya construida porque
+    # method_decorator la volvería síncrona.
+    from .async_views import (
+        AsyncHomeView, AsyncDashboardView, AsyncEditTaskFormView, AsyncColumnPageView,
+        AsyncToggleTaskView, AsyncCreateTaskView, AsyncUpdateTaskView, AsyncDeleteTaskView,
+        AsyncMoveTaskView
+    )
+    home_view = conditional_on_tasks(AsyncHomeView.as_view())
+    dashboard_view = conditional_on_tasks(AsyncDashboardView.as_view())
+    edit_task_view = AsyncEditTaskFormView.as_view()
+    column_page_view = AsyncColumnPageView.as_view()
+    create_task_view = AsyncCreateTaskView.as_view()
+    toggle_task_view = AsyncToggleTaskView.as_view()
+    update_task_view = AsyncUpdateTaskView.as_view()
+    delete_task_view = AsyncDeleteTaskView.as_view()
+    move_task_view = AsyncMoveTaskView.as_view()
+else:
+    home_view = HomeClass.as_view()
+    dashboard_view = DashboardView.as_view()
+    edit_task_view = EditTaskFormView.as_view()
+    column_page_view = ColumnPageView.as_view()
+    create_task_view = APICreateTaskView.as_view()
+    toggle_task_view = APIToggleTaskView.as_view()
+    update_task_view = APIUpdateTaskView.as_view()
+    delete_task_view = APIDeleteTaskView.as_view()
+    move_task_view = APIMoveTaskView.as_view()
+
 urlpatterns = [
-    path("", HomeClass.as_view(), name="home"),
-    path("dashboard/", DashboardView.as_view(), name="dashboard"),
-    path("edit-task/<int:task_id>/", EditTaskFormView.as_view(), name="edit_task"),
+    path("", home_view, name="home"),
+    path("dashboard/", dashboard_view, name="dashboard"),
+    path("edit-task/<int:task_id>/", edit_task_view, name="edit_task"),
+    path("columns/<str:column_type>/", column_page_view, name="column_page"),
+    path("search/", SearchView.as_view(), name="search_tasks"),
+    path("events/", TaskEventsView.as_view(), name="task_events"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     
-    path("api-htmx/tasks/create/", APICreateTaskView.as_view(), name="api_create_task"),
-    path("api-htmx/tasks/<int:task_id>/toggle/", APIToggleTaskView.as_view(), name="api_toggle_task"),
-    path("api-htmx/tasks/<int:task_id>/update/", APIUpdateTaskView.as_view(), name="api_update_task"),
-    path("api-htmx/tasks/<int:task_id>/delete/", APIDeleteTaskView.as_view(), name="api_delete_task"),
+    path("api-htmx/tasks/create/", create_task_view, name="api_create_task"),
+    path("api-htmx/tasks/<int:task_id>/toggle/", toggle_task_view, name="api_toggle_task"),
+    path("api-htmx/tasks/<int:task_id>/update/", update_task_view, name="api_update_task"),
+    path("api-htmx/tasks/<int:task_id>/delete/", delete_task_view, name="api_delete_task"),
+    path("api-htmx/tasks/<int:task_id>/move/", move_task_view, name="api_move_task"),
 ]
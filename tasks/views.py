@@ -1,13 +1,28 @@
+import asyncio
+from datetime import timedelta
 from django.views.generic import TemplateView
 from django.views import View
 from django.shortcuts import render, get_object_or_404
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.http import require_http_methods
 from django.utils.decorators import method_decorator
-from bokeh.plotting import figure
-from bokeh.embed import components
-import math
-from .models import Task
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
+from django.conf import settings
+from .models import Task, TaskDailyRollup
+from .metrics import expose_metrics
+from .search import SEARCH_RESULTS_LIMIT, search_tasks
+from .charts import get_dashboard_charts, get_trend_chart
+from .conditional import conditional_on_tasks
+from .events import get_broker, format_sse, publish_task_event
+from .board import (
+    COLUMN_TYPES, get_tasks_context, get_column_page, render_task_change, get_column_before_toggle,
+    parse_move_after, move_task, get_task_moved_context, render_task_fragments
+)
 
+@method_decorator(conditional_on_tasks, name='dispatch')
 class HomeClass(TemplateView):
     template_name = "home.html"
 
@@ -18,9 +33,7 @@ class HomeClass(TemplateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["pending_tasks"] = Task.objects.filter(completed=False, deleted=False).order_by("-created_at")
-        context["completed_tasks"] = Task.objects.filter(completed=True, deleted=False).order_by("-created_at")
-        context["deleted_tasks"] = Task.objects.filter(deleted=True).order_by("-created_at")
+        context.update(get_tasks_context())
         return context
 
 
@@ -32,16 +45,82 @@ class EditTaskFormView(View):
         return render(request, 'partials/edit_task_form.html', {'task': task})
 
 
-def get_tasks_context():
+@method_decorator(require_http_methods(["GET"]), name='dispatch')
+class ColumnPageView(View):
+    """Vista para cargar la siguiente página de una columna (scroll infinito)"""
+    def get(self, request, column_type):
+        if column_type not in COLUMN_TYPES:
+            raise Http404("Columna inexistente")
+        try:
+            tasks, next_cursor = get_column_page(column_type, request.GET.get('cursor'))
+        except ValueError:
+            return HttpResponseBadRequest("Cursor inválido")
+        return render(request, 'partials/column_page.html', {
+            'tasks': tasks,
+            'column_type': column_type,
+            'next_cursor': next_cursor,
+        })
+
+
+@method_decorator(require_http_methods(["GET"]), name='dispatch')
+class SearchView(View):
     """
-    Obtiene el contexto de tareas organizadas por estado.
-    Consulta directamente el modelo para renderizar las vistas.
+    Búsqueda en vivo: devuelve solo las tarjetas que coinciden, ordenadas por
+    relevancia, o el tablero completo cuando se borra la consulta.
     """
-    return {
-        'pending_tasks': Task.objects.filter(completed=False, deleted=False).order_by("-created_at"),
-        'completed_tasks': Task.objects.filter(completed=True, deleted=False).order_by("-created_at"),
-        'deleted_tasks': Task.objects.filter(deleted=True).order_by("-created_at"),
-    }
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        if not query:
+            return render(request, 'partials/all_columns.html', get_tasks_context())
+        tasks = list(search_tasks(Task.objects.all(), query)[:SEARCH_RESULTS_LIMIT + 1])
+        return render(request, 'partials/search_results.html', {
+            'query': query,
+            'tasks': tasks[:SEARCH_RESULTS_LIMIT],
+            'has_more': len(tasks) > SEARCH_RESULTS_LIMIT,
+        })
+
+
+class TaskEventsView(View):
+    """
+    Stream Server-Sent Events con los cambios de tareas (ver tasks/events.py).
+    Es una vista asíncrona: bajo ASGI cada conexión abierta es solo una
+    corrutina esperando en su cola, sin ocupar un worker. Los métodos se
+    restringen con http_method_names porque require_http_methods es síncrono.
+    """
+    http_method_names = ['get']
+    # Segundos entre comentarios keep-alive para que los proxies no corten la conexión
+    keepalive_seconds = 15
+
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            # Bajo WSGI el stream ocuparía un worker para siempre; 204 hace que
+            # EventSource deje de reconectar y el tablero funcione sin push
+            return HttpResponse(status=204)
+        response = StreamingHttpResponse(self.stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self):
+        events = get_broker().listen()
+        next_event = asyncio.ensure_future(anext(events))
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                done, _ = await asyncio.wait({next_event}, timeout=self.keepalive_seconds)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_sse(next_event.result())
+                next_event = asyncio.ensure_future(anext(events))
+        finally:
+            # Al desconectarse el cliente se cancela la espera y se libera la suscripción
+            next_event.cancel()
+            try:
+                await next_event
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+            await events.aclose()
 
 
 # Vistas adaptadoras para conectar API REST con HTMX
@@ -49,17 +128,20 @@ def get_tasks_context():
 class APIToggleTaskView(View):
     """Vista para alternar el estado de completado de una tarea"""
     def post(self, request, task_id):
+        task = context = None
         try:
-            # Alternar el estado directamente en la base de datos
-            task = get_object_or_404(Task, id=task_id)
-            task.completed = not task.completed
-            task.save()
+            # Alternar el estado con un solo UPDATE condicional (sin leer y
+            # reescribir la fila, así dos clics seguidos no se pisan)
+            if not Task.objects.filter(id=task_id).toggle_completed():
+                raise Http404("Tarea inexistente")
+            task = Task.objects.get(id=task_id)
+            context = publish_task_event('toggled', task, get_column_before_toggle(task))
         except Exception as e:
             print(f"Error al alternar tarea: {e}")
         
-        # Devolver el contenedor completo de tareas
-        context = get_tasks_context()
-        return render(request, 'partials/tasks_container.html', context)
+        # Devolver solo la tarjeta movida, o el contenedor completo si se pidió
+        previous_column = get_column_before_toggle(task) if task is not None else None
+        return render_task_change(request, task, previous_column, context)
 
 
 @method_decorator(require_http_methods(["POST"]), name='dispatch')
@@ -69,19 +151,20 @@ class APICreateTaskView(View):
         title = request.POST.get('title', '').strip()
         description = request.POST.get('description', '').strip()
         
+        task = context = None
         if title:
             try:
                 # Crear directamente en la base de datos
-                Task.objects.create(
+                task = Task.objects.create(
                     title=title,
                     description=description
                 )
+                context = publish_task_event('created', task)
             except Exception as e:
                 print(f"Error al crear tarea: {e}")
         
-        # Devolver el contenedor completo de tareas
-        context = get_tasks_context()
-        return render(request, 'partials/tasks_container.html', context)
+        # Devolver solo la tarjeta nueva, o el contenedor completo si se pidió
+        return render_task_change(request, task, context=context)
 
 
 @method_decorator(require_http_methods(["PUT", "POST"]), name='dispatch')
@@ -97,6 +180,7 @@ class APIUpdateTaskView(View):
         title = request.POST.get('title', '').strip()
         description = request.POST.get('description', '').strip()
         
+        task = context = None
         if title:
             # Actualizar directamente en la base de datos
             try:
@@ -104,12 +188,13 @@ class APIUpdateTaskView(View):
                 task.title = title
                 task.description = description
                 task.save()
+                context = publish_task_event('updated', task, task.column_type)
             except Exception as e:
                 print(f"Error al actualizar tarea: {e}")
         
-        # Devolver el contenedor completo de tareas
-        context = get_tasks_context()
-        return render(request, 'partials/tasks_container.html', context)
+        # Devolver solo la tarjeta actualizada, o el contenedor completo si se pidió
+        previous_column = task.column_type if task is not None else None
+        return render_task_change(request, task, previous_column, context)
 
 
 @method_decorator(require_http_methods(["DELETE", "POST"]), name='dispatch')
@@ -117,21 +202,93 @@ class APIDeleteTaskView(View):
     """Vista para soft-delete de tareas"""
     def delete(self, request, task_id):
         # Implementar soft-delete
+        task = context = previous_column = None
         try:
             task = get_object_or_404(Task, id=task_id)
+            previous_column = task.column_type
             task.deleted = True
-            task.save()
+            # Escribir solo las columnas modificadas
+            task.save(update_fields=['deleted', 'updated_at'])
+            context = publish_task_event('deleted', task, previous_column)
         except Exception as e:
             print(f"Error al eliminar tarea: {e}")
         
-        # Devolver el contenedor completo de tareas
-        context = get_tasks_context()
-        return render(request, 'partials/tasks_container.html', context)
+        # Devolver solo la tarjeta movida, o el contenedor completo si se pidió
+        return render_task_change(request, task, previous_column, context)
     
     def post(self, request, task_id):
         return self.delete(request, task_id)
 
 
+@method_decorator(require_http_methods(["POST"]), name='dispatch')
+class APIMoveTaskView(View):
+    """
+    Vista para reordenar una tarea en su columna (arrastrar y soltar).
+    `after` es el id de la tarjeta sobre la que quedó (vacío: arriba de
+    todo); solo se reescribe la fila movida y se responde su tarjeta.
+    """
+    def post(self, request, task_id):
+        task = get_object_or_404(Task, id=task_id)
+        try:
+            after_id = parse_move_after(request.POST.get('after'))
+            if after_id == task.id:
+                raise ValueError("Una tarea no puede ir bajo sí misma")
+            move_task(task, after_id)
+        except ValueError:
+            return HttpResponseBadRequest("Posición inválida")
+        publish_task_event('moved', task, context=get_task_moved_context(task, after_id))
+        return render_task_fragments(request, task, task.column_type)
+
+
+# Días que muestra el gráfico de tendencia sin rango elegido, y máximo de un rango
+DASHBOARD_DEFAULT_DAYS = 30
+DASHBOARD_MAX_DAYS = 366
+
+
+def get_dashboard_range(params):
+    """
+    Rango (start, end) de los parámetros GET `start` y `end` (AAAA-MM-DD);
+    por defecto los últimos DASHBOARD_DEFAULT_DAYS días. ValueError si es inválido.
+    """
+    end = parse_date(params.get('end') or '') or timezone.localdate()
+    start = parse_date(params.get('start') or '') or end - timedelta(days=DASHBOARD_DEFAULT_DAYS - 1)
+    if start > end or (end - start).days >= DASHBOARD_MAX_DAYS:
+        raise ValueError("Rango de fechas inválido")
+    return start, end
+
+
+def get_dashboard_context(counts, rollup_rows, start, end):
+    """
+    Estadísticas y gráficos del dashboard a partir de status_counts() y de
+    las filas de TaskDailyRollup.objects.series(start, end)
+    """
+    pending_tasks = counts['pending']
+    completed_tasks = counts['completed']
+    deleted_tasks = counts['deleted']
+    # Las tres columnas son disjuntas y cubren todas las tareas
+    total_tasks = pending_tasks + completed_tasks + deleted_tasks
+    
+    # Calcular porcentaje de completado respecto a tareas activas (sin eliminadas)
+    active_tasks = pending_tasks + completed_tasks
+    completion_rate = (completed_tasks / active_tasks * 100) if active_tasks > 0 else 0
+    
+    context = {
+        'total_tasks': total_tasks,
+        'active_tasks': active_tasks,
+        'pending_tasks': pending_tasks,
+        'completed_tasks': completed_tasks,
+        'deleted_tasks': deleted_tasks,
+        'completion_rate': round(completion_rate, 1),
+    }
+    
+    # Gráficos (cacheados según los conteos)
+    context.update(get_dashboard_charts(pending_tasks, completed_tasks, deleted_tasks))
+    context.update(get_trend_chart(rollup_rows, start, end))
+    context.update({'start': start, 'end': end})
+    return context
+
+
+@method_decorator(conditional_on_tasks, name='dispatch')
 class DashboardView(TemplateView):
 
     def get_template_names(self):
@@ -139,101 +296,46 @@ class DashboardView(TemplateView):
             return ["partials/dashboard_content.html"]
         return [self.template_name]
 
+    def get(self, request, *args, **kwargs):
+        try:
+            self.start, self.end = get_dashboard_range(request.GET)
+        except ValueError:
+            return HttpResponseBadRequest("Rango de fechas inválido")
+        return super().get(request, *args, **kwargs)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        
-        # Estadísticas generales
-        total_tasks = Task.objects.count()
-        pending_tasks = Task.objects.filter(completed=False, deleted=False).count()
-        completed_tasks = Task.objects.filter(completed=True, deleted=False).count()
-        deleted_tasks = Task.objects.filter(deleted=True).count()
-        
-        # Calcular porcentaje de completado respecto a tareas activas (sin eliminadas)
-        active_tasks = pending_tasks + completed_tasks
-        completion_rate = (completed_tasks / active_tasks * 100) if active_tasks > 0 else 0
-        
-        context.update({
-            'total_tasks': total_tasks,
-            'active_tasks': active_tasks,
-            'pending_tasks': pending_tasks,
-            'completed_tasks': completed_tasks,
-            'deleted_tasks': deleted_tasks,
-            'completion_rate': round(completion_rate, 1),
-        })
-        
-        # Gráfico tipo pie
-        if total_tasks > 0:
-            data = {
-                'status': ['Pendientes', 'Completadas', 'Eliminadas'],
-                'count': [pending_tasks, completed_tasks, deleted_tasks],
-                'color': ['#EAB308', '#22C55E', '#EF4444']
-            }
-            
-            angles = []
-            for count in data['count']:
-                angle = (count / total_tasks) * 2 * math.pi
-                angles.append(angle)
-            
-            pie_chart = figure(
-                width=500,
-                height=400,
-                title="Distribución de Tareas por Estado",
-                toolbar_location=None,
-                tools="hover",
-                tooltips="@status: @count",
-                x_range=(-0.5, 1.0)
-            )
-            
-            start_angle = 0
-            for i, (status, count, color, angle) in enumerate(zip(data['status'], data['count'], data['color'], angles)):
-                if count > 0:
-                    pie_chart.wedge(
-                        x=0, y=1,
-                        radius=0.4,
-                        start_angle=start_angle,
-                        end_angle=start_angle + angle,
-                        color=color,
-                        alpha=0.8,
-                        legend_label=f"{status}: {count}"
-                    )
-                    start_angle += angle
-            
-            pie_chart.axis.axis_label = None
-            pie_chart.axis.visible = False
-            pie_chart.grid.grid_line_color = None
-            pie_chart.legend.location = "top_right"
-            
-            script_pie, div_pie = components(pie_chart)
-            context['script_pie'] = script_pie
-            context['div_pie'] = div_pie
-        else:
-            context['script_pie'] = ''
-            context['div_pie'] = '<p class="text-center text-gray-500">No hay datos para mostrar</p>'
-        
-        # Gráfico de barras
-        bar_chart = figure(
-            x_range=['Pendientes', 'Completadas', 'Eliminadas'],
-            width=500,
-            height=400,
-            title="Comparación de Tareas por Estado",
-            toolbar_location=None,
-            tools=""
-        )
-        
-        bar_chart.vbar(
-            x=['Pendientes', 'Completadas', 'Eliminadas'],
-            top=[pending_tasks, completed_tasks, deleted_tasks],
-            width=0.6,
-            color=['#EAB308', '#22C55E', '#EF4444'],
-            alpha=0.8
-        )
-        
-        bar_chart.xgrid.grid_line_color = None
-        bar_chart.y_range.start = 0
-        bar_chart.yaxis.axis_label = "Cantidad de Tareas"
-        
-        script_bar, div_bar = components(bar_chart)
-        context['script_bar'] = script_bar
-        context['div_bar'] = div_bar
-        
-        return context
\ No newline at end of file
+        # Estadísticas generales (una sola consulta con agregación condicional)
+        # y la tendencia, que solo lee los conteos diarios del rango
+        context.update(get_dashboard_context(
+            Task.objects.status_counts(),
+            TaskDailyRollup.objects.series(self.start, self.end),
+            self.start, self.end,
+        ))
+        return context
+
+
+
+def is_internal_request(request):
+    """Las vistas de operación solo responden con METRICS_TOKEN o desde INTERNAL_IPS"""
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get('Authorization', '')
+        if constant_time_compare(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+            return True
+    return request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS
+
+
+class InternalView(View):
+    """Vista de operación, invisible (404) para el resto de los clientes"""
+    def dispatch(self, request, *args, **kwargs):
+        if not is_internal_request(request):
+            raise Http404()
+        return super().dispatch(request, *args, **kwargs)
+
+
+class MetricsView(InternalView):
+    """Histogramas de rendimiento del proceso en el formato de texto de Prometheus"""
+    http_method_names = ['get']
+
+    def get(self, request):
+        return HttpResponse(expose_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')